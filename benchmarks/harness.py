@@ -0,0 +1,100 @@
+"""
+Timing, result storage and regression checks for the benchmarks in run.py.
+"""
+import json
+import platform
+import statistics
+import sys
+import time
+from importlib import metadata
+
+
+class Benchmark():
+    """
+    One measured case.  fn is timed `rounds` times after `warmup` untimed calls; setup, if given, runs before every
+    call and is not timed.  items is the amount of work done by one call (foils, points, ...) and gives the throughput.
+    """
+
+    def __init__(self, name, fn, setup=None, items=1, rounds=10, warmup=1):
+        self.name = name
+        self.fn = fn
+        self.setup = setup
+        self.items = items
+        self.rounds = rounds
+        self.warmup = warmup
+
+    def run(self) -> dict:
+        times = []
+        for i in range(self.warmup + self.rounds):
+            if self.setup is not None:
+                self.setup()
+            start = time.perf_counter()
+            self.fn()
+            elapsed = time.perf_counter() - start
+            if i >= self.warmup:
+                times.append(elapsed)
+        median = statistics.median(times)
+        return {
+            'rounds': len(times),
+            'items': self.items,
+            'min': min(times),
+            'max': max(times),
+            'mean': statistics.mean(times),
+            'median': median,
+            'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+            'items_per_second': self.items / median if median else None,
+        }
+
+
+def environment() -> dict:
+    try:
+        version = metadata.version('xflrpy')
+    except metadata.PackageNotFoundError:
+        version = None
+    return {
+        'timestamp': time.time(),
+        'xflrpy': version,
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+    }
+
+
+def save(results, path, **meta) -> None:
+    "Writes results as JSON, with the environment and meta (e.g. server latency) needed to compare runs"
+    with open(path, 'w') as f:
+        json.dump({'meta': {**environment(), **meta}, 'results': results}, f, indent=2)
+
+
+def load(path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, results, threshold=0.2) -> list:
+    """
+    Compares median times with a baseline run.
+
+    Args:
+        baseline (dict): results of a previous run, as saved by save()
+        results (dict): results of this run
+        threshold (float): relative slowdown above which a case counts as a regression
+    Returns:
+        list: (name, baseline median, median, ratio, regressed) for every case present in both runs
+    """
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]['median'], result['median']
+        ratio = new / old if old else float('inf')
+        rows.append((name, old, new, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def format_seconds(seconds) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.3g} {unit}'
+    return f'{seconds / 1e-9:.3g} ns'
@@ -0,0 +1,172 @@
+"""
+Benchmarks of the client hot paths against a FakeServer.
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --compare results.json --threshold 0.2
+
+Cases scale from 10 to 10,000 foils and from 10 to 100,000 polar points (--quick stops at 1,000 foils and 10,000
+points).  Every case reports min/median/mean times and throughput.  With --compare the medians are checked against a
+previous run and the exit status is 1 if any case is slower than the threshold allows.
+"""
+import argparse
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness import Benchmark, compare, format_seconds, load, save
+from xflrpy import Client
+from xflrpy.fake_server import FakeServer, POLAR_RESULT_KEYS
+from xflrpy.plane import PlaneDetail
+from xflrpy.polar2d import PolarResult, PolarResultType
+
+FOIL_COUNTS = (10, 100, 1000, 10000)
+POINT_COUNTS = (10, 1000, 10000, 100000)
+PLANE_LINES = (10, 100, 1000)
+# foils of the batch result cases, each analyzed at BATCH_RE
+BATCH_FOIL_COUNTS = (10, 200)
+BATCH_RE = [1e5 * (i + 1) for i in range(10)]
+QUICK_FOIL_COUNTS = (10, 100, 1000)
+QUICK_POINT_COUNTS = (10, 1000, 10000)
+# gets timed per round in the foils.get cases
+GET_COUNT = 100
+CREATE_CHUNK = 500
+
+
+def rounds_for(size, rounds):
+    return rounds if size < 10000 else max(3, rounds // 3)
+
+
+def populate(client, n):
+    "Replaces the project with n NACA foils"
+    client.call("newProject")
+    names = [f'foil {i}' for i in range(n)]
+    for i in range(0, n, CREATE_CHUNK):
+        client.call_many([("createNACAFoil", (12, name)) for name in names[i:i + CREATE_CHUNK]])
+    return names
+
+
+def foil_manager_cases(client, counts, rounds):
+    for n in counts:
+        names = populate(client, n)
+        sample = names[::max(1, n // GET_COUNT)][:GET_COUNT]
+
+        def iterate():
+            for foil in client.foils:
+                pass
+        yield Benchmark(f'foils.iterate[{n}]', iterate, items=n, rounds=rounds_for(n, rounds))
+
+        def get():
+            for name in sample:
+                client.foils.get(name)
+        yield Benchmark(f'foils.get[{n}]', get, setup=client.cache.clear, items=len(sample),
+                        rounds=rounds_for(n, rounds))
+
+        yield Benchmark(f'foils.get_many[{n}]', lambda: client.foils.get_many(sample), setup=client.cache.clear,
+                        items=len(sample), rounds=rounds_for(n, rounds))
+
+
+def coordinate_cases(client, counts, rounds):
+    client.call("newProject")
+    foil = client.foils.create_naca_foil(12)
+    for points in counts:
+        x = (1 - np.cos(np.linspace(0, 2 * np.pi, points))) / 2
+        foil.set_coordinates(np.column_stack([x, 0.05 * np.sin(np.linspace(0, 2 * np.pi, points))]))
+        yield Benchmark(f'foil.coordinates[{points}]', lambda: foil.coordinates, setup=client.cache.clear,
+                        items=points, rounds=rounds_for(points, rounds))
+        yield Benchmark(f'foil.coordinate_array[{points}]', lambda: foil.coordinate_array, setup=client.cache.clear,
+                        items=points, rounds=rounds_for(points, rounds))
+        yield Benchmark(f'foil.to_dat[{points}]', foil.to_dat, setup=client.cache.clear,
+                        items=points, rounds=rounds_for(points, rounds))
+
+
+def polar_result_cases(counts, rounds):
+    for points in counts:
+        payload = {POLAR_RESULT_KEYS[t]: np.linspace(0, 1, points).tolist() for t in PolarResultType}
+        yield Benchmark(f'PolarResult.from_msgpack[{points}]', lambda: PolarResult.from_msgpack(payload),
+                        items=points, rounds=rounds_for(points, rounds))
+
+
+def analysis_cases(client, counts, rounds):
+    client.call("newProject")
+    analysis = client.foils.create_naca_foil(12).analyses.create(reynolds=100000)
+    for points in counts:
+        sequence = (0, 10, 10 / points)
+        yield Benchmark(f'analysis.run_analysis[{points}]', lambda: analysis.run_analysis(sequence=sequence),
+                        items=points, rounds=rounds_for(points, rounds))
+
+
+def batch_result_cases(client, counts, rounds):
+    for n in counts:
+        names = populate(client, n)
+        client.foils.run_batch_analysis(BATCH_RE, names, sequence=(-5, 15, 0.5))
+        polars = n * len(BATCH_RE)
+
+        def per_polar():
+            for foil in client.foils.get_many(names):
+                for analysis in foil.analyses:
+                    analysis.polar
+        yield Benchmark(f'analysis.polar[{polars}]', per_polar, setup=client.cache.clear, items=polars,
+                        rounds=rounds_for(polars, rounds))
+        yield Benchmark(f'foils.batch_results[{polars}]', lambda: client.foils.batch_results(names),
+                        setup=client.cache.clear, items=polars, rounds=rounds_for(polars, rounds))
+
+
+def plane_detail_cases(counts, rounds):
+    for lines in counts:
+        text = '\n'.join(f'Parameter {i} = {i * 0.37:.4f} m' for i in range(lines))
+        yield Benchmark(f'PlaneDetail._parse_data[{lines}]', lambda: PlaneDetail(text), items=lines,
+                        rounds=rounds_for(lines, rounds))
+
+
+def cases(client, quick, rounds):
+    foil_counts = QUICK_FOIL_COUNTS if quick else FOIL_COUNTS
+    point_counts = QUICK_POINT_COUNTS if quick else POINT_COUNTS
+    yield from foil_manager_cases(client, foil_counts, rounds)
+    yield from coordinate_cases(client, point_counts, rounds)
+    yield from polar_result_cases(point_counts, rounds)
+    yield from analysis_cases(client, point_counts, rounds)
+    yield from batch_result_cases(client, BATCH_FOIL_COUNTS, rounds)
+    yield from plane_detail_cases(PLANE_LINES, rounds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of the xflrpy client against a FakeServer")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="JSON file of a previous run to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.2, help="relative slowdown counted as a regression")
+    parser.add_argument('--latency', type=float, default=0.0, help="FakeServer response latency in seconds")
+    parser.add_argument('--packed-arrays', action='store_true', help="negotiate packed arrays")
+    parser.add_argument('--rounds', type=int, default=10, help="timed rounds per case")
+    parser.add_argument('--quick', action='store_true', help="skip the largest sizes")
+    parser.add_argument('--filter', default='', help="only run cases whose name contains this text")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with FakeServer(latency=args.latency) as server:
+        client = Client().connect(port=server.port, timeout=300, packed_arrays=args.packed_arrays)
+        for benchmark in cases(client, args.quick, args.rounds):
+            if args.filter not in benchmark.name:
+                continue
+            results[benchmark.name] = result = benchmark.run()
+            print(f"{benchmark.name:<40} median {format_seconds(result['median']):>10}   "
+                  f"{result['items_per_second']:>14,.0f} items/s", flush=True)
+        client.close()
+
+    if args.output:
+        save(results, args.output, latency=args.latency, packed_arrays=args.packed_arrays, quick=args.quick)
+    if args.compare:
+        rows = compare(load(args.compare)['results'], results, args.threshold)
+        regressions = [row for row in rows if row[4]]
+        for name, old, new, ratio, regressed in rows:
+            flag = 'REGRESSION' if regressed else ''
+            print(f"{name:<40} {format_seconds(old):>10} -> {format_seconds(new):>10}  x{ratio:.2f}  {flag}")
+        if regressions:
+            print(f"{len(regressions)} of {len(rows)} cases regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,6 +20,8 @@ setuptools.setup(
         "Operating System :: OS Independent",
     ),
     install_requires=[
-          'rpc-msgpack',
+          # xflrpy.session extends the private transport classes of this version
+          'rpc-msgpack>=0.6,<0.7',
+          'numpy',
     ]
 )
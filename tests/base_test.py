@@ -1,11 +1,23 @@
+import os
 from xflrpy import Client
+from xflrpy.fake_server import FakeServer
+
+# set XFLRPY_FAKE_SERVER=1 to run the tests against a FakeServer instead of a running XFLR5
+_fake_server = None
+
+def _start_fake_server():
+    global _fake_server
+    if _fake_server is None and os.environ.get("XFLRPY_FAKE_SERVER"):
+        _fake_server = FakeServer(port=8080)
+        _fake_server.start()
 
 class TestBase:
     def setup_method(self, test_method):
-        Client().connect()
-        Client().foils.delete_all()
+        _start_fake_server()
+        self.client = Client().connect()
+        self.client.foils.delete_all()
 
     def teardown_method(self, test_method):
-        if Client().is_connected:
-            Client().foils.delete_all()
-            Client().close()
\ No newline at end of file
+        if self.client.is_connected:
+            self.client.foils.delete_all()
+            self.client.close()
@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+from xflrpy import Client
+from xflrpy.fake_server import FakeServer
+from xflrpy.polar2d import (Analysis2d, PolarResult, PolarResultType, _merge_results, _refinement_points,
+                            _unconverged_past_max)
+
+
+class TestAdaptiveAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer()
+        self.server.start()
+        self.client = Client()
+        self.client.connect(port=self.server.port)
+        self.foil = self.client.foils.create_naca_foil(2412)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_fewer_points_same_accuracy(self):
+        adaptive = Analysis2d.create(self.foil.name, 'adaptive', reynolds=1e5, client=self.client)
+        result = adaptive.run_adaptive_analysis(alpha_range=(-5, 25), min_step=0.25, tolerance=0.005)
+        fixed = Analysis2d.create(self.foil.name, 'fixed', reynolds=1e5, client=self.client)
+        reference = fixed.run_analysis(sequence=(-5, 25.25, 0.25))
+        assert len(result) < len(reference) / 3
+        assert np.all(np.diff(result.alpha) > 0)
+        # stops past stall, well before the end of the range
+        assert 14 < result.alpha.max() < 20
+        covered = reference.alpha <= result.alpha.max()
+        error = np.interp(reference.alpha[covered], result.alpha, result.Cl) - reference.Cl[covered]
+        assert np.abs(error).max() < 0.01
+        # the linear range keeps the coarse step, stall is resolved to min_step
+        assert np.diff(result.alpha[result.alpha < 5]).min() == 2.0
+        assert np.diff(result.alpha[(result.alpha > 10) & (result.alpha < 13)]).min() == 0.25
+        # the points are added to the polar on the server
+        np.testing.assert_array_equal(adaptive.polar.alpha, result.alpha)
+
+    def test_chunk_ending_at_zero(self):
+        analysis = Analysis2d.create(self.foil.name, 'zero', reynolds=1e5, client=self.client)
+        result = analysis.run_adaptive_analysis(alpha_range=(-8, 25), chunk=4, tolerance=1)
+        assert {-8.0, -6.0, -4.0, -2.0, 0.0} <= set(result.alpha.tolist())
+
+    def test_op_point_values(self):
+        analysis = Analysis2d.create(self.foil.name, 'cd', reynolds=2e5, client=self.client)
+        result = analysis.run_adaptive_analysis(max_points=10, op_point_values=[PolarResultType.ALPHA,
+                                                                                PolarResultType.CD])
+        assert result.keys == ['alpha', 'Cd']
+        assert len(result) <= 12
+
+    def test_refinement_points(self):
+        alpha = np.arange(0, 10, 2.0)
+        assert _refinement_points(alpha, 0.1 * alpha, 0.25, 0.001) == []
+        cl = np.array([0.0, 0.2, 0.4, 1.0, 0.2])
+        assert _refinement_points(alpha, cl, 0.25, 0.001) == [3.0, 5.0, 7.0]
+        assert _refinement_points(alpha, cl, 2.0, 0.001) == []
+
+    def test_unconverged_past_max(self):
+        attempted = {-4.0, -2.0, 0.0, 2.0, 4.0, 6.0, 8.0}
+        # no lift yet
+        assert _unconverged_past_max(attempted, np.array([]), np.array([])) == 0
+        assert _unconverged_past_max(attempted, np.array([-4.0, -2.0]), np.array([-0.4, -0.2])) == 0
+        # failures below the maximum, followed by converged points, do not count
+        alpha = np.array([-4.0, 2.0, 4.0])
+        assert _unconverged_past_max(attempted, alpha, np.array([-0.4, 0.2, 0.4])) == 2
+        assert _unconverged_past_max(attempted, alpha, np.array([-0.4, 0.6, 0.4])) == 2
+        assert _unconverged_past_max(attempted | {10.0}, np.append(alpha, 10.0), np.array([-0.4, 0.2, 0.4, 0.3])) == 0
+
+    def test_merge_results(self):
+        first = PolarResult.from_arrays({'alpha': [0.0, 2.0], 'Cl': [0.0, 0.2]})
+        second = PolarResult.from_arrays({'alpha': [1.0, 2.0], 'Cl': [0.1, 0.25]})
+        merged = _merge_results([first, PolarResult(), second])
+        np.testing.assert_array_equal(merged.alpha, [0.0, 1.0, 2.0])
+        np.testing.assert_array_equal(merged.Cl, [0.0, 0.1, 0.25])
+        assert len(_merge_results([])) == 0
@@ -1,5 +1,5 @@
 import unittest
-from xflrpy import Client, exceptions
+from xflrpy import exceptions
 import pathlib
 import os
 from base_test import TestBase
@@ -12,7 +12,7 @@ FOLDER = pathlib.Path(__file__).parent.resolve()
 
 class TestAnalysis2dManager(unittest.TestCase, TestBase):
     def test_create_analyze_get_delete_analysis(self):
-        C = Client()
+        C = self.client
         C.foils.load(os.path.join(FOLDER, 'goe445.DAT'))
         foil = C.foils['GOE 445 AIRFOIL']
         analyses = foil.analyses
@@ -50,7 +50,7 @@ class TestAnalysis2dManager(unittest.TestCase, TestBase):
 
 
     def test_create_multiple_analysis(self):
-        C = Client()
+        C = self.client
         C.foils.load(os.path.join(FOLDER, 'goe445.DAT'))
         foil = C.foils['GOE 445 AIRFOIL']
         analyses = foil.analyses
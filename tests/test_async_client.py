@@ -0,0 +1,119 @@
+import unittest
+import os
+import asyncio
+import numpy as np
+import pytest
+from msgpackrpc.error import TransportError
+from xflrpy import AsyncClient, exceptions
+from xflrpy.async_client import AsyncFoil
+from xflrpy.foil import Foil
+from xflrpy.polar2d import PolarResult
+from xflrpy.fake_server import FakeServer
+
+GOE445 = os.path.join(os.path.dirname(__file__), 'goe445.DAT')
+
+
+class TestAsyncClient(unittest.TestCase):
+
+    def run_with_server(self, coro_fn, latency=0.0):
+        async def runner():
+            server = FakeServer(latency=latency)
+            port = await server.serve()
+            client = await AsyncClient().connect(port=port, timeout=5)
+            try:
+                return server, await coro_fn(client)
+            finally:
+                await client.close()
+                await server.close()
+        return asyncio.run(runner())
+
+    def test_connect_and_call(self):
+        async def scenario(client):
+            assert client.is_connected
+            assert await client.ping()
+            assert '<XFLRAsyncClient>' in repr(client)
+        self.run_with_server(scenario)
+
+    def test_concurrent_calls_overlap(self):
+        async def scenario(client):
+            return await asyncio.gather(*[client.call("ping") for _ in range(50)])
+        server, results = self.run_with_server(scenario, latency=0.05)
+        assert results == [True] * 50
+        assert server.max_in_flight > 1
+
+    def test_foils(self):
+        async def scenario(client):
+            f1 = await client.foils.create_naca_foil(12)
+            await client.foils.load([GOE445])
+            with pytest.raises(exceptions.InvalidFoilPathError):
+                await client.foils.load(['missing.dat'])
+            with pytest.raises(exceptions.InvalidNacaValueError):
+                await client.foils.create_naca_foil(0)
+            f5 = await client.foils.create_naca_foil("23012")
+            assert f5.name == 'NACA 23012' and f5.thickness == pytest.approx(0.12, abs=1e-3)
+            with pytest.raises(exceptions.InvalidNacaValueError, match="positive, 5 digit"):
+                await client.foils.create_naca_foil('00000')
+            with pytest.raises(KeyError):
+                await client.foils.get('NACA3333')
+            return f1, await client.foils.to_dict()
+        _, (f1, foils) = self.run_with_server(scenario)
+        assert type(f1) == AsyncFoil and isinstance(f1, Foil)
+        assert f1.name == 'NACA 0012'
+        assert set(foils) == {'NACA 0012', 'NACA 23012', 'GOE 445 AIRFOIL'}
+
+    def test_foil_methods(self):
+        async def scenario(client):
+            foil = await client.foils.create_naca_foil(12)
+            listed = (await client.foils.to_dict())['NACA 0012']
+            assert listed._client is client
+            coords = await listed.coordinates
+            assert len(coords) == foil.n and np.asarray(await listed.coordinate_array).shape == (foil.n, 2)
+            await listed.set_geometry(thickness=0.15)
+            assert listed.thickness == pytest.approx(0.15, abs=0.002)
+            copy = await listed.duplicate('copy')
+            await copy.rename('renamed')
+            assert (await client.foils.get('renamed')).name == 'renamed'
+            await copy.hide()
+            assert not await copy.is_visible
+            assert (await copy.to_dat()).startswith('renamed')
+            analysis = await listed.analyses.create(reynolds=100000)
+            assert len(await analysis.run_analysis(sequence=(0, 2, 1))) == 2
+        self.run_with_server(scenario)
+
+    def test_server_closes_connection(self):
+        async def scenario(client):
+            server = FakeServer(latency=0.2)
+            port = await server.serve()
+            other = await AsyncClient().connect(port=port, timeout=5)
+            try:
+                pending = asyncio.ensure_future(other.call("ping"))
+                await asyncio.sleep(0.05)
+                server.drop_connections()
+                with pytest.raises(TransportError):
+                    await asyncio.wait_for(pending, 1)
+                assert not other.is_connected
+                with pytest.raises(TransportError):
+                    await asyncio.wait_for(other.call("ping"), 1)
+            finally:
+                await other.close()
+                await server.close()
+        self.run_with_server(scenario)
+
+    def test_analysis(self):
+        async def scenario(client):
+            foil = await client.foils.create_naca_foil(12)
+            analyses = client.foils.analyses(foil)
+            analysis = await analyses.create(reynolds=100000)
+            result = await analysis.run_analysis(sequence=(0, 15, 0.25))
+            return result, await analyses.to_list()
+        _, (result, analyses) = self.run_with_server(scenario)
+        assert type(result) == PolarResult
+        assert len(result) == 60
+        assert len(analyses) == 1
+
+    def test_call_after_close(self):
+        async def scenario():
+            client = AsyncClient()
+            with pytest.raises(exceptions.ClientNotConnectedException):
+                await client.call("ping")
+        asyncio.run(scenario())
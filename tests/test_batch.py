@@ -0,0 +1,50 @@
+import unittest
+import time
+import pytest
+import msgpackrpc as rpc
+from xflrpy import Client, exceptions
+from xflrpy.fake_server import FakeServer
+
+
+class TestCallBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(latency=0.02)
+        self.client = Client().connect(port=self.server.start(), timeout=5)
+        self.client.call_many([("createNACAFoil", (12, f'foil {i}')) for i in range(20)])
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_deferred_results(self):
+        with self.client.batch() as batch:
+            foil = batch.call("getFoil", "foil 3")
+            ping = batch.call("ping")
+            assert len(batch) == 2
+            with pytest.raises(exceptions.BatchNotFlushedError):
+                foil.result
+        assert foil.done
+        assert foil.result['name'] == 'foil 3'
+        assert ping.result is True
+        assert batch.results == [foil.result, True]
+
+    def test_errors_raised_after_all_calls(self):
+        with pytest.raises(rpc.error.RPCError):
+            with self.client.batch() as batch:
+                missing = batch.call("getFoil", "no foil")
+                deleted = batch.call("deleteFoil", "foil 0")
+        assert deleted.done and deleted.result is None
+        with pytest.raises(rpc.error.RPCError):
+            missing.result
+        assert 'foil 0' not in self.server.handler.foils
+
+    def test_housekeeping_is_one_burst(self):
+        start = time.time()
+        self.client.foils.hide_all()
+        assert time.time() - start < 0.02 * 5
+        assert not any(f['style']['visible'] for f in self.server.handler.foils.values())
+        self.client.foils.show_all()
+        assert all(f['style']['visible'] for f in self.server.handler.foils.values())
+        self.client.foils.delete_all()
+        assert len(self.client.foils) == 0
@@ -0,0 +1,68 @@
+import unittest
+import time
+import numpy as np
+import pytest
+from msgpackrpc.error import RPCError
+from xflrpy import Client
+from xflrpy.fake_server import FakeServer
+from xflrpy.polar2d import PolarResultType
+
+
+class TestBatchStream(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(polar_time=0.05)
+        self.server.start()
+        self.client = Client()
+        self.client.connect(port=self.server.port)
+        self.foils = [self.client.foils.create_naca_foil(d) for d in (12, 2412, 4412)]
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_stream(self):
+        start = time.time()
+        arrivals = []
+        streamed = {}
+        for foil_name, polar, result in self.client.foils.stream_batch_analysis(
+                [1e5, 2e5], self.foils, poll_interval=0.01, sequence=(0, 5, 1)):
+            arrivals.append(time.time() - start)
+            streamed[(foil_name, polar['name'])] = result
+        assert len(streamed) == 6
+        # the first polar arrives long before the batch is over
+        assert arrivals[0] < arrivals[-1] / 2
+        expected = self.client.foils.batch_results(self.foils).to_results()
+        assert set(streamed) == set(expected)
+        for key, result in streamed.items():
+            np.testing.assert_array_equal(result.Cl, expected[key].Cl)
+
+    def test_earlier_polars(self):
+        self.server.polar_time = 0
+        self.client.foils.run_batch_analysis([1e5], self.foils, sequence=(0, 5, 1))
+        self.client.foils.run_batch_analysis([1e5], self.foils, sequence=(0, 5, 1), mach=0.2)
+        self.server.polar_time = 0.02
+        streamed = list(self.client.foils.stream_batch_analysis([1e5, 2e5], self.foils, poll_interval=0.01,
+                                                                sequence=(0, 5, 1)))
+        assert len(streamed) == 6
+        assert len({(name, polar['name']) for name, polar, _ in streamed}) == 6
+        assert all(polar['spec']['mach'] == 0 for _, polar, _ in streamed)
+
+    def test_given_poller(self):
+        poller = Client().connect(port=self.server.port)
+        streamed = list(self.client.foils.stream_batch_analysis([1e5], self.foils[:1], poll_interval=0.01,
+                                                                poller=poller, sequence=(0, 5, 1)))
+        assert poller.call_count['getPolarResult'] >= 1
+        # the caller's poller is left open
+        assert poller.is_connected
+        poller.close()
+        # every column by default
+        assert len(streamed[0][2].keys) == len(PolarResultType)
+
+    def test_failed_batch(self):
+        stream = self.client.foils.stream_batch_analysis([1e5], ['NACA 0012', 'missing'], poll_interval=0.01,
+                                                         op_point_values=[0, 1], sequence=(0, 5, 1))
+        name, polar, result = next(stream)
+        assert name == 'NACA 0012' and result.keys == ['alpha', 'Cl']
+        with pytest.raises(RPCError):
+            next(stream)
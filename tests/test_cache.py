@@ -0,0 +1,115 @@
+import unittest
+from xflrpy import Client
+from xflrpy.cache import CallCache
+from xflrpy.fake_server import FakeServer
+from xflrpy.polar2d import AnalysisSettings2D, XflrPolar
+
+
+class TestCallCache(unittest.TestCase):
+
+    def test_hit_returns_copy(self):
+        cache = CallCache()
+        cache.store("getFoilCoords", ("A",), [[1.0, 0.0], [0.0, 0.0]])
+        hit, coords = cache.lookup("getFoilCoords", ("A",))
+        assert hit
+        coords[0][0] = 5.0
+        assert cache.lookup("getFoilCoords", ("A",))[1] == [[1.0, 0.0], [0.0, 0.0]]
+        assert cache.hits == 2
+
+    def test_only_read_calls_are_cached(self):
+        cache = CallCache()
+        cache.store("foilList", (), [{'name': 'A'}])
+        cache.store("setFoilCoords", ("A", [], True), None)
+        assert len(cache) == 0
+        assert cache.lookup("foilList", ()) == (False, None)
+
+    def test_foil_invalidation(self):
+        cache = CallCache()
+        cache.store("getFoil", ("A",), {'name': 'A'})
+        cache.store("getFoilCoords", ("A",), [])
+        cache.store("getFoil", ("B",), {'name': 'B'})
+        cache.before_call("normalizeFoil", ("A",))
+        assert not cache.contains("getFoil", "A")
+        assert not cache.contains("getFoilCoords", "A")
+        assert cache.contains("getFoil", "B")
+        cache.before_call("renameFoil", ("C", "B"))
+        assert not cache.contains("getFoil", "B")
+
+    def test_new_foil_name_invalidation(self):
+        cache = CallCache()
+        cache.store("getFoil", ("NACA 0012",), {'name': 'NACA 0012'})
+        cache.before_call("createNACAFoil", (12, "NACA 0012"))
+        assert len(cache) == 0
+
+    def test_global_invalidation(self):
+        cache = CallCache()
+        cache.store("getFoil", ("A",), {'name': 'A'})
+        cache.store("getPolar", ("A", "T1", True, True), {'name': 'T1'})
+        cache.before_call("loadProject", (["/tmp/a.dat"],))
+        assert len(cache) == 0
+
+    def test_get_polar_with_gui_effects(self):
+        cache = CallCache()
+        cache.store("getPolar", ("A", "T1", True, True), {'name': 'T1'})
+        cache.store("getPolar", ("A", "T1", False, True), {'name': 'T1'})
+        cache.store("getPolar", ("A", "T1"), {'name': 'T1'})
+        assert len(cache) == 0
+        cache.store("getPolar", ("A", "T1", False, False), {'name': 'T1'})
+        assert cache.contains("getPolar", "A", "T1", False, False)
+
+    def test_polar_list_invalidation(self):
+        cache = CallCache()
+        cache.store("polarList", ("A",), [{'name': 'T1'}])
+        cache.store("polarList", ("B",), [])
+        cache.before_call("deletePolar", ("A", "T1"))
+        assert not cache.contains("polarList", "A")
+        assert cache.contains("polarList", "B")
+        cache.before_call("defineAnalysis2D", ({'foil_name': 'B'},))
+        assert not cache.contains("polarList", "B")
+
+    def test_analysis_keeps_foils(self):
+        cache = CallCache()
+        cache.store("getFoilCoords", ("A",), [[1.0, 0.0]])
+        cache.store("polarList", ("A",), [{'name': 'T1'}])
+        cache.store("getPolar", ("A", "T1", False, False), {'name': 'T1'})
+        cache.store("polarList", ("B",), [])
+        polar = XflrPolar()
+        polar.foil_name = 'A'
+        cache.before_call("analyzePolar", (polar, AnalysisSettings2D(), [0]))
+        assert cache.contains("getFoilCoords", "A")
+        assert not cache.contains("polarList", "A")
+        assert not cache.contains("getPolar", "A", "T1", False, False)
+        assert cache.contains("polarList", "B")
+        cache.before_call("defineAnalysis2D", ({},))
+        assert len(cache) == 1 and cache.contains("getFoilCoords", "A")
+
+    def test_lru_eviction(self):
+        cache = CallCache(maxsize=2)
+        cache.store("getFoil", ("A",), 1)
+        cache.store("getFoil", ("B",), 2)
+        cache.lookup("getFoil", ("A",))
+        cache.store("getFoil", ("C",), 3)
+        assert cache.contains("getFoil", "A")
+        assert not cache.contains("getFoil", "B")
+        assert cache.contains("getFoil", "C")
+
+    def test_disabled(self):
+        cache = CallCache(maxsize=0)
+        cache.store("getFoil", ("A",), 1)
+        assert len(cache) == 0
+
+
+class TestClientCache(unittest.TestCase):
+
+    def test_analysis_keeps_coordinates(self):
+        with FakeServer() as server:
+            client = Client().connect(port=server.port, timeout=5)
+            analysis = client.foils.create_naca_foil(12).analyses.create(reynolds=1e5)
+            client.call("getFoilCoords", "NACA 0012")
+            client.call_count.clear()
+            for _ in range(3):
+                analysis.run_analysis(sequence=(0, 2, 1))
+                client.call("getFoilCoords", "NACA 0012")
+            assert client.call_count['analyzePolar'] == 3
+            assert client.call_count['getFoilCoords'] == 0
+            client.close()
@@ -7,27 +7,39 @@ import pytest
 class TestClient(unittest.TestCase, TestBase):
     
     def test_connection(self):
-        c = Client()
+        c = self.client
         assert c.is_connected == True
         assert 'connected' in c.state
         assert 'display' in c.state
         assert '<XFLRClient>' in c.__repr__()
 
     def test_call_after_close(self):
-        c = Client()
+        c = self.client
         assert c.is_connected == True
         c.close()
         with pytest.raises(exceptions.ClientNotConnectedException) as e_info:
             c.state
  
-    def test_singleton(self):
-        c = Client()
+    def test_reconnect(self):
+        c = self.client
         assert c.is_connected == True
         c.close()
         assert c.is_connected == False
-        c = Client().connect()
+        c.connect()
         assert c.is_connected == True
 
+    def test_independent_instances(self):
+        c1 = self.client
+        c2 = Client().connect()
+        assert c1 is not c2
+        assert c2.is_connected == True
+        f = c2.foils.create_naca_foil(1111)
+        assert f._client is c2
+        assert 'NACA 1111' in c1.foils
+        c2.close()
+        assert c2.is_connected == False
+        assert c1.is_connected == True
+
     # def test_timeout_connection(self):
     #     c = Client()
     #     c.close()
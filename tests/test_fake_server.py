@@ -0,0 +1,74 @@
+import unittest
+import os
+import subprocess
+import sys
+import time
+import pytest
+import msgpackrpc as rpc
+from xflrpy import Client
+from xflrpy.fake_server import FakeServer
+
+FOLDER = os.path.dirname(__file__)
+
+
+class TestFakeServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer()
+        self.client = Client().connect(port=self.server.start(), timeout=5)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_naca_geometry(self):
+        foil = self.client.foils.create_naca_foil(2412)
+        assert foil.thickness == pytest.approx(0.12, abs=0.002)
+        assert foil.camber == pytest.approx(0.02, abs=0.002)
+        assert foil.camber_x == pytest.approx(0.4, abs=0.02)
+
+    def test_load_dat(self):
+        self.client.foils.load([os.path.join(FOLDER, 'goe445.DAT')])
+        foil = self.client.foils.get('GOE 445 AIRFOIL')
+        assert foil.coordinates[0] == [1.0, 0.0]
+        assert foil.thickness > 0
+
+    def test_analysis_accumulates(self):
+        analysis = self.client.foils.create_naca_foil(12).analyses.create(reynolds=100000)
+        assert len(analysis.run_analysis(sequence=(0, 5, 1))) == 5
+        analysis.run_analysis(sequence=(3, 8, 1))
+        assert list(analysis.polar.alpha) == [0, 1, 2, 3, 4, 5, 6, 7]
+        assert len(analysis.op_points) == 8
+
+    def test_planes(self):
+        self.client.call("addDefaultPlane", "glider")
+        assert "glider" in self.client.planes and len(self.client.planes) == 1
+        detail = self.client.planes["glider"].detail
+        assert detail["Wing Span"] == {'value': 2.0, 'unit': 'm'}
+        assert detail["Aspect ratio"]["value"] == pytest.approx(2.0 ** 2 / 0.3, rel=1e-4)
+
+    def test_polar_points(self):
+        self.server.polar_points = 5000
+        analysis = self.client.foils.create_naca_foil(12).analyses.create(reynolds=100000)
+        assert len(analysis.polar) == 5000
+
+    def test_unknown_method(self):
+        with pytest.raises(rpc.error.RPCError):
+            self.client.call("noSuchCall")
+
+
+class TestFakeServerProcess(unittest.TestCase):
+
+    def test_subprocess(self):
+        proc = subprocess.Popen([sys.executable, "-m", "xflrpy.fake_server", "--port", "18765", "--latency", "0.01"],
+                                stdout=subprocess.PIPE, text=True)
+        try:
+            assert "listening" in proc.stdout.readline()
+            client = Client().connect(port=18765, timeout=5)
+            start = time.time()
+            assert client.call("ping")
+            assert time.time() - start >= 0.01
+            client.close()
+        finally:
+            proc.terminate()
+            proc.wait()
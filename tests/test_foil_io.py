@@ -0,0 +1,55 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+import pytest
+from xflrpy import foil_io, geometry, exceptions
+
+FOLDER = os.path.dirname(__file__)
+
+
+class TestFoilIO(unittest.TestCase):
+
+    def test_read_selig(self):
+        name, xy = foil_io.read_dat(os.path.join(FOLDER, 'goe445.DAT'))
+        assert name == 'GOE 445 AIRFOIL'
+        assert xy.shape == (33, 2)
+        assert xy[0].tolist() == [1.0, 0.0]
+        assert xy[np.argmin(xy[:, 0])].tolist() == [0.0, 0.0]
+
+    def test_lednicer_round_trip(self):
+        name, xy = foil_io.read_dat(os.path.join(FOLDER, 'goe445.DAT'))
+        text = foil_io.format_dat(name, xy, lednicer=True)
+        assert text.split("\n")[1].split() == ['17.', '17.']
+        parsed_name, parsed = foil_io.parse_dat(text)
+        assert parsed_name == name
+        np.testing.assert_array_equal(parsed, xy)
+
+    def test_format_matches_previous_to_dat(self):
+        xy = geometry.naca(2412, 20)
+        expected = "NACA 2412\r\n" + "".join(f'  {x:.6f}  {y:.6f}\r\n' for x, y in xy)
+        assert foil_io.format_dat("NACA 2412", xy, "\r\n") == expected
+
+    def test_no_name_line(self):
+        name, xy = foil_io.parse_dat("1.0 0.0\n0.0 0.0\n1.0 0.0\n", name="file")
+        assert name == "file"
+        assert xy.shape == (3, 2)
+        with pytest.raises(exceptions.InvalidFoilFileError):
+            foil_io.parse_dat("Broken\n1.0 abc\n")
+
+    def test_read_folder(self):
+        folder = tempfile.mkdtemp()
+        try:
+            for i in range(20):
+                foil_io.write_dat(os.path.join(folder, f'foil{i}.dat'), f'Foil {i}', geometry.naca(2400 + i))
+            with open(os.path.join(folder, 'broken.dat'), 'w') as f:
+                f.write('Broken\n')
+            foils, errors = foil_io.read_folder(folder, workers=4)
+            assert len(foils) == 20
+            assert list(errors) == [os.path.join(folder, 'broken.dat')]
+            name, xy = foils[os.path.join(folder, 'foil12.dat')]
+            assert name == 'Foil 12'
+            np.testing.assert_allclose(xy, geometry.naca(2412), atol=1e-6)
+        finally:
+            shutil.rmtree(folder)
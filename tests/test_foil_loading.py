@@ -0,0 +1,54 @@
+import unittest
+import os
+import shutil
+import tempfile
+import pytest
+from xflrpy import Client, exceptions
+from xflrpy.fake_server import FakeServer
+
+FOLDER = os.path.dirname(__file__)
+
+
+class TestBulkLoading(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer()
+        self.client = Client().connect(port=self.server.start(), timeout=5)
+        self.folder = tempfile.mkdtemp()
+        source = open(os.path.join(FOLDER, 'goe445.DAT')).read().split('\n', 1)[1]
+        for i in range(25):
+            with open(os.path.join(self.folder, f'foil{i:02d}.dat'), 'w') as f:
+                f.write(f'Foil {i}\n' + source)
+        with open(os.path.join(self.folder, 'broken.dat'), 'w') as f:
+            f.write('Broken\n1.0 abc\n')
+        with open(os.path.join(self.folder, 'notes.txt'), 'w') as f:
+            f.write('not a foil')
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        shutil.rmtree(self.folder)
+
+    def test_load_folder(self):
+        calls = self.server.call_count
+        report = self.client.foils.load_folder(self.folder, chunk_size=10)
+        assert len(report.loaded) == 25
+        assert list(report.errors) == [os.path.join(self.folder, 'broken.dat')]
+        assert not report.ok
+        assert len(self.client.foils) == 25
+        # module switch, validation, 3 chunks, 10 retries of the chunk holding the broken file and the length check
+        assert self.server.call_count - calls <= 17
+
+    def test_load_many_reports_invalid_paths(self):
+        paths = [os.path.join(self.folder, 'foil00.dat'), os.path.join(self.folder, 'notes.txt'),
+                 os.path.join(self.folder, 'missing.dat')]
+        report = self.client.foils.load_many(paths)
+        assert report.loaded == paths[:1]
+        assert all(type(e) == exceptions.InvalidFoilPathError for e in report.errors.values())
+        assert set(report.errors) == set(paths[1:])
+
+    def test_load_raises(self):
+        with pytest.raises(exceptions.InvalidFoilPathError):
+            self.client.foils.load([os.path.join(self.folder, 'foil00.dat'), os.path.join(self.folder, 'missing.dat')])
+        self.client.foils.load([os.path.join(self.folder, f'foil{i:02d}.dat') for i in range(5)], chunk_size=2)
+        assert len(self.client.foils) == 5
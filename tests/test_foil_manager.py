@@ -1,5 +1,5 @@
 import unittest
-from xflrpy import Client, exceptions
+from xflrpy import exceptions
 from xflrpy.foil import Foil
 import pathlib
 import os
@@ -8,7 +8,6 @@ import pytest
 
 FOLDER = pathlib.Path(__file__).parent.resolve()
 
-C = Client()
 
 
     
@@ -16,49 +15,61 @@ C = Client()
 class TestFoilManager(unittest.TestCase, TestBase):
 
     def test_get_foil(self):
-        C.foils.delete_all()
-        f1a = C.foils.create_naca_foil(1111)
-        f2a = C.foils.create_naca_foil(2222)
+        self.client.foils.delete_all()
+        f1a = self.client.foils.create_naca_foil(1111)
+        f2a = self.client.foils.create_naca_foil(2222)
         
-        f1b = C.foils['NACA 1111']
+        f1b = self.client.foils['NACA 1111']
         assert type(f1b) == Foil
         assert f1a == f1b
-        f2b = C.foils['NACA 2222']
+        f2b = self.client.foils['NACA 2222']
         assert type(f2b) == Foil
         assert f2a == f2b
 
         with pytest.raises(KeyError) as e_info:
-            C.foils['NACA3333']
+            self.client.foils['NACA3333']
         with pytest.raises(KeyError) as e_info:
-            C.foils['']
+            self.client.foils['']
         with pytest.raises(IndexError) as e_info:
-            C.foils[10]
+            self.client.foils[10]
         
-        assert len(C.foils) == 2
+        assert len(self.client.foils) == 2
         f1a.delete()
         f2a.delete()
         f1b.delete()
         f2b.delete()
-        assert len(C.foils) == 0
+        assert len(self.client.foils) == 0
     
+    def test_get_many(self):
+        self.client.foils.create_naca_foil(1111)
+        self.client.foils.create_naca_foil(2222)
+        foils = self.client.foils.get_many(['NACA 2222', 'NACA 1111'])
+        assert [f.name for f in foils] == ['NACA 2222', 'NACA 1111']
+        assert foils[0] == self.client.foils['NACA 2222']
+        assert foils[1] == self.client.foils['NACA 1111']
+
+        with pytest.raises(KeyError) as e_info:
+            self.client.foils.get_many(['NACA 1111', 'NACA3333'])
+        self.client.foils.delete_all()
+
     def test_load_get_delete_foils(self):
         # an invalid path should throw an exception
         with pytest.raises(exceptions.InvalidFoilPathError) as e_info:
-            C.foils.load('invalidfileasdf')
+            self.client.foils.load('invalidfileasdf')
         with pytest.raises(exceptions.InvalidFoilPathError) as e_info:
-            C.foils.load(['invalidfileasdf'])
+            self.client.foils.load(['invalidfileasdf'])
         with pytest.raises(exceptions.InvalidFoilPathError) as e_info:
-            C.foils.load(['invalidfileasdf','t'])
+            self.client.foils.load(['invalidfileasdf','t'])
         with pytest.raises(exceptions.InvalidFoilPathError) as e_info:
-            C.foils.load(['filedoesnotexist.dat',os.path.join(FOLDER,'Zone-21.dat')])
+            self.client.foils.load(['filedoesnotexist.dat',os.path.join(FOLDER,'Zone-21.dat')])
 
         # test valid foils are loaded
-        C.foils.load([os.path.join(FOLDER,'Zone-21.dat'), os.path.join(FOLDER,'goe445.DAT')])
-        assert len(C.foils) == 2
+        self.client.foils.load([os.path.join(FOLDER,'Zone-21.dat'), os.path.join(FOLDER,'goe445.DAT')])
+        assert len(self.client.foils) == 2
 
         # test get foil
-        f1 = C.foils['Zone-21']
-        f2 = C.foils['GOE 445 AIRFOIL']
+        f1 = self.client.foils['Zone-21']
+        f2 = self.client.foils['GOE 445 AIRFOIL']
         assert f1.name == 'Zone-21'
         assert f2.name == 'GOE 445 AIRFOIL'
         
@@ -67,10 +78,10 @@ class TestFoilManager(unittest.TestCase, TestBase):
 
         # Try to load a foil that does not exist
         with pytest.raises(exceptions.InvalidFoilPathError) as e_info:
-            C.foils.load('invalidfileasdf')
+            self.client.foils.load('invalidfileasdf')
 
-        C.foils.load_folder(FOLDER)
-        C.foils.delete_all()
+        self.client.foils.load_folder(FOLDER)
+        self.client.foils.delete_all()
     
     def test_create_naca_foil(self):
         # test with some valid foils first
@@ -91,17 +102,23 @@ class TestFoilManager(unittest.TestCase, TestBase):
         assert self._create_bad_foil('0')
         assert self._create_bad_foil(10000)
         assert self._create_bad_foil('#') 
+        assert self._create_bad_foil('-1234')
+        assert self._create_bad_foil('00000')
+        assert self._create_bad_foil('2.412')
+        # 5 digit values are validated before their coordinates are generated
+        with pytest.raises(exceptions.InvalidNacaValueError, match="positive, 5 digit"):
+            self.client.foils.create_naca_foil('00000')
 
     
     def _create_and_validate_thickness(self, value, expected, max_diference = 0.0001):
-        f = C.foils.create_naca_foil(value)
+        f = self.client.foils.create_naca_foil(value)
         res =  abs(f.thickness - expected) < max_diference
         f.delete()
         return res
     
     def _create_bad_foil(self, value):
         try:
-            f = C.foils.create_naca_foil(value)
+            f = self.client.foils.create_naca_foil(value)
         except exceptions.InvalidNacaValueError:
             return True
         f.delete()
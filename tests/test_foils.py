@@ -1,5 +1,5 @@
 import unittest
-from xflrpy import Client, exceptions
+from xflrpy import exceptions
 from xflrpy.foil import Foil
 import pathlib
 import os
@@ -8,7 +8,6 @@ from base_test import TestBase
 
 FOLDER = pathlib.Path(__file__).parent.resolve()
 
-C = Client()
 
 
 
@@ -16,15 +15,15 @@ C = Client()
 class TestFoils(unittest.TestCase, TestBase):
 
     def test_duplicate_foil(self):
-        C.foils.load(os.path.join(FOLDER,'goe445.DAT'))
-        f1 = C.foils.get('GOE 445 AIRFOIL')
+        self.client.foils.load(os.path.join(FOLDER,'goe445.DAT'))
+        f1 = self.client.foils.get('GOE 445 AIRFOIL')
         f2 = f1.duplicate('GOE COPY')
         # make sure other foil was returned and properties match
         assert f2.name == 'GOE COPY'
         assert f1 == f2
         # check both exist on the server
-        assert 'GOE COPY' in C.foils
-        assert 'GOE 445 AIRFOIL' in C.foils
+        assert 'GOE COPY' in self.client.foils
+        assert 'GOE 445 AIRFOIL' in self.client.foils
 
         # modify geometry and compare changes impact correct foil
         f1.set_geometry(thickness=0.15)
@@ -36,20 +35,20 @@ class TestFoils(unittest.TestCase, TestBase):
         f2.delete()
     
     def test_rename_foil(self):
-        C.foils.load(os.path.join(FOLDER,'goe445.DAT'))
-        f1 = C.foils.get('GOE 445 AIRFOIL')
+        self.client.foils.load(os.path.join(FOLDER,'goe445.DAT'))
+        f1 = self.client.foils.get('GOE 445 AIRFOIL')
         f2 = f1.duplicate('GOE COPY')
         f2.rename('RENAMED')
-        f2b = C.foils.get('RENAMED')
+        f2b = self.client.foils.get('RENAMED')
 
         assert f2.name == f2b.name
         assert f1 == f2
         assert f2 == f2b
 
         # validate expected foils on the client
-        assert 'GOE 445 AIRFOIL' in C.foils
-        assert 'GOE COPY' not in C.foils
-        assert 'RENAMED' in C.foils
+        assert 'GOE 445 AIRFOIL' in self.client.foils
+        assert 'GOE COPY' not in self.client.foils
+        assert 'RENAMED' in self.client.foils
 
         # modify geometry and compare changes impact correct foil
         f1.set_geometry(thickness=0.15)
@@ -64,8 +63,8 @@ class TestFoils(unittest.TestCase, TestBase):
 
 
     def test_foil_normalize(self):
-        C.foils.load(os.path.join(FOLDER,'funky_foil.dat'))
-        f1 = C.foils.get('Funky Foil')
+        self.client.foils.load(os.path.join(FOLDER,'funky_foil.dat'))
+        f1 = self.client.foils.get('Funky Foil')
         f2 = f1.duplicate('Funky Foil Copy')
         assert f1 == f2
 
@@ -79,8 +78,8 @@ class TestFoils(unittest.TestCase, TestBase):
 
 
     def test_foil_visibility(self):
-        C.foils.load(os.path.join(FOLDER,'goe445.DAT'))
-        f1 = C.foils.get('GOE 445 AIRFOIL')
+        self.client.foils.load(os.path.join(FOLDER,'goe445.DAT'))
+        f1 = self.client.foils.get('GOE 445 AIRFOIL')
         f2 = f1.duplicate('GOE COPY')
         f3 = f1.duplicate('GOE COPY2')
 
@@ -101,12 +100,12 @@ class TestFoils(unittest.TestCase, TestBase):
         assert f2.is_visible 
         assert not f3.is_visible 
 
-        C.foils.hide_all()
+        self.client.foils.hide_all()
         assert not f1.is_visible 
         assert not f2.is_visible 
         assert not f3.is_visible 
 
-        C.foils.show_all()
+        self.client.foils.show_all()
         assert f1.is_visible 
         assert f2.is_visible 
         assert f3.is_visible 
@@ -117,10 +116,10 @@ class TestFoils(unittest.TestCase, TestBase):
 
 
     def test_set_coordinates(self):
-        C.foils.load(os.path.join(FOLDER,'goe445.DAT'))
-        C.foils.load(os.path.join(FOLDER,'funky_foil.dat'))
-        f1 = C.foils.get('GOE 445 AIRFOIL')
-        f2 = C.foils.get('Funky Foil')
+        self.client.foils.load(os.path.join(FOLDER,'goe445.DAT'))
+        self.client.foils.load(os.path.join(FOLDER,'funky_foil.dat'))
+        f1 = self.client.foils.get('GOE 445 AIRFOIL')
+        f2 = self.client.foils.get('Funky Foil')
         f1_mod = f1.duplicate('GOE COPY')
 
         f1_mod.set_coordinates(f2.coordinates)
@@ -136,16 +135,16 @@ class TestFoils(unittest.TestCase, TestBase):
         fp = os.path.join(FOLDER,fn)
         if os.path.exists(fp):
             os.remove(fp)
-        C.foils.load(os.path.join(FOLDER,'goe445.dat'))
-        f1 = C.foils.get('GOE 445 AIRFOIL')
+        self.client.foils.load(os.path.join(FOLDER,'goe445.dat'))
+        f1 = self.client.foils.get('GOE 445 AIRFOIL')
         assert not os.path.exists(fp)
         f1.export(fp)
         assert os.path.exists(fp)
         f1.delete()
 
     def test_foil_derotate(self):
-        C.foils.load(os.path.join(FOLDER,'funky_foil.dat'))
-        f1 = C.foils.get('Funky Foil')
+        self.client.foils.load(os.path.join(FOLDER,'funky_foil.dat'))
+        f1 = self.client.foils.get('Funky Foil')
         f2 = f1.duplicate('Funky Foil Copy')
         assert f1 == f2
         f2.derotate()
@@ -154,8 +153,8 @@ class TestFoils(unittest.TestCase, TestBase):
         f2.delete()
     
     def test_to_dat(self):
-        C.foils.load(os.path.join(FOLDER,'goe445.DAT'))
-        f1 = C.foils.get('GOE 445 AIRFOIL')
+        self.client.foils.load(os.path.join(FOLDER,'goe445.DAT'))
+        f1 = self.client.foils.get('GOE 445 AIRFOIL')
         dat = f1.to_dat()
         assert f1.name in dat.split("\n")[0]
         assert len(dat.split("\n")) > len(f1.coordinates) 
@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+import pytest
+from xflrpy import Client, geometry, exceptions
+from xflrpy.fake_server import FakeServer
+
+
+class TestGeometry(unittest.TestCase):
+
+    def test_naca4(self):
+        xy = geometry.naca(2412)
+        assert xy.shape == (199, 2)
+        np.testing.assert_allclose(xy[[0, 99, -1]], [[1, 0], [0, 0], [1, 0]], atol=1e-12)
+        measured = geometry.camber_thickness(xy)
+        assert measured['thickness'] == pytest.approx(0.12, abs=1e-3)
+        assert measured['camber'] == pytest.approx(0.02, abs=1e-3)
+        assert measured['camber_x'] == pytest.approx(0.4, abs=0.01)
+
+    def test_naca5(self):
+        measured = geometry.camber_thickness(geometry.naca("23012"))
+        assert measured['thickness'] == pytest.approx(0.12, abs=1e-3)
+        assert measured['camber_x'] == pytest.approx(0.15, abs=0.01)
+        with pytest.raises(exceptions.InvalidNacaValueError):
+            geometry.naca("21112")
+
+    def test_batch_matches_single(self):
+        m, p, t = np.array([0.0, 0.02, 0.04]), np.array([0.0, 0.4, 0.3]), np.array([0.09, 0.12, 0.15])
+        batch = geometry.naca4(m, p, t)
+        assert batch.shape == (3, 199, 2)
+        measured = geometry.camber_thickness(batch)
+        for i in range(3):
+            single = geometry.camber_thickness(batch[i])
+            assert measured['thickness'][i] == pytest.approx(single['thickness'])
+            assert measured['camber_x'][i] == pytest.approx(single['camber_x'])
+        np.testing.assert_allclose(measured['thickness'], t, atol=1e-3)
+
+    def test_normalize(self):
+        xy = geometry.naca(2412)
+        angle = 0.1
+        rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        moved = 2.5 * xy @ rotation.T + [3.0, 1.0]
+        np.testing.assert_allclose(geometry.normalize(moved), xy, atol=1e-2)
+        np.testing.assert_allclose(geometry.normalize(np.stack([moved, moved]))[1], xy, atol=1e-2)
+        assert geometry.normalize(moved)[0].tolist() == [1, 0]
+
+    def test_set_camber_thickness(self):
+        xy = geometry.set_camber_thickness(geometry.naca(2412), camber=0.04, thickness=0.1, thickness_x=0.4)
+        measured = geometry.camber_thickness(xy)
+        assert measured['camber'] == pytest.approx(0.04, abs=1e-3)
+        assert measured['camber_x'] == pytest.approx(0.4, abs=0.01)
+        assert measured['thickness'] == pytest.approx(0.1, abs=1e-3)
+        assert measured['thickness_x'] == pytest.approx(0.4, abs=0.02)
+
+    def test_resample(self):
+        batch = geometry.resample([geometry.naca(12, 50), geometry.naca(2412, 80)], 60)
+        assert batch.shape == (2, 119, 2)
+
+
+class TestCreateFromCoordinates(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer()
+        self.client = Client().connect(port=self.server.start(), timeout=5)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_create_many(self):
+        batch = geometry.naca4(np.full(5, 0.02), np.full(5, 0.4), np.linspace(0.08, 0.16, 5))
+        foils = self.client.foils.create_many({f'candidate {i}': xy for i, xy in enumerate(batch)})
+        assert [f.name for f in foils] == [f'candidate {i}' for i in range(5)]
+        assert [round(f.thickness, 2) for f in foils] == [0.08, 0.1, 0.12, 0.14, 0.16]
+        np.testing.assert_allclose(foils[2].coordinate_array, batch[2])
+
+    def test_naca5_foil(self):
+        foil = self.client.foils.create_naca_foil("23012")
+        assert foil.name == 'NACA 23012'
+        assert foil.thickness == pytest.approx(0.12, abs=1e-3)
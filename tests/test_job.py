@@ -0,0 +1,119 @@
+import unittest
+import time
+import pytest
+from msgpackrpc.error import RPCError, TimeoutError
+from xflrpy import Client
+from xflrpy.exceptions import JobCancelledError, JobTimeoutError
+from xflrpy.fake_server import FakeServer
+from xflrpy.polar2d import Analysis2d, PolarResultType
+
+
+class TestJob(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(polar_time=0.03)
+        self.server.start()
+        self.client = Client()
+        self.client.connect(port=self.server.port)
+        self.poller = Client()
+        self.poller.connect(port=self.server.port)
+        self.foils = [self.client.foils.create_naca_foil(d) for d in (12, 2412, 4412)]
+
+    def tearDown(self):
+        self.poller.close()
+        self.client.close()
+        self.server.stop()
+
+    def test_batch_job(self):
+        job = self.client.foils.submit_batch_analysis([1e5, 2e5], self.foils, poller=self.poller,
+                                                      sequence=(0, 5, 1))
+        assert not job.done()
+        with pytest.raises(JobTimeoutError):
+            job.result(timeout=0.01)
+        progress = [job.progress()]
+        while not job.done():
+            time.sleep(0.02)
+            progress.append(job.progress())
+        progress.append(job.progress())
+        assert progress == sorted(progress)
+        assert 0 <= progress[0] < 1 and progress[-1] == 1.0
+        assert job.result(timeout=1) is None
+        assert len(self.client.foils.batch_results(self.foils).polars) == 6
+
+    def test_done_without_poller(self):
+        job = self.client.foils.submit_batch_analysis([1e5], self.foils[:1], sequence=(0, 5, 1))
+        assert job.progress() is None
+        deadline = time.time() + 5
+        while not job.done():
+            assert time.time() < deadline
+            time.sleep(0.01)
+        assert job.progress() == 1.0
+        assert len(self.client.foils.batch_results(self.foils[:1]).polars) == 1
+
+    def test_cancel(self):
+        job = self.client.foils.submit_batch_analysis([1e5, 2e5], self.foils, sequence=(0, 5, 1))
+        assert job.progress() is None
+        assert job.cancel()
+        assert job.done() and job.cancelled()
+        assert not job.cancel()
+        with pytest.raises(JobCancelledError):
+            job.result()
+        # the request is still sent with the next call, and the server finishes the batch
+        self.client.call("ping")
+        time.sleep(0.4)
+        assert len(self.client.foils.batch_results(self.foils).polars) == 6
+
+    def test_analysis_job(self):
+        analysis = Analysis2d.create(self.foils[1].name, 'job', reynolds=1e5, client=self.client)
+        job = analysis.submit_analysis(sequence=(0, 5, 1), poller=self.poller,
+                                       op_point_values=[PolarResultType.ALPHA, PolarResultType.CL])
+        result = job.result(timeout=5)
+        assert len(result) == 5 and result.keys == ['alpha', 'Cl']
+        assert job.result() is result
+        assert job.progress() == 1.0
+        analysis.delete()
+        with pytest.raises(RPCError):
+            analysis._client.submit("analyzePolar", analysis._xflr_polar, {'sequence': (0, 1, 1)}, [0]).result()
+
+
+class TestDeadlines(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer()
+        self.server.start()
+        self.client = Client()
+        self.client.connect(port=self.server.port)
+        self.client.foils.create_naca_foil(12)
+        self.client.cache.clear()
+        self.server.latency = 0.5
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_call_timeout(self):
+        start = time.time()
+        with pytest.raises(TimeoutError):
+            self.client.call("getFoilCoords", "NACA 0012", timeout=0.05)
+        assert time.time() - start < 0.3
+        self.client.timeouts["foilList"] = 0.05
+        with pytest.raises(TimeoutError):
+            self.client.call("foilList")
+        assert self.client.metrics.methods["foilList"].errors == 1
+        self.server.latency = 0
+        assert self.client.call("foilList")[0]["name"] == "NACA 0012"
+
+    def test_call_timeout_kwargs(self):
+        # keyword arguments reach the rpc client whether or not the call has a timeout
+        self.server.latency = 0
+        for timeout in (None, 0.5):
+            with pytest.raises(TypeError):
+                self.client.call("foilList", timeout=timeout, unknown=1)
+        assert self.client.metrics.methods["foilList"].errors == 2
+
+    def test_call_many_timeout(self):
+        start = time.time()
+        results = self.client.call_many([("getFoil", ("NACA 0012",)), ("foilList", ())], return_exceptions=True,
+                                        timeout=0.05)
+        assert time.time() - start < 0.3
+        assert all(isinstance(r, TimeoutError) for r in results)
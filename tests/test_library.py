@@ -0,0 +1,69 @@
+import unittest
+import logging
+import os
+import shutil
+import tempfile
+import numpy as np
+from xflrpy import Client, foil_io, geometry
+from xflrpy.fake_server import FakeServer
+from xflrpy.library import FoilLibrary
+
+
+class TestFoilLibrary(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        batch = geometry.naca4(rng.uniform(0, 0.06, 200), rng.uniform(0.2, 0.6, 200), rng.uniform(0.06, 0.2, 200), 80)
+        foils = {f'random {i}': xy for i, xy in enumerate(batch)}
+        foils['NACA 2412'] = geometry.naca(2412, 60)
+        self.library = FoilLibrary.build(os.path.join(self.folder, 'lib'), foils)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_reopen(self):
+        library = FoilLibrary(self.library.path)
+        assert len(library) == 201
+        assert 'NACA 2412' in library
+        assert isinstance(library._coords, np.memmap)
+        np.testing.assert_array_equal(library.coordinates('NACA 2412'), self.library.coordinates('NACA 2412'))
+
+    def test_features_and_query(self):
+        feature = self.library.feature('NACA 2412')
+        assert abs(feature['thickness'] - 0.12) < 1e-3
+        assert abs(feature['camber'] - 0.02) < 1e-3
+        names = self.library.query(thickness=(0.119, 0.121), camber=(None, 0.021))
+        assert 'NACA 2412' in names
+        thickness = self.library.features[:, 2]
+        assert len(self.library.query(thickness=(0.15, None))) == np.count_nonzero(thickness >= 0.15)
+
+    def test_nearest_is_independent_of_discretization(self):
+        result = self.library.nearest(geometry.naca(2412, 150), k=5)
+        assert result[0][0] == 'NACA 2412'
+        assert [d for _, d in result] == sorted(d for _, d in result)
+        many = self.library.nearest_many([geometry.naca(2412, 150), self.library.coordinates('random 7')], k=3)
+        assert [name for name, _ in many[0]] == [name for name, _ in result[:3]]
+        assert many[1][0][0] == 'random 7'
+
+    def test_nearest_in_empty_library(self):
+        library = FoilLibrary.build(os.path.join(self.folder, 'empty'), {})
+        assert library.nearest(geometry.naca(2412)) == []
+        assert self.library.nearest_many([geometry.naca(2412)] * 2, k=0) == [[], []]
+
+    def test_build_from_folder_and_push(self):
+        dat_folder = os.path.join(self.folder, 'dat')
+        os.mkdir(dat_folder)
+        for digits in (12, 2412, 4415):
+            foil_io.write_dat(os.path.join(dat_folder, f'naca{digits}.dat'), f'NACA {digits:04d}', geometry.naca(digits))
+        with open(os.path.join(dat_folder, 'broken.dat'), 'w') as f:
+            f.write('broken\n')
+        with self.assertLogs("xflrpy", logging.WARNING) as logs:
+            library = FoilLibrary.build(os.path.join(self.folder, 'lib2'), dat_folder)
+        assert library.names == ['NACA 0012', 'NACA 2412', 'NACA 4415']
+        assert 'broken.dat skipped' in logs.output[0]
+        with FakeServer() as server:
+            client = Client().connect(port=server.port, timeout=5)
+            foils = library.push(client, ['NACA 4415'])
+            assert abs(foils[0].thickness - 0.15) < 1e-3
+            client.close()
@@ -0,0 +1,55 @@
+import unittest
+import io
+import logging
+from contextlib import redirect_stdout, redirect_stderr
+from xflrpy import Client
+from xflrpy.fake_server import FakeServer
+from xflrpy.log import enable_logging, logger
+
+
+class TestCallLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer()
+        self.client = Client().connect(port=self.server.start(), timeout=5)
+        self.client.foils.create_naca_foil(12)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_silent_by_default(self):
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            self.client.call("setFoilCoords", "NACA 0012", [[1.0, 0.0]] * 1000, False)
+        assert out.getvalue() == ''
+        assert err.getvalue() == ''
+
+    def test_debug_previews_are_truncated(self):
+        with self.assertLogs("xflrpy", logging.DEBUG) as logs:
+            self.client.call("setFoilCoords", "NACA 0012", [[1.0, 0.0]] * 1000, False)
+            self.client.call("getFoilCoords", "NACA 0012")
+            self.client.call("getFoilCoords", "NACA 0012")
+        messages = [r.getMessage() for r in logs.records]
+        assert any('started: setFoilCoords' in m for m in messages)
+        assert any('served from cache' in m for m in messages)
+        assert all(len(m) < 300 for m in messages)
+        # every started call has a matching completion with the same id
+        started = [m.split('call ')[1].split(' ')[0] for m in messages if 'started' in m]
+        complete = [m.split('call ')[1].split(' ')[0] for m in messages if 'complete' in m]
+        assert started == complete
+
+    def test_enable_logging_once(self):
+        handlers = list(logger.handlers)
+        try:
+            enable_logging(logging.INFO)
+            enable_logging(logging.DEBUG)
+            assert len(logger.handlers) == len(handlers) + 1
+            assert logger.level == logging.DEBUG
+            handler = logging.NullHandler()
+            enable_logging(handler=handler)
+            enable_logging(handler=handler)
+            assert logger.handlers.count(handler) == 1
+        finally:
+            logger.handlers = handlers
+            logger.setLevel(logging.NOTSET)
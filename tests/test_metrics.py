@@ -0,0 +1,82 @@
+import unittest
+import json
+import os
+import tempfile
+import time
+from xflrpy import Client
+from xflrpy.metrics import MethodStats
+from xflrpy.fake_server import FakeServer
+
+
+class TestMethodStats(unittest.TestCase):
+
+    def test_percentiles(self):
+        stats = MethodStats()
+        for i in range(100):
+            stats.record(0.001 * (i + 1))
+        assert stats.count == 100
+        assert 0.04 < stats.percentile(50) < 0.06
+        assert 0.08 < stats.percentile(99) <= 0.1
+        assert stats.percentile(100) == stats.max_time
+        assert MethodStats().percentile(50) is None
+
+
+class TestCallMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer()
+        self.client = Client().connect(port=self.server.start(), timeout=5)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_records_calls(self):
+        self.client.metrics.reset()
+        self.client.metrics.measure_bytes = True
+        foil = self.client.foils.create_naca_foil(12)
+        foil.set_coordinates([[1.0, 0.0], [0.0, 0.0], [1.0, 0.0]])
+        with self.assertRaises(Exception):
+            self.client.call("getFoil", "missing foil")
+        snapshot = self.client.metrics.snapshot()
+        methods = snapshot['methods']
+        assert methods['createNACAFoil']['count'] == 1
+        assert methods['getFoil']['errors'] == 1
+        assert methods['setFoilCoords']['request_bytes'] > 0
+        assert methods['getFoil']['response_bytes'] > 0
+        assert snapshot['in_flight'] == 0
+        json.loads(self.client.metrics.to_json())
+
+    def test_pipelined_concurrency(self):
+        self.client.metrics.reset()
+        self.client.call_many([("ping", ())] * 20)
+        snapshot = self.client.metrics.snapshot()
+        assert snapshot['methods']['ping']['count'] == 20
+        assert snapshot['max_in_flight'] == 20
+        assert snapshot['in_flight'] == 0
+
+    def test_dumps(self):
+        self.client.call("ping")
+        with tempfile.TemporaryDirectory() as folder:
+            self.client.metrics.to_json(os.path.join(folder, 'metrics.json'))
+            text = self.client.metrics.to_prometheus(os.path.join(folder, 'metrics.prom'))
+            with open(os.path.join(folder, 'metrics.json')) as f:
+                assert 'ping' in json.load(f)['methods']
+        assert 'xflrpy_rpc_latency_seconds_count{method="ping"}' in text
+        assert 'le="+Inf"' in text
+
+    def test_pipelined_timeout(self):
+        self.client.metrics.reset()
+        self.server.latency = 0.3
+        results = self.client.call_many([("ping", ())] * 3, return_exceptions=True, timeout=0.05)
+        assert all(isinstance(result, Exception) for result in results)
+        snapshot = self.client.metrics.snapshot()
+        assert snapshot['in_flight'] == 0
+        assert snapshot['methods']['ping']['errors'] == 3
+        # the late responses are not counted again
+        time.sleep(0.4)
+        self.server.latency = 0
+        self.client.call("getState")
+        snapshot = self.client.metrics.snapshot()
+        assert snapshot['methods']['ping']['count'] == 3
+        assert snapshot['in_flight'] == 0
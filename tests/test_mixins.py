@@ -0,0 +1,46 @@
+import unittest
+import pytest
+from xflrpy.mixins import DictListInterface
+
+
+class CountingItems(DictListInterface):
+    def __init__(self, items):
+        self.items = items
+        self.fetches = 0
+
+    def _get_items(self) -> dict:
+        self.fetches += 1
+        return dict(self.items)
+
+
+class TestDictListInterface(unittest.TestCase):
+
+    def test_iteration_fetches_once(self):
+        items = CountingItems({str(i): i for i in range(1000)})
+        assert [i for i in items] == list(range(1000))
+        assert items.fetches == 1
+
+    def test_single_fetch_per_operation(self):
+        items = CountingItems({'a': 1, 'b': 2})
+        assert len(items) == 2
+        assert 'a' in items
+        assert items['b'] == 2
+        assert items[0] == 1
+        assert items() == [1, 2]
+        assert items.fetches == 5
+        with pytest.raises(KeyError):
+            items['c']
+        with pytest.raises(IndexError):
+            items[2]
+
+    def test_iteration_uses_snapshot(self):
+        items = CountingItems({'a': 1, 'b': 2})
+        seen = []
+        for value in items:
+            items.items.pop('b', None)
+            seen.append(value)
+        assert seen == [1, 2]
+
+    def test_nested_iteration(self):
+        items = CountingItems({'a': 1, 'b': 2})
+        assert [(x, y) for x in items for y in items] == [(1, 1), (1, 2), (2, 1), (2, 2)]
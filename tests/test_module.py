@@ -1,12 +1,11 @@
 import unittest
 from xflrpy.module import ModuleType
-from xflrpy import Client
 from base_test import TestBase
 
 class TestModule(unittest.TestCase, TestBase):
     
     def test_active(self):
-        client = Client()
+        client = self.client
         assert client.modules.active in ModuleType
         client.modules.set(ModuleType.DIRECTFOILDESIGN)
         assert client.modules.active == ModuleType.DIRECTFOILDESIGN
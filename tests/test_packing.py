@@ -0,0 +1,81 @@
+import unittest
+import asyncio
+import msgpack
+import numpy as np
+from xflrpy import Client, AsyncClient
+from xflrpy.packing import pack_array, unpack_array, encode_args, decode_arrays
+from xflrpy.fake_server import FakeServer
+
+COORDS = [[1.0, 0.0], [0.5, 0.06], [0.0, 0.0], [0.5, -0.04], [1.0, 0.0]]
+
+
+class TestPacking(unittest.TestCase):
+
+    def test_round_trip(self):
+        values = np.linspace(0, 1, 12).reshape(6, 2)
+        packed = msgpack.unpackb(msgpack.packb(pack_array(values)))
+        decoded = unpack_array(packed)
+        assert decoded.dtype == np.float64
+        np.testing.assert_array_equal(decoded, values)
+
+    def test_smaller_than_float_arrays(self):
+        values = np.random.default_rng(0).random(10000)
+        assert len(msgpack.packb(pack_array(values))) < 0.9 * len(msgpack.packb(values.tolist()))
+
+    def test_encode_args(self):
+        xy = np.array(COORDS)
+        assert encode_args(("foil", xy, True), False) == ("foil", COORDS, True)
+        assert isinstance(encode_args(("foil", xy, True), True)[1], msgpack.ExtType)
+
+    def test_decode_nested(self):
+        decoded = decode_arrays({'alpha': pack_array([0.0, 1.0]), 'names': ['a'], 'n': 2})
+        np.testing.assert_array_equal(decoded['alpha'], [0.0, 1.0])
+        assert decoded['names'] == ['a'] and decoded['n'] == 2
+
+
+class TestPackedConnection(unittest.TestCase):
+
+    def run_client(self, supports_packed_arrays):
+        server = FakeServer(supports_packed_arrays=supports_packed_arrays)
+        port = server.start()
+        client = Client().connect(port=port, timeout=5, packed_arrays=True)
+        try:
+            foil = client.foils.create_naca_foil(12)
+            foil.set_coordinates(np.array(COORDS))
+            analysis = foil.analyses.create(reynolds=100000)
+            result = analysis.run_analysis(sequence=(0, 3, 1))
+            return client.packed_arrays, foil.coordinates, foil.coordinate_array, result, analysis.polar
+        finally:
+            client.close()
+            server.stop()
+
+    def test_packed(self):
+        packed, coords, coord_array, result, polar = self.run_client(True)
+        assert packed
+        assert coords == COORDS
+        np.testing.assert_array_equal(coord_array, COORDS)
+        np.testing.assert_array_equal(polar.alpha, [0.0, 1.0, 2.0])
+        np.testing.assert_array_equal(polar.Cl, result.Cl)
+
+    def test_fallback(self):
+        packed, coords, coord_array, result, polar = self.run_client(False)
+        assert not packed
+        assert coords == COORDS
+        np.testing.assert_array_equal(coord_array, COORDS)
+        np.testing.assert_array_equal(polar.alpha, [0.0, 1.0, 2.0])
+        np.testing.assert_array_equal(polar.Cl, result.Cl)
+
+    def test_async_client(self):
+        async def scenario():
+            server = FakeServer()
+            port = await server.serve()
+            client = await AsyncClient().connect(port=port, timeout=5, packed_arrays=True)
+            await client.foils.create_naca_foil(12)
+            await client.call("setFoilCoords", "NACA 0012", np.array(COORDS), False)
+            coords = await client.call("getFoilCoords", "NACA 0012")
+            await client.close()
+            await server.close()
+            return client, coords
+        client, coords = asyncio.run(scenario())
+        assert isinstance(coords, np.ndarray)
+        np.testing.assert_array_equal(coords, COORDS)
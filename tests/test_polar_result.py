@@ -0,0 +1,105 @@
+import unittest
+import numpy as np
+from xflrpy import Client
+from xflrpy.fake_server import FakeServer
+from xflrpy.polar2d import PolarResult, PolarResultType, PolarTable, PolarType
+from xflrpy.plane import WPolarResult, WPolar, enumWPolarResult
+
+
+class TestPolarResult(unittest.TestCase):
+
+    def test_from_msgpack(self):
+        raw = {'alpha': [0.0, 1.0, 2.0], 'Cl': [0.0, 0.11, 0.22], 'Cd': [0.01, 0.011, 0.012]}
+        result = PolarResult.from_msgpack(raw)
+        assert len(result) == 3
+        assert result.keys == ['alpha', 'Cl', 'Cd']
+        assert result.data.dtype == np.float64
+        assert result.data.shape == (len(PolarResultType), 3)
+        np.testing.assert_array_equal(result.Cl, [0.0, 0.11, 0.22])
+        np.testing.assert_array_equal(result[PolarResultType.CD], raw['Cd'])
+        np.testing.assert_array_equal(result['alpha'], raw['alpha'])
+        assert 'alpha, Cl, Cd' in str(result)
+
+    def test_columns_are_views(self):
+        result = PolarResult.from_msgpack({'alpha': [0.0, 1.0], 'Cl': [0.0, 0.1]})
+        assert np.shares_memory(result.Cl, result.data)
+        result.data[PolarResultType.CL] *= 2
+        np.testing.assert_array_equal(result.Cl, [0.0, 0.2])
+
+    def test_missing_columns(self):
+        result = PolarResult.from_msgpack({'alpha': [0.0, 1.0]})
+        assert len(result.Cm) == 0
+        assert np.isnan(result.data[PolarResultType.CM]).all()
+        assert list(result.dict) == ['alpha']
+
+    def test_empty(self):
+        result = PolarResult.from_msgpack({})
+        assert len(result) == 0
+        assert result.keys == []
+
+    def test_round_trip(self):
+        raw = {'alpha': [0.0, 1.0], 'Re': [1e5, 1e5]}
+        assert PolarResult.from_msgpack(raw).to_msgpack() == raw
+
+
+class TestPolarTable(unittest.TestCase):
+
+    def test_from_results(self):
+        entries = [('A', {'name': 'p1', 'spec': {'reynolds': 1e5, 'mach': 0.0}},
+                    PolarResult.from_arrays({'alpha': [0.0, 1.0], 'Cl': [0.0, 0.1]})),
+                   ('A', {'name': 'p2', 'spec': {'reynolds': 2e5, 'mach': 0.0}}, PolarResult()),
+                   ('B', {'name': 'p1', 'spec': {'reynolds': 1e5, 'mach': 0.1}},
+                    PolarResult.from_arrays({'alpha': [2.0], 'Cl': [0.25]}))]
+        table = PolarTable.from_results(entries, [PolarResultType.ALPHA, PolarResultType.CL])
+        assert len(table) == 3
+        assert table.keys == ['foil', 'polar', 'reynolds', 'mach', 'ncrit', 'xtop', 'xbot', 'alpha', 'Cl']
+        assert table['foil'].tolist() == ['A', 'A', 'B']
+        np.testing.assert_array_equal(table['reynolds'], [1e5, 1e5, 1e5])
+        assert np.isnan(table['ncrit']).all()
+        assert table.polars == [('A', 'p1'), ('B', 'p1')]
+        np.testing.assert_array_equal(table.filter(mach=0.1)['Cl'], [0.25])
+        np.testing.assert_array_equal(table.to_results()[('A', 'p1')].Cl, [0.0, 0.1])
+        assert len(PolarTable.from_results([])) == 0
+
+    def test_batch_results(self):
+        with FakeServer() as server:
+            client = Client()
+            client.connect(port=server.port)
+            foils = [client.foils.create_naca_foil(d) for d in (12, 2412, 4412)]
+            client.foils.run_batch_analysis([1e5, 2e5], foils, sequence=(0, 10, 1))
+            client.foils.run_batch_analysis([5e5], foils[:1], sequence=(0, 10, 1))
+            calls = server.call_count
+            table = client.foils.batch_results(foils, re_list=[1e5, 2e5])
+            # one polarList burst and one getPolarResult burst
+            assert server.call_count - calls == 3 + 6
+            assert len(table.polars) == 6
+            assert len(table) == 60
+            cl = table.filter(foil='NACA 2412', reynolds=2e5)['Cl']
+            foil = client.foils['NACA 2412']
+            expected = [a.polar for a in foil.analyses if a.polar.Re[0] == 2e5][0].Cl
+            np.testing.assert_array_equal(cl, expected)
+            assert len(client.foils.batch_results()) == 70
+            # an earlier batch with other settings at the same Reynolds numbers is left out
+            client.foils.run_batch_analysis([1e5], foils[:1], mach=0.2, ncrit=7, sequence=(0, 10, 1))
+            assert len(client.foils.batch_results(foils, re_list=[1e5]).polars) == 4
+            assert len(client.foils.batch_results(foils, re_list=[1e5], mach=0, ncrit=9).polars) == 3
+            table = client.foils.batch_results(foils, mach=0.2, polar_type=PolarType.FIXEDLIFTPOLAR)
+            assert len(table.polars) == 1 and table.keys[-1] == 'Re'
+            client.close()
+
+
+class TestWPolarResult(unittest.TestCase):
+
+    def test_enum_indexing(self):
+        result = WPolarResult.from_msgpack({'alpha': [0.0, 2.0], 'TCd': [0.02, 0.03], 'beta': [0.0, 0.0]})
+        np.testing.assert_array_equal(result[enumWPolarResult.CD], [0.02, 0.03])
+        np.testing.assert_array_equal(result.TCd, [0.02, 0.03])
+        np.testing.assert_array_equal(result.beta, [0.0, 0.0])
+        assert result.keys == ['alpha', 'TCd', 'beta']
+        # the enum only holds the values the server defines
+        assert max(enumWPolarResult) == enumWPolarResult.QINF == 13
+
+    def test_nested_in_wpolar(self):
+        polar = WPolar.from_msgpack({'name': 'p', 'plane_name': 'plane', 'result': {'alpha': [1.0], 'Cl': [0.1]}})
+        assert type(polar.result) == WPolarResult
+        np.testing.assert_array_equal(polar.result.Cl, [0.1])
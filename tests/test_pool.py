@@ -0,0 +1,56 @@
+import unittest
+import socket
+import pytest
+from msgpackrpc.error import TransportError
+from xflrpy.pool import ServerPool
+from xflrpy.polar2d import PolarResult
+from xflrpy.fake_server import FakeServer
+
+COORDS = [[1.0, 0.0], [0.5, 0.05], [0.0, 0.0], [0.5, -0.05], [1.0, 0.0]]
+
+
+class TestServerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = [FakeServer(latency=0.01) for _ in range(3)]
+        self.ports = [s.start() for s in self.servers]
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop()
+
+    def test_analyses_are_spread_over_servers(self):
+        foils = [(f'foil {i}', COORDS) for i in range(12)]
+        with ServerPool(self.ports, timeout=5) as pool:
+            assert pool.size == 3
+            results = pool.map_analyses(foils, reynolds=100000, sequence=(0, 5, 0.5))
+        assert len(results) == 12
+        assert all(type(r) == PolarResult and len(r) == 10 for r in results)
+        # every server received at least one foil and holds the shipped coordinates
+        for server in self.servers:
+            assert len(server.handler.foils) > 0
+            assert all(f['coords'].tolist() == COORDS for f in server.handler.foils.values())
+        assert sum(len(s.handler.foils) for s in self.servers) == 12
+
+    def test_batch_analysis(self):
+        foils = [(f'foil {i}', COORDS) for i in range(5)]
+        with ServerPool(self.ports, timeout=5) as pool:
+            results = pool.run_batch_analysis([100000, 200000], foils, sequence=(0, 5, 0.5))
+        assert set(results) == {name for name, _ in foils}
+        for polars in results.values():
+            assert len(polars) == 2
+            assert all(type(r) == PolarResult for r in polars.values())
+
+    def test_earlier_polars_are_left_out(self):
+        foils = [(f'foil {i}', COORDS) for i in range(3)]
+        with ServerPool(self.ports[:1], timeout=5) as pool:
+            pool.run_batch_analysis([100000], foils, sequence=(0, 5, 0.5), mach=0.2)
+            results = pool.run_batch_analysis([100000, 200000], foils, sequence=(0, 5, 0.5))
+        assert all(len(polars) == 2 for polars in results.values())
+
+    def test_unreachable_server(self):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        with pytest.raises(TransportError):
+            ServerPool(self.ports[:2] + [port], timeout=5)
@@ -0,0 +1,77 @@
+import unittest
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from xflrpy import Client
+from xflrpy.fake_server import FakeServer
+from xflrpy.polar2d import PolarResult, PolarSpec, AnalysisSettings2D
+from xflrpy.result_cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_key(self):
+        coords = [[1.0, 0.0], [0.0, 0.0], [1.0, 0.0]]
+        settings = AnalysisSettings2D(sequence=(0, 5, 1))
+        key = ResultCache.key(coords, PolarSpec(reynolds=1e5), settings, [0, 1])
+        assert key == ResultCache.key(np.array(coords), PolarSpec(reynolds=1e5), settings, [0, 1])
+        assert key != ResultCache.key(coords, PolarSpec(reynolds=2e5), settings, [0, 1])
+        assert key != ResultCache.key(coords, PolarSpec(reynolds=1e5), AnalysisSettings2D(sequence=(0, 6, 1)), [0, 1])
+        assert key != ResultCache.key([[1.0, 0.0], [0.0, 0.001], [1.0, 0.0]], PolarSpec(reynolds=1e5), settings,
+                                      [0, 1])
+
+    def test_put_get(self):
+        cache = ResultCache(self.folder)
+        result = PolarResult.from_arrays({'alpha': [0.0, 1.0], 'Cl': [0.1, 0.2]})
+        assert cache.get('ab' * 32) is None
+        cache.put('ab' * 32, result)
+        stored = cache.get('ab' * 32)
+        np.testing.assert_array_equal(stored.Cl, result.Cl)
+        assert len(stored.Cd) == 0
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert not [f for f in os.listdir(os.path.join(self.folder, 'ab')) if f.endswith('.tmp')]
+
+    def test_eviction_keeps_recently_used(self):
+        result = PolarResult.from_arrays({'alpha': np.arange(1000.0)})
+        cache = ResultCache(self.folder)
+        cache.put('00' * 32, result)
+        size = cache._size
+        cache.max_bytes = int(size * 3.5)
+        for i in range(1, 3):
+            cache.put(f'{i:02d}' * 32, result)
+        past = time.time() - 60
+        for i in range(1, 3):
+            os.utime(cache._file(f'{i:02d}' * 32), (past, past))
+        cache.get('00' * 32)
+        cache.put('03' * 32, result)
+        cache.put('04' * 32, result)
+        assert '00' * 32 in cache
+        assert '01' * 32 not in cache
+        assert len(cache) <= 3
+
+    def test_run_analysis(self):
+        with FakeServer() as server:
+            client = Client().connect(port=server.port, timeout=5)
+            client.result_cache = ResultCache(self.folder)
+            analysis = client.foils.create_naca_foil(2412).analyses.create(reynolds=100000)
+            first = analysis.run_analysis(sequence=(0, 5, 1))
+            calls = client.call_count['analyzePolar']
+            second = analysis.run_analysis(sequence=(0, 5, 1))
+            assert client.call_count['analyzePolar'] == calls
+            np.testing.assert_array_equal(first.Cl, second.Cl)
+            # same shape under another name is a hit, another Reynolds number is not
+            other = client.foils.create_naca_foil(2412, 'copy').analyses.create(reynolds=100000)
+            other.run_analysis(sequence=(0, 5, 1))
+            assert client.call_count['analyzePolar'] == calls
+            analysis = client.foils.get('NACA 2412').analyses.create(reynolds=200000)
+            analysis.run_analysis(sequence=(0, 5, 1))
+            assert client.call_count['analyzePolar'] == calls + 1
+            client.close()
@@ -0,0 +1,148 @@
+import unittest
+import socket
+import threading
+import time
+import numpy as np
+import pytest
+from msgpackrpc.error import TransportError
+from xflrpy import Client
+from xflrpy.exceptions import ConnectionLostError
+from xflrpy.fake_server import FakeServer
+from xflrpy.session import RetryPolicy
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_delays(self):
+        policy = RetryPolicy(retries=6, base_delay=0.1, max_delay=1.0, jitter=0.5, seed=1)
+        delays = [policy.delay(n) for n in range(1, 8)]
+        assert delays[-1] is None
+        for n, delay in enumerate(delays[:-1], 1):
+            bound = min(1.0, 0.1 * 2 ** (n - 1))
+            assert bound / 2 <= delay <= bound
+        assert RetryPolicy(jitter=0).delay(3) == pytest.approx(0.4)
+        with pytest.raises(ValueError):
+            RetryPolicy(jitter=2)
+
+    def test_calls(self):
+        policy = RetryPolicy()
+        assert policy.can_retry("getFoilCoords") and not policy.can_retry("batchAnalyze")
+        policy.calls.add("setLineStyle")
+        assert policy.can_retry("setLineStyle") and not RetryPolicy().can_retry("setLineStyle")
+
+
+class TestReconnect(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer()
+        self.server.start()
+        self.client = Client().connect(port=self.server.port, timeout=5)
+        self.client.retry = RetryPolicy(retries=8, base_delay=0.02, max_delay=0.2)
+        self.client.foils.create_naca_foil(12)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def drop_after(self, delay):
+        threading.Timer(delay, self.server.drop_connections).start()
+
+    def test_idle_drop(self):
+        assert self.client.call("getFoil", "NACA 0012")["name"] == "NACA 0012"
+        self.server.drop_connections()
+        time.sleep(0.05)
+        start = time.time()
+        assert self.client.call("foilList")[0]["name"] == "NACA 0012"
+        assert time.time() - start < 1
+        assert not self.client.cache.contains("getFoil", "NACA 0012")
+        # the new connection is kept
+        assert self.client.foils.create_naca_foil(2412).name == "NACA 2412"
+
+    def test_in_flight_drop(self):
+        self.server.latency = 0.3
+        self.drop_after(0.1)
+        start = time.time()
+        coords = self.client.call("getFoilCoords", "NACA 0012")
+        assert len(coords) > 0
+        assert time.time() - start < 2
+
+    def test_mutating_call(self):
+        self.server.latency = 0.3
+        self.drop_after(0.1)
+        start = time.time()
+        with pytest.raises(ConnectionLostError) as e_info:
+            self.client.call("createNACAFoil", 2412, "NACA 2412")
+        assert time.time() - start < 0.3
+        assert "createNACAFoil" in str(e_info.value)
+        assert self.client.metrics.methods["createNACAFoil"].errors == 1
+        self.server.latency = 0
+        # the server applied the call before the connection was lost
+        assert "NACA 2412" in self.client.foils
+
+    def test_call_many(self):
+        self.client.cache.clear()
+        self.server.latency = 0.3
+        self.drop_after(0.1)
+        results = self.client.call_many([("getFoil", ("NACA 0012",)), ("createNACAFoil", (2412, "NACA 2412")),
+                                         ("polarList", ("NACA 0012",))], return_exceptions=True)
+        assert results[0]["name"] == "NACA 0012"
+        assert isinstance(results[1], ConnectionLostError)
+        assert results[2] == []
+        self.drop_after(0.1)
+        with pytest.raises(ConnectionLostError):
+            self.client.call_many([("deleteFoil", ("NACA 0012",))])
+
+    def test_server_restart(self):
+        port = self.server.port
+        self.server.stop()
+        restarted = FakeServer(port=port)
+        threading.Timer(0.2, restarted.start).start()
+        try:
+            # the restarted server lost its foils
+            assert self.client.call("foilList") == []
+            assert self.client.is_connected
+        finally:
+            time.sleep(0.2)
+            restarted.stop()
+
+    def test_packed_arrays_after_restart(self):
+        self.client.close()
+        self.client.connect(port=self.server.port, timeout=5, packed_arrays=True)
+        port = self.server.port
+        self.server.stop()
+        self.server = FakeServer(port=port)
+        self.server.start()
+        assert self.client.call("ping")
+        self.client.foils.create_naca_foil(12)
+        assert self.client.packed_arrays and self.server.handler.packed
+        assert isinstance(self.client.call("getFoilCoords", "NACA 0012"), np.ndarray)
+
+    def test_retries_exhausted(self):
+        self.client.retry = RetryPolicy(retries=2, base_delay=0.01)
+        self.server.stop()
+        with pytest.raises(TransportError):
+            self.client.call("foilList")
+        assert not self.client.is_connected
+
+    def test_is_connected_does_not_retry(self):
+        self.client.retry = RetryPolicy(retries=5, base_delay=1.0, jitter=0)
+        self.server.stop()
+        start = time.time()
+        assert not self.client.is_connected
+        assert "not connected" in str(self.client)
+        assert time.time() - start < 0.5
+        with pytest.raises(ConnectionLostError):
+            self.client.call("deleteFoil", "NACA 0012")
+
+
+class TestConnect(unittest.TestCase):
+
+    def test_no_server(self):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        client = Client()
+        with pytest.raises(TransportError) as e_info:
+            client.connect(port=port, timeout=5)
+        assert "Could not connect" in str(e_info.value)
+        assert not client.is_connected
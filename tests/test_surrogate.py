@@ -0,0 +1,99 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pytest
+from xflrpy import Client
+from xflrpy.fake_server import FakeServer
+from xflrpy.polar2d import PolarResult, PolarType
+from xflrpy.surrogate import PolarSurrogate
+
+
+def linear_polar(re, alpha):
+    "Polar whose coefficients are linear in alpha and log(Re), so interpolation is exact"
+    alpha = np.asarray(alpha, dtype=np.float64)
+    return PolarResult.from_arrays({'alpha': alpha, 'Cl': 0.1 * alpha + 0.01 * np.log(re),
+                                    'Cd': 0.01 + 0.001 * alpha, 'Cm': np.full(len(alpha), -0.05),
+                                    'Re': np.full(len(alpha), re)})
+
+
+class TestPolarSurrogate(unittest.TestCase):
+
+    def setUp(self):
+        self.surrogate = PolarSurrogate([linear_polar(re, np.arange(-4, 12.5, 0.5)) for re in (1e5, 2e5, 5e5)])
+
+    def test_grid(self):
+        np.testing.assert_array_equal(self.surrogate.reynolds, [1e5, 2e5, 5e5])
+        assert self.surrogate.alpha[0] == -4 and self.surrogate.alpha[-1] == 12
+        assert self.surrogate.grid.shape == (3, 3, len(self.surrogate.alpha))
+
+    def test_vectorized(self):
+        alpha = np.random.default_rng(0).uniform(-4, 12, 1000)
+        re = np.random.default_rng(1).uniform(1e5, 5e5, 1000)
+        np.testing.assert_allclose(self.surrogate.Cl(alpha, re), 0.1 * alpha + 0.01 * np.log(re), atol=1e-12)
+        np.testing.assert_allclose(self.surrogate.Cd(alpha, re), 0.01 + 0.001 * alpha, atol=1e-12)
+        np.testing.assert_allclose(self.surrogate.Cm(alpha, 3e5), -0.05)
+
+    def test_broadcasting(self):
+        cl = self.surrogate.Cl(np.linspace(0, 10, 5)[:, None], np.array([1e5, 2e5, 5e5])[None, :])
+        assert cl.shape == (5, 3)
+        assert np.ndim(self.surrogate.Cl(2.0, 1e5)) == 0
+
+    def test_outside(self):
+        assert np.isnan(self.surrogate.Cl(20.0, 1e5))
+        assert np.isnan(self.surrogate.Cl(5.0, 1e6))
+        self.surrogate.extrapolate = True
+        assert self.surrogate.Cl(20.0, 1e5) == pytest.approx(self.surrogate.Cl(12.0, 1e5))
+        assert self.surrogate.Cl(5.0, 1e6) == pytest.approx(self.surrogate.Cl(5.0, 5e5))
+
+    def test_partial_ranges(self):
+        # the high Reynolds number polar converged over a narrower range
+        surrogate = PolarSurrogate({1e5: linear_polar(1e5, [0, 1, 2, 3, 4]), 1e6: linear_polar(1e6, [2, 2, 3])},
+                                   alpha_step=0.5)
+        assert np.isnan(surrogate.Cl(1.0, 1e6))
+        assert surrogate.Cl(1.0, 1e5) == pytest.approx(0.1 + 0.01 * np.log(1e5))
+        assert surrogate.Cl(2.5, 1e6) == pytest.approx(0.25 + 0.01 * np.log(1e6))
+
+    def test_single_polar(self):
+        surrogate = PolarSurrogate([linear_polar(1e5, [3, 0, 1, 2])], coefficients=('Cl',))
+        assert surrogate.Cl(1.5) == pytest.approx(0.15 + 0.01 * np.log(1e5))
+        with pytest.raises(ValueError):
+            self.surrogate.Cl(1.0)
+        with pytest.raises(ValueError):
+            PolarSurrogate([])
+
+    def test_duplicate_reynolds(self):
+        with pytest.raises(ValueError):
+            PolarSurrogate([linear_polar(1e5, [0, 1, 2]), linear_polar(1e5, [0, 2, 4])])
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'surrogate.npz')
+            self.surrogate.save(path)
+            loaded = PolarSurrogate.load(path)
+        assert loaded.coefficients == self.surrogate.coefficients
+        np.testing.assert_array_equal(loaded.Cd([1.0, 2.5], 3e5), self.surrogate.Cd([1.0, 2.5], 3e5))
+
+    def test_from_foil(self):
+        with FakeServer() as server:
+            client = Client()
+            client.connect(port=server.port)
+            foil = client.foils.create_naca_foil(2412)
+            client.foils.run_batch_analysis([1e5, 3e5], [foil], sequence=(0, 8, 1))
+            client.call_count.clear()
+            surrogate = PolarSurrogate.from_foil(foil)
+            assert client.call_count == {'polarList': 1, 'getPolarResult': 2}
+            calls = server.call_count
+            np.testing.assert_array_equal(surrogate.reynolds, [1e5, 3e5])
+            assert np.all(np.isfinite(surrogate.Cl(np.linspace(0, 7, 100), 2e5)))
+            assert server.call_count == calls
+            # polars of another family at the same Reynolds numbers
+            client.foils.run_batch_analysis([1e5], [foil], mach=0.3, sequence=(0, 8, 1))
+            with pytest.raises(ValueError):
+                PolarSurrogate.from_foil(foil)
+            np.testing.assert_array_equal(PolarSurrogate.from_foil(foil, mach=0).reynolds, [1e5, 3e5])
+            np.testing.assert_array_equal(PolarSurrogate.from_foil(foil, mach=0.3, polar_type=PolarType.FIXEDLIFTPOLAR)
+                                          .reynolds, [1e5])
+            with pytest.raises(ValueError):
+                PolarSurrogate.from_foil(foil, ncrit=5)
+            client.close()
@@ -0,0 +1,130 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pytest
+from xflrpy import Client
+from xflrpy.exceptions import SweepCheckpointError
+from xflrpy.fake_server import FakeServer
+from xflrpy.polar2d import PolarResultType, PolarType
+from xflrpy.sweep import Sweep, Cell
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.checkpoint = os.path.join(self.folder, 'sweep.jsonl')
+        self.server = FakeServer()
+        self.server.start()
+        self.client = Client()
+        self.client.connect(port=self.server.port)
+        self.foils = [self.client.foils.create_naca_foil(d) for d in (12, 2412, 4415)]
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        if os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+        os.rmdir(self.folder)
+
+    def sweep(self, **kwargs):
+        return Sweep(self.client, self.foils, reynolds=[1e5, 2e5, 1e5], mach=[0, 0.1], ncrit=[5, 9],
+                     sequence=(0, 5, 1), checkpoint=self.checkpoint, **kwargs)
+
+    def test_grid(self):
+        sweep = self.sweep()
+        assert len(sweep) == 3 * 2 * 2 * 2
+        assert sweep.cells[0] == Cell('NACA 0012', 1e5, 0.0, 5.0, 1.0, 1.0)
+        assert len(sweep.chunks()) == 4
+        assert len(Sweep(self.client, self.foils, reynolds=[1e5, 2e5], chunk_size=2).chunks()) == 3
+
+    def test_run(self):
+        results = self.sweep(op_point_values=[PolarResultType.ALPHA, PolarResultType.CD]).run()
+        assert len(results) == 24
+        result = results[Cell('NACA 2412', 2e5, 0.1, 9.0, 1.0, 1.0)]
+        assert result.keys == ['alpha', 'Cd']
+        np.testing.assert_array_equal(result.alpha, [0, 1, 2, 3, 4])
+        # drag falls with the Reynolds number
+        assert result.Cd[0] < results[Cell('NACA 2412', 1e5, 0.1, 9.0, 1.0, 1.0)].Cd[0]
+
+    def test_resume(self):
+        sweep = self.sweep(chunk_size=2)
+        calls = {'n': 0}
+        call = self.client.call
+
+        def failing_call(rpc_call, *args):
+            if rpc_call == "batchAnalyze":
+                calls['n'] += 1
+                if calls['n'] == 4:
+                    raise ConnectionError("server lost")
+            return call(rpc_call, *args)
+
+        self.client.call = failing_call
+        with pytest.raises(ConnectionError):
+            sweep.run()
+        assert len(sweep.results) == 6
+        del self.client.call
+
+        resumed = self.sweep(chunk_size=2)
+        assert len(resumed.results) == 6
+        assert len(resumed.pending) == 18
+        before = self.server.call_count
+        resumed.run()
+        assert len(resumed.results) == 24
+        assert not resumed.pending
+        assert resumed.chunks() == []
+        np.testing.assert_array_equal(resumed.results[sweep.cells[0]].Cl, sweep.results[sweep.cells[0]].Cl)
+        # nothing left to dispatch
+        after = self.server.call_count
+        assert self.sweep().run() and self.server.call_count == after > before
+
+    def test_checkpoint(self):
+        self.sweep().run()
+        with open(self.checkpoint, 'a') as f:
+            f.write('{"cell": ["NACA 0012", 1e5')
+        assert len(self.sweep().results) == 24
+        with pytest.raises(SweepCheckpointError):
+            Sweep(self.client, self.foils, reynolds=[1e5], sequence=(0, 6, 1), checkpoint=self.checkpoint)
+
+    def test_resume_after_truncated_line(self):
+        sweep = self.sweep(chunk_size=2)
+        sweep.results = {}
+        for chunk in sweep.chunks()[:2]:
+            names, re_list, conditions = chunk
+            sweep._client.foils.run_batch_analysis(re_list, names, polar_type=PolarType.FIXEDSPEEDPOLAR,
+                                                   mach=conditions[0], ncrit=conditions[1], sequence=(0, 5, 1))
+            sweep._write_checkpoint(sweep._fetch(names, re_list, conditions))
+        with open(self.checkpoint, 'a') as f:
+            f.write('{"cell": ["NACA 0012", 1e5')
+        resumed = self.sweep(chunk_size=2)
+        assert len(resumed.results) == 4
+        resumed.run()
+        again = self.sweep(chunk_size=2)
+        assert len(again.results) == 24 and not again.pending
+
+    def test_polar_type(self):
+        self.client.foils.run_batch_analysis([1e5], self.foils, polar_type=PolarType.FIXEDLIFTPOLAR,
+                                             sequence=(0, 5, 1))
+        sweep = Sweep(self.client, self.foils, reynolds=[1e5], sequence=(0, 5, 1))
+        assert sweep._fetch(sweep.foils, [1e5], (0.0, 9.0, 1.0, 1.0)) == {}
+        assert len(sweep.run()) == 3
+
+    def test_polars_of_another_sequence(self):
+        # polars with the settings of the sweep, left on the server by a sweep with another sequence
+        self.client.foils.run_batch_analysis([1e5], self.foils, polar_type=PolarType.FIXEDSPEEDPOLAR,
+                                             sequence=(10, 15, 1))
+        sweep = Sweep(self.client, self.foils, reynolds=[1e5], sequence=(0, 5, 1), checkpoint=self.checkpoint)
+        assert sweep._fetch(sweep.foils, [1e5], (0.0, 9.0, 1.0, 1.0)) == {}
+        results = sweep.run()
+        assert len(results) == 3
+        np.testing.assert_array_equal(results[sweep.cells[0]].alpha, [0, 1, 2, 3, 4])
+        resumed = Sweep(self.client, self.foils, reynolds=[1e5], sequence=(0, 5, 1), checkpoint=self.checkpoint)
+        assert not resumed.pending
+        # records carry their sequence, those of another sweep are not resumed
+        with open(self.checkpoint) as f:
+            lines = f.readlines()
+        with open(self.checkpoint, 'w') as f:
+            f.writelines(lines[:-1] + [lines[-1].replace('"sequence": [0.0, 5.0, 1.0]', '"sequence": [0.0, 6.0, 1.0]')])
+        resumed = Sweep(self.client, self.foils, reynolds=[1e5], sequence=(0, 5, 1), checkpoint=self.checkpoint)
+        assert len(resumed.pending) == 1
@@ -1 +1,3 @@
 from .client import Client
+from .async_client import AsyncClient
+from .log import enable_logging
@@ -0,0 +1,466 @@
+import asyncio
+import itertools
+import msgpack
+import numpy as np
+from msgpackrpc import message
+from msgpackrpc.error import RPCError, TimeoutError, TransportError
+from xflrpy.client import ServerStateMessage
+from xflrpy.exceptions import ClientAlreadyConnectedException, ClientNotConnectedException
+from xflrpy import foil_io, geometry
+from xflrpy.foil import Foil, LineStyle, PointStyle, StippleType, PLACEHOLDER_NACA, _check_dat_paths, \
+    _check_validation_result, _check_naca_digits
+from xflrpy.module import ModuleType
+from xflrpy.packing import NEGOTIATION_CALL, encode_args, decode_arrays
+from xflrpy.polar2d import (PolarType, PolarSpec, PolarResult, PolarResultType, OpPoint, XflrPolar,
+                            AnalysisSettings2D, enumSequenceType)
+
+READ_CHUNK_SIZE = 65536
+
+
+class AsyncClient():
+    """
+    asyncio-native counterpart of Client.  Every instance owns its own connection, and any number of requests can
+    be in flight on it at once.  Responses are matched to requests
+    by message id, so awaiting many calls with asyncio.gather() overlaps their round trips.
+
+    Returns:
+        AsyncClient: instance of AsyncClient
+    """
+
+    def __init__(self):
+        self.remote_address = None
+        self._timeout = None
+        self._reader = None
+        self._writer = None
+        self._read_task = None
+        self._lost = None
+        self._pending = {}
+        self._msgids = itertools.count()
+        self._packer = msgpack.Packer(default=lambda x: x.to_msgpack())
+        self._state = {}
+        self.packed_arrays = False
+        self.foils = AsyncFoilManager(self)
+        self.modules = AsyncModuleManager(self)
+
+    async def connect(self, ip='127.0.0.1', port=8080, timeout=300, packed_arrays=False):
+        """
+        Opens the connection to the server.  Returns self to allow chaining, for example
+        'client = await AsyncClient().connect()'.
+
+        Args:
+            ip (str): IP Address of remote XFLR5-RPC server
+            port (int): Port of remote XFLR5-RPC server
+            timeout (int): timeout in seconds to wait for each response before raising a TimeoutError
+            packed_arrays (bool): negotiate packed float64 arrays with the server.  See Client.connect.
+        Returns:
+            AsyncClient: instance of AsyncClient on success
+        """
+        if self._writer is not None:
+            raise ClientAlreadyConnectedException('client already connected')
+        self.remote_address = f"{ip}:{port}"
+        self._timeout = timeout
+        self._lost = None
+        try:
+            self._reader, self._writer = await asyncio.open_connection(ip, port)
+        except OSError as e:
+            raise TransportError(f"Could not connect to the XFLR5 server at {self.remote_address}: {e}")
+        self._read_task = asyncio.get_running_loop().create_task(self._read_loop())
+        await self._update_state()
+        if packed_arrays:
+            try:
+                self.packed_arrays = bool(await self.call(NEGOTIATION_CALL, True))
+            except RPCError:
+                self.packed_arrays = False
+        return self
+
+    async def call(self, rpc_call, *args):
+        """
+        Sends a call to the server and waits for its response.  Other calls may be awaited concurrently.
+
+        Args:
+            rpc_call (str): name of rpc function on server
+        Returns:
+            any: returns raw result of rpc response from server
+        Raises:
+            msgpackrpc.error.TransportError: if the server closed the connection
+        """
+        self._ensure_connected()
+        msgid = next(self._msgids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[msgid] = future
+        args = encode_args(args, self.packed_arrays)
+        self._writer.write(self._packer.pack([message.REQUEST, msgid, rpc_call, list(args)]))
+        try:
+            await self._writer.drain()
+            res = await asyncio.wait_for(future, self._timeout)
+            return decode_arrays(res) if self.packed_arrays else res
+        except asyncio.TimeoutError:
+            raise TimeoutError("Request timed out")
+        finally:
+            self._pending.pop(msgid, None)
+
+    async def close(self) -> None:
+        """
+        Closes the connection with the server.  Requests still in flight fail with a TransportError.
+
+        Returns:
+            None
+        """
+        self._lost = None
+        if self._writer is None:
+            return
+        self._read_task.cancel()
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except OSError:
+            pass
+        self._fail_pending(TransportError("Client is closed"))
+        self._reader = self._writer = self._read_task = None
+        self.packed_arrays = False
+
+    @property
+    def is_connected(self) -> bool:
+        "Returns true if the connection to the server is open."
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def ping(self) -> bool:
+        return await self.call("ping")
+
+    async def _update_state(self) -> None:
+        new_state = ServerStateMessage.from_msgpack(await self.call("getState"))
+        self._state = {
+            'current_module': new_state.current_module,
+            'saved': new_state.saved,
+            'display': new_state.display
+        }
+        self.modules._handle_state_change(new_state)
+
+    async def _read_loop(self):
+        unpacker = msgpack.Unpacker(raw=False)
+        try:
+            while True:
+                data = await self._reader.read(READ_CHUNK_SIZE)
+                if not data:
+                    break
+                unpacker.feed(data)
+                for msg in unpacker:
+                    self._on_message(msg)
+        except asyncio.CancelledError:
+            # close() cleans up
+            self._fail_pending(TransportError("Stream is closed."))
+            return
+        except ConnectionError:
+            pass
+        # the server closed the connection: fail the calls in flight, and the next ones at once
+        self._lost = TransportError(f"connection to {self.remote_address} closed by the server")
+        self._fail_pending(self._lost)
+        self._writer.close()
+        self._reader = self._writer = self._read_task = None
+        self.packed_arrays = False
+
+    def _on_message(self, msg):
+        if len(msg) != 4 or msg[0] != message.RESPONSE:
+            return
+        _, msgid, error, result = msg
+        future = self._pending.pop(msgid, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error if isinstance(error, RPCError) else RPCError(error))
+        else:
+            future.set_result(result)
+
+    def _fail_pending(self, error):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending = {}
+
+    def _ensure_connected(self):
+        if self._lost is not None:
+            raise self._lost
+        if self._writer is None:
+            raise ClientNotConnectedException("Client is not connected")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def __str__(self):
+        connected_str = "connected" if self.is_connected else "not connected"
+        return f"<XFLRAsyncClient>(server:{self.remote_address}, status:{connected_str})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class AsyncModuleManager():
+    def __init__(self, client):
+        self._client = client
+        self.active = None
+
+    async def set(self, module: ModuleType):
+        if self.active != module:
+            await self._client.call("setApp", int(module))
+            await self._client._update_state()
+
+    def _handle_state_change(self, newstate):
+        self.active = ModuleType(newstate.current_module)
+
+
+class AsyncFoil(Foil):
+    """
+    Foil bound to an AsyncClient.  The methods of Foil that call the server are coroutines, and its properties that
+    call the server return awaitables:
+
+        foil = await client.foils.get("NACA 0012")
+        await foil.normalize()
+        coords = await foil.coordinates
+    """
+
+    def __init__(self, client=None) -> None:
+        self._client = client
+
+    @property
+    def analyses(self):
+        return AsyncAnalysis2dManager(self._client, self)
+
+    async def rename(self, name):
+        await self._client.call("renameFoil", self.name, name)
+        self.name = name
+
+    async def duplicate(self, name):
+        foil_raw = await self._client.call("duplicateFoil", self.name, name)
+        return self.from_msgpack(foil_raw, self._client)
+
+    async def delete(self) -> None:
+        await self._client.call("deleteFoil", self.name)
+
+    async def set_coordinates(self, xy, update_gui=True):
+        await self._client.call("setFoilCoords", self.name, xy, update_gui)
+        await self._update()
+
+    async def set_geometry(self, camber=0., camber_x=0., thickness=0., thickness_x=0.):
+        await self._client.call("setGeom", self.name, camber, camber_x, thickness, thickness_x)
+        await self._update()
+
+    async def normalize(self):
+        await self._client.call("normalizeFoil", self.name)
+        await self._update()
+
+    async def derotate(self):
+        await self._client.call("derotateFoil", self.name)
+        await self._update()
+
+    async def export(self, file_name):
+        await self._client.call("exportFoil", self.name, file_name)
+
+    async def to_dat(self, newline="\n"):
+        return foil_io.format_dat(self.name, await self.coordinate_array, newline)
+
+    @property
+    def coordinates(self):
+        return self._coordinates()
+
+    @property
+    def coordinate_array(self):
+        return self._coordinate_array()
+
+    @property
+    def style(self):
+        return self._style()
+
+    @property
+    def is_visible(self):
+        return self._is_visible()
+
+    async def select(self, set_current=False, select_in_gui=False):
+        if set_current:
+            await self._client.call("setCurFoil", self.name, select_in_gui)
+
+    async def show(self):
+        await self._client.call("showFoil", self.name, True)
+
+    async def hide(self):
+        await self._client.call("showFoil", self.name, False)
+
+    async def set_style(self, line_style: LineStyle):
+        line_style.stipple = line_style.stipple.value
+        line_style.point_style = line_style.point_style.value
+        await self._client.call("setLineStyle", self.name, line_style.to_msgpack())
+
+    async def _coordinates(self) -> list:
+        coordinates = await self._client.call("getFoilCoords", self.name)
+        if isinstance(coordinates, np.ndarray):
+            return coordinates.tolist()
+        return coordinates
+
+    async def _coordinate_array(self) -> np.ndarray:
+        return np.asarray(await self._client.call("getFoilCoords", self.name), dtype=np.float64)
+
+    async def _style(self) -> LineStyle:
+        line_style = LineStyle.from_msgpack(await self._client.call("getLineStyle", self.name))
+        line_style.point_style = PointStyle(line_style.point_style)
+        line_style.stipple = StippleType(line_style.stipple)
+        return line_style
+
+    async def _is_visible(self) -> bool:
+        return (await self._style()).visible
+
+    async def _update(self):
+        self.__dict__.update(await self._client.call("getFoil", self.name))
+
+    def __eq__(self, other_foil):
+        raise TypeError("AsyncFoil cannot be compared with ==, compare their awaited coordinates instead")
+
+
+class AsyncFoilManager():
+    """
+    Awaitable equivalent of FoilManager.  Returns AsyncFoil objects; use analyses(foil) or foil.analyses to work with
+    the analyses of a foil.
+    """
+
+    def __init__(self, client) -> None:
+        self._client = client
+
+    async def to_dict(self) -> dict:
+        return {item["name"]: AsyncFoil.from_msgpack(item, self._client)
+                for item in await self._client.call("foilList")}
+
+    async def to_list(self) -> list:
+        return list((await self.to_dict()).values())
+
+    async def get(self, name=None) -> AsyncFoil:
+        """
+        Retrieves a single Foil by name from the server.
+
+        Returns:
+            AsyncFoil
+        Raises:
+            KeyError: on invalid name
+        """
+        if name not in await self.to_dict():
+            raise KeyError(f'Key "{name}" does not exist')
+        return AsyncFoil.from_msgpack(await self._client.call("getFoil", name), self._client)
+
+    async def load(self, paths):
+        """
+        Loads .dat airfoil files on the remote XFLR5-RPC server.
+
+        Args:
+            paths (str or str[]): a path or array of absolute paths to load on the XFLR-RPC server.
+        Returns:
+            None
+        Raises:
+            InvalidFoilPathException: if a single path is invalid and will prevent any files from being loaded.
+        """
+        await self._client.modules.set(ModuleType.DIRECTFOILDESIGN)
+        paths = _check_dat_paths(paths)
+        response = await self._client.call("validateFilePaths", paths)
+        _check_validation_result(paths, [r[0] for r in response])
+        for path in paths:
+            await self._client.call("loadProject", [path])
+
+    async def create_naca_foil(self, digits, name=None) -> AsyncFoil:
+        """
+        Creates a new foil on the server based on the NACA value.  See FoilManager.create_naca_foil.
+
+        Returns:
+            AsyncFoil: newly created NACA foil
+        Raises:
+            InvalidNacaValueError: on invalid digits value
+        """
+        five_digits = len(str(digits).strip()) == 5
+        digits, name = _check_naca_digits(digits, name, 5 if five_digits else 4)
+        if five_digits:
+            # the server only generates 4 digit foils
+            return await self.create_from_coordinates(name, geometry.naca(str(digits).zfill(5)))
+        await self._client.modules.set(ModuleType.DIRECTFOILDESIGN)
+        await self._client.call("createNACAFoil", digits, name)
+        return await self.get(name)
+
+    async def create_from_coordinates(self, name, xy, update_gui=True) -> AsyncFoil:
+        """
+        Creates a new foil on the server from coordinates.  See FoilManager.create_from_coordinates.
+
+        Returns:
+            AsyncFoil: the new foil
+        """
+        await self._client.modules.set(ModuleType.DIRECTFOILDESIGN)
+        # the server has no call creating a foil from coordinates, overwrite a placeholder foil
+        await self._client.call("createNACAFoil", PLACEHOLDER_NACA, name)
+        await self._client.call("setFoilCoords", name, xy, update_gui)
+        return await self.get(name)
+
+    def analyses(self, foil):
+        "Returns the AsyncAnalysis2dManager for a Foil or foil name"
+        return AsyncAnalysis2dManager(self._client, foil)
+
+
+class AsyncAnalysis2d():
+    """
+    Awaitable equivalent of Analysis2d for a polar that already exists on the server.
+    """
+
+    def __init__(self, client, polar: XflrPolar) -> None:
+        self._client = client
+        self._xflr_polar = polar
+        self._foil_name = polar.foil_name
+
+    @property
+    def name(self):
+        return self._xflr_polar.name
+
+    async def run_analysis(self, sequence_type=enumSequenceType.ALPHA, sequence=(0, 0, 0),
+                           op_point_values=[r for r in PolarResultType]) -> PolarResult:
+        settings = AnalysisSettings2D(sequence_type=sequence_type, sequence=sequence)
+        await self._client.modules.set(ModuleType.XFOILDIRECTANALYSIS)
+        polar_result_raw = await self._client.call("analyzePolar", self._xflr_polar, settings, op_point_values)
+        return PolarResult.from_msgpack(polar_result_raw)
+
+    async def polar(self, op_point_values=[r for r in PolarResultType]) -> PolarResult:
+        polar_result_raw = await self._client.call(
+            "getPolarResult", self._xflr_polar.foil_name, self._xflr_polar.name, op_point_values)
+        return PolarResult.from_msgpack(polar_result_raw)
+
+    async def op_points(self) -> list:
+        res = await self._client.call("getOpPoints", self._xflr_polar.foil_name, self._xflr_polar.name)
+        return [OpPoint.from_msgpack(o) for o in res]
+
+    async def delete(self):
+        await self._client.call("deletePolar", self._xflr_polar.foil_name, self._xflr_polar.name)
+
+    def __str__(self):
+        return f'<AsyncAnalysis2d>(foil:{self._foil_name} name:{self.name})'
+
+
+class AsyncAnalysis2dManager():
+    """
+    Awaitable equivalent of Analysis2dManager
+    """
+
+    def __init__(self, client, foil) -> None:
+        self._client = client
+        self.foil_name = foil.name if isinstance(foil, Foil) else foil
+
+    async def to_dict(self) -> dict:
+        polar_list_raw = await self._client.call("polarList", self.foil_name)
+        return {polar_data['name']: AsyncAnalysis2d(self._client, XflrPolar.from_msgpack(polar_data))
+                for polar_data in polar_list_raw}
+
+    async def to_list(self) -> list:
+        return list((await self.to_dict()).values())
+
+    async def create(self, name='', polar_type=PolarType.FIXEDLIFTPOLAR, reynolds=10000, re_type=1, ma_type=1,
+                     aoa=0, mach=0.0, ncrit=9.0, xtop=1.0, xbot=1.0) -> AsyncAnalysis2d:
+        spec = PolarSpec(polar_type, re_type=re_type, ma_type=ma_type, aoa=aoa,
+                         mach=mach, ncrit=ncrit, xtop=xtop, xbot=xbot, reynolds=reynolds)
+        p = XflrPolar()
+        p.foil_name = self.foil_name
+        p.name = name
+        p.spec = spec
+        res = await self._client.call("defineAnalysis2D", p.to_msgpack())
+        return AsyncAnalysis2d(self._client, XflrPolar.from_msgpack(res))
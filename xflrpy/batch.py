@@ -0,0 +1,97 @@
+from xflrpy.exceptions import BatchNotFlushedError
+
+
+class Deferred():
+    "Result of a call queued in a CallBatch.  It is available once the batch has been flushed."
+
+    def __init__(self, rpc_call, args):
+        self.rpc_call = rpc_call
+        self.args = args
+        self.done = False
+        self._result = None
+        self._error = None
+
+    @property
+    def result(self):
+        """
+        Returns:
+            any: raw result of the rpc response
+        Raises:
+            BatchNotFlushedError: if the batch was not flushed yet
+            msgpackrpc.error.RPCError: if the call failed on the server
+        """
+        if not self.done:
+            raise BatchNotFlushedError(f'"{self.rpc_call}" has not been sent yet, use the result after the batch')
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def _set(self, result=None, error=None):
+        self._result = result
+        self._error = error
+        self.done = True
+
+    def __str__(self):
+        state = "done" if self.done else "pending"
+        return f"<Deferred>({self.rpc_call}, {state})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class CallBatch():
+    """
+    Queues calls and sends them as one pipelined burst when the with-block exits, so N calls cost about one round
+    trip.  Obtained through client.batch():
+
+        with client.batch() as batch:
+            for name in names:
+                batch.call("showFoil", name, False)
+
+    Calls are sent in the order they were queued.  If some of them fail, the others still complete and the first
+    error is raised when the block exits.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._queue = []
+        self.results = []
+
+    def call(self, rpc_call, *args) -> Deferred:
+        "Queues a call.  Returns a Deferred whose result is available after the batch."
+        deferred = Deferred(rpc_call, args)
+        self._queue.append(deferred)
+        return deferred
+
+    def flush(self) -> list:
+        """
+        Sends the queued calls now.
+
+        Returns:
+            list: raw results of the calls sent, errors included as exceptions
+        """
+        queue, self._queue = self._queue, []
+        if not queue:
+            return []
+        results = self._client.call_many([(d.rpc_call, d.args) for d in queue], return_exceptions=True)
+        for deferred, result in zip(queue, results):
+            if isinstance(result, Exception):
+                deferred._set(error=result)
+            else:
+                deferred._set(result)
+        self.results.extend(results)
+        return results
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._queue = []
+            return
+        errors = [r for r in self.flush() if isinstance(r, Exception)]
+        if errors:
+            raise errors[0]
@@ -0,0 +1,128 @@
+from collections import OrderedDict
+import copy
+
+# read-only calls whose responses are cached.  The first argument is always the foil name.
+CACHED_CALLS = {'getFoil', 'getFoilCoords', 'getPolar', 'polarList'}
+
+# mutating calls mapped to the positions of the foil names they change
+FOIL_MUTATING_CALLS = {
+    'setFoilCoords': (0,),
+    'setGeom': (0,),
+    'normalizeFoil': (0,),
+    'derotateFoil': (0,),
+    'renameFoil': (0, 1),
+    'deleteFoil': (0,),
+    'duplicateFoil': (1,),
+    'createNACAFoil': (1,),
+    'deletePolar': (0,),
+}
+
+# calls that only change the polars of one foil.  Their first argument is an XflrPolar or its msgpack.
+POLAR_MUTATING_CALLS = {'defineAnalysis2D', 'analyzePolar'}
+
+# cached calls describing the polars of a foil
+POLAR_CALLS = {'getPolar', 'polarList'}
+
+# mutating calls that can change any foil or polar
+GLOBAL_MUTATING_CALLS = {'loadProject', 'newProject', 'batchAnalyze', 'exit'}
+
+
+class CallCache():
+    """
+    LRU cache for the responses of read-only calls (foils, foil coordinates, polar lists and polar specs), keyed by
+    call name and arguments.  The Client consults it before sending a call and invalidates it when a mutating call
+    goes through, so cached data is only served while nothing could have changed it on the server.  getPolar is only
+    cached when it does not make the polar current or selected in the GUI, since a cache hit would skip that.
+
+    Changes made on the server by anything other than this client (another client, the GUI) are not seen until the
+    entry is evicted or clear() is called.
+    """
+
+    def __init__(self, maxsize=1024) -> None:
+        """
+        Args:
+            maxsize (int): maximum number of cached responses.  0 disables the cache.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def lookup(self, rpc_call, args) -> tuple:
+        """
+        Returns:
+            tuple: (True, copy of the cached response) on a hit, (False, None) otherwise
+        """
+        key = _key(rpc_call, args)
+        if key is None or key not in self._entries:
+            if key is not None:
+                self.misses += 1
+            return False, None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return True, copy.deepcopy(self._entries[key])
+
+    def contains(self, rpc_call, *args) -> bool:
+        return _key(rpc_call, args) in self._entries
+
+    def is_mutating(self, rpc_call) -> bool:
+        return rpc_call in GLOBAL_MUTATING_CALLS or rpc_call in FOIL_MUTATING_CALLS or rpc_call in POLAR_MUTATING_CALLS
+
+    def before_call(self, rpc_call, args) -> None:
+        "Drops every entry a mutating call may change.  Runs before the call is sent."
+        if rpc_call in GLOBAL_MUTATING_CALLS:
+            self.clear()
+        elif rpc_call in FOIL_MUTATING_CALLS:
+            names = {args[i] for i in FOIL_MUTATING_CALLS[rpc_call] if i < len(args)}
+            for key in [k for k in self._entries if k[1] and k[1][0] in names]:
+                del self._entries[key]
+        elif rpc_call in POLAR_MUTATING_CALLS:
+            # the foil itself is unchanged, only its polars are dropped.  Without a foil name, those of every foil.
+            name = _polar_foil_name(args[0]) if args else None
+            for key in [k for k in self._entries if k[0] in POLAR_CALLS and (name is None or k[1][0] == name)]:
+                del self._entries[key]
+
+    def store(self, rpc_call, args, result) -> None:
+        "Caches the response of a read-only call"
+        if rpc_call not in CACHED_CALLS or self.maxsize <= 0:
+            return
+        key = _key(rpc_call, args)
+        if key is None:
+            return
+        self._entries[key] = copy.deepcopy(result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __str__(self):
+        return f"<CallCache>({len(self)}/{self.maxsize} entries, {self.hits} hits, {self.misses} misses)"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _polar_foil_name(polar):
+    "Foil name of an XflrPolar or of its msgpack, None if it has none"
+    if isinstance(polar, dict):
+        return polar.get('foil_name')
+    return getattr(polar, 'foil_name', None)
+
+
+def _key(rpc_call, args):
+    if rpc_call not in CACHED_CALLS:
+        return None
+    # getPolar(foil_name, polar_name, set_current=True, select=True) changes the GUI selection
+    if rpc_call == 'getPolar' and (len(args) < 4 or args[2] or args[3]):
+        return None
+    try:
+        key = (rpc_call, tuple(args))
+        hash(key)
+    except TypeError:
+        return None
+    return key
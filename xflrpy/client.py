@@ -1,7 +1,16 @@
 import msgpackrpc as rpc
 from xflrpy.module import ModuleType
-from xflrpy.exceptions import ClientAlreadyConnectedException, ClientNotConnectedException
+from xflrpy.exceptions import ClientAlreadyConnectedException, ClientNotConnectedException, ConnectionLostError
+from xflrpy.cache import CallCache
+from xflrpy.packing import NEGOTIATION_CALL, encode_args, decode_arrays
+from xflrpy.log import logger, preview, preview_args
+from xflrpy.metrics import CallMetrics
+from xflrpy.batch import CallBatch
+from xflrpy.job import Job, wait
+from xflrpy.session import RetryPolicy, _TcpBuilder, _check_session
 from collections import defaultdict
+import itertools
+import logging
 import time
 
 class ServerStateMessage():
@@ -19,22 +28,45 @@ class ServerStateMessage():
 
 class Client():
     """
-    Client class manages the connection to the XFLR5-RPC server.  The class uses the singleton pattern to
-    avoid having to pass the client down the class hierarchy to each child.
+    Client class manages the connection to the XFLR5-RPC server.  Every object obtained through a client (foils,
+    analyses, planes, ...) keeps a reference to it, so several clients connected to different servers can be used
+    side by side.  A client must be used from the thread that connected it.
+
+    Responses of read-only calls are kept in client.cache until a mutating call invalidates them.  Set
+    client.cache.maxsize to 0 to disable caching.  Latencies, errors and payload sizes of every call are recorded in
+    client.metrics.
+
+    Set client.result_cache to a xflrpy.result_cache.ResultCache to keep 2D analysis results on disk across runs.
+
+    The timeout given to connect applies to every call.  client.timeouts maps call names to shorter deadlines in
+    seconds, so that quick calls fail fast if the server is stuck:
+
+        client.timeouts.update(dict.fromkeys(["getFoil", "getFoilCoords", "foilList"], 0.5))
+
+    Long calls can be sent with submit, which returns a Job instead of blocking.
+
+    If the connection is lost the client reconnects on its next call.  Read-only calls are retried with backoff as
+    set by client.retry, a xflrpy.session.RetryPolicy.  Other calls raise ConnectionLostError, since the server may
+    have applied them before the connection was lost.
 
     Returns:
         Client: instance of Client
     """
-    _instance = None
-    remote_address = None
-    call_count = defaultdict(lambda: 0)
-    call_time = defaultdict(lambda: 0)
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super(Client, cls).__new__(
-                                cls, *args, **kwargs)
-        return cls._instance
-    def connect(self, ip = '127.0.0.1', port = 8080, timeout = 300):
+
+    def __init__(self):
+        self.remote_address = None
+        self.call_count = defaultdict(lambda: 0)
+        self.call_time = defaultdict(lambda: 0)
+        self.cache = CallCache()
+        self.metrics = CallMetrics()
+        self.packed_arrays = False
+        self.result_cache = None
+        self.timeouts = {}
+        self.retry = RetryPolicy()
+        self._lost = False
+        self._call_ids = itertools.count(1)
+
+    def connect(self, ip = '127.0.0.1', port = 8080, timeout = 300, packed_arrays = False):
         """
         Initiates the connection to the server.  This should only be run only if the client is not connected, otherwise
         it will throw a ClientAlreadyConnectedException.  Returns self to allow chaining, for example 'client = Client().connect()'.
@@ -44,8 +76,12 @@ class Client():
             port (int): Port of remote XFLR5-RPC server
             timeout (int): timeout in seconds to wait before raising an error.  Note that some calls stay open while the server
                 is processing so too low of a value may cause problems.
+            packed_arrays (bool): ask the server to exchange coordinates and polar results as packed float64 buffers
+                instead of arrays of msgpack floats.  Falls back to plain arrays if the server does not support it.
         Returns:
             Client: instance of Client on success
+        Raises:
+            msgpackrpc.error.TransportError: if the server cannot be reached
         """
         if self.is_connected:
             raise ClientAlreadyConnectedException('client already connected')
@@ -57,42 +93,228 @@ class Client():
         
         self.remote_address = f"{ip}:{port}"
         self._state = {}
-        self._rpc_client = rpc.Client(rpc.Address(ip, port), timeout=timeout, pack_encoding='utf-8', unpack_encoding='utf-8')
-        self.project = ProjectManager()
-        self.foils = FoilManager()
-        self.planes = PlaneManager()
-        self.modules = ModuleManager()
+        self.cache.clear()
+        self.packed_arrays = False
+        self._address = rpc.Address(ip, port)
+        self._timeout = timeout
+        self._rpc_loop = rpc.Loop()
+        self._rpc_client = self._open()
+        self._lost = False
+        self.project = ProjectManager(self)
+        self.foils = FoilManager(self)
+        self.planes = PlaneManager(self)
+        self.modules = ModuleManager(self)
         try:
-            if self.is_connected:
-                self._update_state()
-                return self
-        except rpc.error.TransportError:
-            print("Could not connect to the XFLR5 server. Is the application gui running?\n")
-    
-    def call(self, rpc_call, *args, **kwargs):
+            self._update_state()
+            if packed_arrays:
+                self.packed_arrays = self._negotiate_packed_arrays()
+        except rpc.error.TransportError as e:
+            self._rpc_client.close()
+            delattr(self, "_rpc_client")
+            raise rpc.error.TransportError(f"Could not connect to the XFLR5 server at {self.remote_address}. "
+                                           f"Is the application gui running? ({e})")
+        return self
+
+    def call(self, rpc_call, *args, timeout=None, **kwargs):
         """
-        Delegates call method to the RPC client.  Updates state after each call to ensure state is in sync.
+        Delegates call method to the RPC client.  Read-only calls are answered from the cache when possible.
 
         Args:
             rpc_call (str): name of rpc function on server
+            timeout (float): optional.  Seconds to wait for the response, client.timeouts[rpc_call] by default, or
+                the timeout of the connection.
         Returns:
             any: returns raw result of rpc response from server
+        Raises:
+            msgpackrpc.error.TimeoutError: if the response does not arrive within timeout
+            msgpackrpc.error.TransportError: if the connection of a read-only call is still lost after the retries
+            ConnectionLostError: if the connection is lost during any other call
         """
+        self._ensure_rpc_client_exists()
+        args = encode_args(args, self.packed_arrays)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        hit, res = self.cache.lookup(rpc_call, args)
+        if hit:
+            if debug:
+                logger.debug('%s: %s(%s) served from cache', self.remote_address, rpc_call, preview_args(args))
+            return res
+        self.cache.before_call(rpc_call, args)
         self.call_count[rpc_call] += 1
-        call_id = sum(self.call_count.values())
+        call_id = next(self._call_ids)
         
-        self._ensure_rpc_client_exists()
-        print(f'CALL STARTED: {rpc_call} ({call_id})', *args, **kwargs)
-        # print(f'CALL STARTED: {rpc_call} ({call_id})')
+        if debug:
+            logger.debug('%s: call %d started: %s(%s)', self.remote_address, call_id, rpc_call, preview_args(args))
+        request_bytes = self.metrics.start(rpc_call, args)
         start = time.time()
-        res = self._rpc_client.call(rpc_call, *args, **kwargs)
+        if timeout is None:
+            timeout = self.timeouts.get(rpc_call)
+        try:
+            res = self._call_with_retries(rpc_call, args, timeout, kwargs)
+        except Exception:
+            self.metrics.finish(rpc_call, time.time() - start, request_bytes, error=True)
+            raise
         timer = time.time() - start
-        print(f'CALL COMPLETE: {timer:.2f} seconds ({call_id})', res)
-        # print(f'CALL COMPLETE: {timer:.2f} seconds ({call_id})')
+        self.metrics.finish(rpc_call, timer, request_bytes, res)
+        if self.packed_arrays:
+            res = decode_arrays(res)
+        if debug:
+            logger.debug('%s: call %d complete in %.3f seconds: %s', self.remote_address, call_id, timer,
+                         preview.repr(res))
         self.call_time[rpc_call] += timer
+        self.cache.store(rpc_call, args, res)
         # self._update_state()
         return res
+
+    def call_async(self, rpc_call, *args):
+        """
+        Sends a call to the server without waiting for the response.  The request is written to the socket as soon
+        as the event loop runs, so several calls issued back-to-back are pipelined over the connection and matched
+        to their responses by message id.
+
+        Args:
+            rpc_call (str): name of rpc function on server
+        Returns:
+            msgpackrpc.future.Future: future whose get() method blocks until the response has arrived.  The result is
+                the raw response, packed arrays are not decoded.
+        """
+        return self._send_async(rpc_call, args)[0]
+
+    def _send_async(self, rpc_call, args) -> tuple:
+        """
+        Returns:
+            tuple: (future, give_up).  give_up() records the call as failed in the metrics if no response has arrived
+                yet, for calls the caller stops waiting for.  A response arriving later is then not recorded.
+        """
+        self._ensure_rpc_client_exists()
+        if self._lost:
+            self._reconnect()
+        args = encode_args(args, self.packed_arrays)
+        self.cache.before_call(rpc_call, args)
+        self.call_count[rpc_call] += 1
+        request_bytes = self.metrics.start(rpc_call, args)
+        start = time.time()
+        finished = []
+
+        def finish(result=None, error=True):
+            if not finished:
+                finished.append(True)
+                self.metrics.finish(rpc_call, time.time() - start, request_bytes, result, error=error)
+        future = self._rpc_client.call_async(rpc_call, *args)
+        future.attach_callback(lambda f: finish(f.result, error=f.error is not None))
+        return future, finish
+
+    def submit(self, rpc_call, *args, decode=None, progress=None) -> Job:
+        """
+        Sends a call without waiting for it, for calls that run for a long time.
+
+        Args:
+            rpc_call (str): name of rpc function on server
+            decode (callable): optional.  Converts the raw response into the result of the job.
+            progress (callable): optional.  Returns the progress of the call, between 0 and 1.
+        Returns:
+            Job: handle on the call
+        """
+        future = self.call_async(rpc_call, *args)
+
+        def decode_response(raw):
+            if self.packed_arrays:
+                raw = decode_arrays(raw)
+            return decode(raw) if decode is not None else raw
+        return Job(future, f'{rpc_call} on {self.remote_address}', decode_response, progress)
+
+    def call_many(self, calls, return_exceptions=False, timeout=None) -> list:
+        """
+        Pipelines several calls to the server.  All requests are written back-to-back before waiting on any response,
+        so N calls cost roughly one round trip instead of N.  Read-only calls found in the cache are not sent.
+
+        Args:
+            calls (list): list of (rpc_call, args) tuples, for example [("getFoil", ("NACA 0012",)), ...]
+            return_exceptions (bool): if True, a failed call puts its exception in the results instead of raising,
+                and the other calls still complete.
+            timeout (float): optional.  Seconds to wait for the whole burst.  Calls not answered in time raise
+                msgpackrpc.error.TimeoutError.
+        Returns:
+            list: raw results of the rpc responses, in the same order as calls
+        Raises:
+            ConnectionLostError: if the connection is lost before a call that is not read-only is answered.  Lost
+                read-only calls are sent again as by call.
+        """
+        self._ensure_rpc_client_exists()
+        calls = [(rpc_call, encode_args(tuple(args), self.packed_arrays)) for rpc_call, args in calls]
+        call_id = next(self._call_ids)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        start = time.time()
+        results = [None] * len(calls)
+        futures = {}
+        give_up = []
+        for i, (rpc_call, args) in enumerate(calls):
+            hit, results[i] = self.cache.lookup(rpc_call, args)
+            if not hit:
+                futures[i], finish = self._send_async(rpc_call, args)
+                give_up.append(finish)
+        if debug:
+            logger.debug('%s: call %d started: pipeline of %d calls (%d from cache)', self.remote_address, call_id,
+                         len(futures), len(calls) - len(futures))
+        # a read answered before a later mutating call of the same burst may already be stale
+        cacheable = not any(self.cache.is_mutating(rpc_call) for rpc_call, _ in calls)
+        last = start
+        lost = []
+        try:
+            for i, future in futures.items():
+                rpc_call, args = calls[i]
+                try:
+                    if timeout is not None and not wait(future, start + timeout - time.time()):
+                        raise rpc.error.TimeoutError(f"{rpc_call} did not answer within {timeout} seconds")
+                    results[i] = future.get()
+                except rpc.error.TransportError:
+                    lost.append(i)
+                    continue
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results[i] = e
+                    continue
+                if self.packed_arrays:
+                    results[i] = decode_arrays(results[i])
+                now = time.time()
+                self.call_time[rpc_call] += now - last
+                last = now
+                if cacheable:
+                    self.cache.store(rpc_call, args, results[i])
+        finally:
+            # calls timed out, or left behind by an error, count as failed
+            for finish in give_up:
+                finish()
+        if lost:
+            self._lost = True
+        for i in lost:
+            rpc_call, args = calls[i]
+            try:
+                if not self.retry.can_retry(rpc_call):
+                    raise self._lost_error(rpc_call)
+                results[i] = self.call(rpc_call, *args)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results[i] = e
+        if debug:
+            logger.debug('%s: call %d complete in %.3f seconds', self.remote_address, call_id, last - start)
+        return results
     
+    def batch(self) -> CallBatch:
+        """
+        Returns a context manager queuing calls and sending them in one pipelined burst at the end of the block.
+
+            with client.batch() as batch:
+                coords = batch.call("getFoilCoords", "NACA 0012")
+            coords.result
+
+        Returns:
+            CallBatch
+        """
+        self._ensure_rpc_client_exists()
+        return CallBatch(self)
+
     def close(self) -> None:
         """
         Closes the connection with the server.
@@ -102,6 +324,7 @@ class Client():
         """
         self._rpc_client.close()
         delattr(self, "_rpc_client")
+        self.cache.clear()
 
     @property
     def is_connected(self) -> bool:
@@ -110,7 +333,14 @@ class Client():
         """
         if not hasattr(self, '_rpc_client'):
             return False
-        return self.call("ping")
+        # a single ping, without the retries of client.retry
+        try:
+            if self._lost:
+                self._reconnect()
+            return self._rpc_client.call("ping")
+        except rpc.error.TransportError:
+            self._lost = True
+            return False
     
     @property
     def state(self) -> dict:
@@ -120,6 +350,61 @@ class Client():
                 'connected': self.is_connected, 
                 'display': self._state['display'],
                 }
+    def _negotiate_packed_arrays(self) -> bool:
+        "Asks the server to send packed arrays.  Returns False if the server does not know the call."
+        try:
+            return bool(self._rpc_client.call(NEGOTIATION_CALL, True))
+        except rpc.error.TransportError:
+            raise
+        except rpc.error.RPCError:
+            return False
+
+    def _call_with_retries(self, rpc_call, args, timeout, kwargs):
+        "Sends a call, reconnecting and retrying read-only calls if the connection is lost"
+        retry = 0
+        while True:
+            try:
+                if self._lost:
+                    self._reconnect()
+                if timeout is None:
+                    return self._rpc_client.call(rpc_call, *args, **kwargs)
+                future = self._rpc_client.call_async(rpc_call, *args, **kwargs)
+                if not wait(future, timeout):
+                    raise rpc.error.TimeoutError(f"{rpc_call} did not answer within {timeout} seconds")
+                return future.get()
+            except rpc.error.TransportError as e:
+                self._lost = True
+                if not self.retry.can_retry(rpc_call):
+                    raise self._lost_error(rpc_call) from e
+                retry += 1
+                delay = self.retry.delay(retry)
+                if delay is None:
+                    raise
+                logger.warning('%s: %s (%s), retry %d of %d in %.2f seconds', self.remote_address, e, rpc_call,
+                               retry, self.retry.retries, delay)
+                time.sleep(delay)
+
+    def _lost_error(self, rpc_call) -> ConnectionLostError:
+        return ConnectionLostError(f"connection to {self.remote_address} lost during {rpc_call}, the call was not "
+                                   f"retried since the server may have applied it")
+
+    def _open(self):
+        # the loop is shared by successive connections so that its timeout callback is replaced, not duplicated
+        rpc_client = rpc.Client(self._address, timeout=self._timeout, loop=self._rpc_loop, builder=_TcpBuilder,
+                                pack_encoding='utf-8', unpack_encoding='utf-8')
+        _check_session(rpc_client)
+        return rpc_client
+
+    def _reconnect(self) -> None:
+        "Replaces a lost connection.  The server may have restarted, so the cache is dropped."
+        self._rpc_client.close()
+        self._rpc_client = self._open()
+        self.cache.clear()
+        if self.packed_arrays:
+            self.packed_arrays = self._negotiate_packed_arrays()
+        self._lost = False
+        logger.info('%s: reconnected', self.remote_address)
+
     def _ensure_rpc_client_exists(self):
         if not hasattr(self, '_rpc_client'):
             raise ClientNotConnectedException("Client is not connected")
@@ -22,4 +22,22 @@ class Analysis2dInitializationError(GenericException):
     pass
 
 class AnalysisDoesNotExistError(GenericException):
-    pass
\ No newline at end of file
+    pass
+
+class BatchNotFlushedError(GenericException):
+    pass
+
+class InvalidFoilFileError(GenericException):
+    pass
+
+class SweepCheckpointError(GenericException):
+    pass
+
+class JobTimeoutError(GenericException):
+    pass
+
+class JobCancelledError(GenericException):
+    pass
+
+class ConnectionLostError(GenericException):
+    pass
@@ -0,0 +1,521 @@
+"""
+Stand-in for the XFLR5-RPC server, for tests and client-side benchmarks on machines without the XFLR5 GUI.
+
+FakeServer speaks the same msgpack-rpc protocol and implements the calls the client makes, backed by in-memory
+foils and polars.  Results are synthetic (a thin-airfoil lift curve with a simple stall model), so it is only
+suited to measuring the client, not the aerodynamics.
+
+    with FakeServer(latency=0.002) as server:
+        client = Client().connect(port=server.port)
+
+or as a subprocess:
+
+    python -m xflrpy.fake_server --port 8080 --latency 0.002 --polar-points 10000
+"""
+import argparse
+import asyncio
+import math
+import os
+import threading
+import time
+import msgpack
+import numpy as np
+from msgpackrpc import message
+from xflrpy import foil_io, geometry
+from xflrpy.module import ModuleType
+from xflrpy.packing import NEGOTIATION_CALL, pack_array, unpack_array
+from xflrpy.polar2d import PolarResultType, PolarType
+
+READ_CHUNK_SIZE = 65536
+
+# PolarResult column names in PolarResultType order
+POLAR_RESULT_KEYS = ['alpha', 'Cl', 'XCp', 'Cd', 'Cdp', 'Cm', 'XTr1', 'XTr2', 'HMom', 'Cpmn', 'ClCd', 'Cl32Cd',
+                     'RtCl', 'Re']
+
+
+class FakeServer():
+    """
+    In-process msgpack-rpc server imitating XFLR5.  It runs its own event loop in a background thread.
+
+    Args:
+        port (int): port to listen on.  0 picks a free port, available as server.port after start().
+        latency (float): seconds each response is delayed.  Responses are delayed concurrently, like network
+            latency, so pipelined calls overlap.
+        service_time (float): seconds of blocking work per call.  Calls are processed one after the other, like
+            the single XFLR5 GUI thread.
+        polar_points (int): optional.  If set, getPolarResult returns this many synthetic points for every polar,
+            to benchmark large payloads.
+        supports_packed_arrays (bool): whether the server accepts setPackedArrays.
+        polar_time (float): seconds batchAnalyze spends on each polar.  The polars are added one after the other
+            while other calls keep being served, like the analysis threads of XFLR5, and the call returns once all
+            are done.
+    """
+
+    def __init__(self, port=0, latency=0.0, service_time=0.0, polar_points=None, supports_packed_arrays=True,
+                 polar_time=0.0):
+        self.port = port
+        self.latency = latency
+        self.service_time = service_time
+        self.polar_points = polar_points
+        self.polar_time = polar_time
+        self.supports_packed_arrays = supports_packed_arrays
+        self.handler = FakeXflr5(self)
+        self.call_count = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._loop = None
+        self._server = None
+        self._writers = set()
+        self._tasks = set()
+
+    def start(self) -> int:
+        """
+        Starts serving in a background thread.
+
+        Returns:
+            int: the port the server listens on
+        """
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(self.serve(), self._loop).result()
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+    async def serve(self) -> int:
+        "Starts serving on the running event loop.  Use this instead of start() from asyncio code."
+        self._server = await asyncio.start_server(self._handle, '127.0.0.1', self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def close(self) -> None:
+        self._server.close()
+        self._close_connections()
+        # responses still delayed or computing will never be sent
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def drop_connections(self) -> None:
+        "Closes every open connection, like a network failure.  The server keeps listening and its state is kept."
+        if self._loop is None:
+            # served with serve() on the running loop
+            self._close_connections()
+        else:
+            self._loop.call_soon_threadsafe(self._close_connections)
+
+    def _close_connections(self):
+        for writer in list(self._writers):
+            writer.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    async def _handle(self, reader, writer):
+        unpacker = msgpack.Unpacker(raw=False)
+        packer = msgpack.Packer()
+        self._writers.add(writer)
+        while True:
+            try:
+                data = await reader.read(READ_CHUNK_SIZE)
+            except ConnectionError:
+                break
+            if not data:
+                break
+            unpacker.feed(data)
+            for msg in unpacker:
+                if msg[0] == message.REQUEST:
+                    _, msgid, method, args = msg
+                    response = self._dispatch(method, args)
+                    task = asyncio.get_running_loop().create_task(self._respond(writer, packer, msgid, *response))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                elif msg[0] == message.NOTIFY:
+                    self._dispatch(msg[1], msg[2])
+        self._writers.discard(writer)
+        writer.close()
+
+    def _dispatch(self, method, args):
+        self.call_count += 1
+        if self.service_time:
+            time.sleep(self.service_time)
+        try:
+            if method.startswith('_') or not hasattr(self.handler, method):
+                raise AttributeError(f"'{method}' method not found")
+            if method == NEGOTIATION_CALL and not self.supports_packed_arrays:
+                raise AttributeError(f"'{method}' method not found")
+            result = getattr(self.handler, method)(*args)
+            # long running calls return a coroutine, awaited before responding
+            return None, result if asyncio.iscoroutine(result) else self.handler.encode(result)
+        except Exception as e:
+            return str(e), None
+
+    async def _respond(self, writer, packer, msgid, error, result):
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        if asyncio.iscoroutine(result):
+            try:
+                result = self.handler.encode(await result)
+            except Exception as e:
+                error, result = str(e), None
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._in_flight -= 1
+        if not writer.is_closing():
+            writer.write(packer.pack([message.RESPONSE, msgid, error, result]))
+
+    def __str__(self):
+        return f"<FakeServer>(port:{self.port}, latency:{self.latency}, calls:{self.call_count})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class FakeXflr5():
+    """
+    The rpc methods of FakeServer and the in-memory project they work on.  Foils are stored as
+    {name: {'name', 'camber', 'camber_x', 'thickness', 'thickness_x', 'n', 'coords', 'visible', 'style'}} and polars as
+    {(foil_name, polar_name): {'foil_name', 'name', 'spec', 'result'}}.
+    """
+
+    def __init__(self, server):
+        self._server = server
+        self.packed = False
+        self.app = int(ModuleType.NOAPP)
+        self.project_path = ''
+        self.saved = True
+        self.foils = {}
+        self.polars = {}
+        self.planes = {}
+        self.current_foil = None
+
+    def encode(self, value):
+        "Makes NumPy arrays of a response serializable, packed if packed arrays were negotiated"
+        if isinstance(value, np.ndarray):
+            return pack_array(value) if self.packed else value.tolist()
+        if isinstance(value, dict):
+            return {k: self.encode(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.encode(v) for v in value]
+        return value
+
+    # SESSION
+
+    def ping(self):
+        return True
+
+    def setPackedArrays(self, enabled):
+        self.packed = bool(enabled)
+        return self.packed
+
+    def getState(self):
+        return {'projectPath': self.project_path, 'projectName': os.path.basename(self.project_path),
+                'app': self.app, 'saved': self.saved, 'display': {}}
+
+    def setApp(self, app):
+        self.app = int(app)
+
+    # PROJECT
+
+    def newProject(self):
+        self.__init__(self._server)
+
+    def setProjectPath(self, path):
+        self.project_path = path
+
+    def saveProject(self):
+        self.saved = True
+
+    def loadProject(self, paths):
+        for path in paths:
+            name, coords = foil_io.read_dat(_resolve_path(path))
+            self._set_foil(name, coords)
+
+    def validateFilePaths(self, paths):
+        return [[_resolve_path(p) is not None, p] for p in paths]
+
+    def exit(self):
+        pass
+
+    # FOILS
+
+    def foilList(self):
+        return [self._foil_msg(f) for f in self.foils.values()]
+
+    def getFoil(self, name):
+        return self._foil_msg(self._foil(name))
+
+    def getFoilCoords(self, name):
+        return self._foil(name)['coords']
+
+    def setFoilCoords(self, name, coords, update_gui=True):
+        self._set_foil(name, _as_coords(coords))
+
+    def createNACAFoil(self, digits, name):
+        self._set_foil(name, geometry.naca(str(int(digits)).zfill(4)))
+
+    def duplicateFoil(self, name, new_name):
+        self._set_foil(new_name, self._foil(name)['coords'].copy())
+        return self.getFoil(new_name)
+
+    def renameFoil(self, name, new_name):
+        foil = self.foils.pop(name)
+        foil['name'] = new_name
+        self.foils[new_name] = foil
+        for key in [k for k in self.polars if k[0] == name]:
+            polar = self.polars.pop(key)
+            polar['foil_name'] = new_name
+            self.polars[(new_name, key[1])] = polar
+
+    def deleteFoil(self, name):
+        self.foils.pop(name, None)
+        for key in [k for k in self.polars if k[0] == name]:
+            del self.polars[key]
+
+    def setGeom(self, name, camber=0., camber_x=0., thickness=0., thickness_x=0.):
+        # XFLR5 leaves parameters passed as 0 unchanged
+        coords = geometry.set_camber_thickness(self._foil(name)['coords'], camber or None, camber_x or None,
+                                               thickness or None, thickness_x or None)
+        self._set_foil(name, coords)
+
+    def normalizeFoil(self, name):
+        self._set_foil(name, geometry.normalize(self._foil(name)['coords']))
+
+    def derotateFoil(self, name):
+        self._set_foil(name, geometry.derotate(self._foil(name)['coords']))
+
+    def exportFoil(self, name, file_name):
+        foil = self._foil(name)
+        with open(file_name, 'w') as f:
+            f.write(name + '\n')
+            f.writelines(f'  {x:.6f}  {y:.6f}\n' for x, y in foil['coords'])
+
+    def setCurFoil(self, name, select=False):
+        self.current_foil = self._foil(name)['name']
+
+    def showFoil(self, name, visible=True):
+        self._foil(name)['style']['visible'] = bool(visible)
+
+    def getLineStyle(self, name):
+        return dict(self._foil(name)['style'])
+
+    def setLineStyle(self, name, style):
+        self._foil(name)['style'].update(style)
+
+    # 2D ANALYSES
+
+    def defineAnalysis2D(self, polar):
+        spec = dict(polar['spec'])
+        name = polar['name'] or _polar_name(spec)
+        self._foil(polar['foil_name'])
+        self.polars[(polar['foil_name'], name)] = {'foil_name': polar['foil_name'], 'name': name, 'spec': spec,
+                                                   'result': _empty_result()}
+        return self._polar_msg(self.polars[(polar['foil_name'], name)])
+
+    def polarList(self, foil_name):
+        return [self._polar_msg(p) for (f, _), p in self.polars.items() if f == foil_name]
+
+    def getPolar(self, foil_name, polar_name, set_current=True, select=True):
+        return self._polar_msg(self._polar(foil_name, polar_name))
+
+    def deletePolar(self, foil_name, polar_name):
+        self.polars.pop((foil_name, polar_name), None)
+
+    def analyzePolar(self, polar, settings, op_point_values):
+        stored = self._polar(polar['foil_name'], polar['name'])
+        start, end, step = settings['sequence']
+        # like XFLR5, a call that is not a sequence analyzes the start of the sequence only
+        alpha = _sequence(start, end, step) if settings.get('is_sequence', True) else np.array([float(start)])
+        result = _synthetic_result(alpha, self._foil(polar['foil_name']), stored['spec'])
+        _merge_result(stored['result'], result)
+        return _select(result, op_point_values)
+
+    def getPolarResult(self, foil_name, polar_name, op_point_values):
+        polar = self._polar(foil_name, polar_name)
+        if self._server.polar_points:
+            alpha = np.linspace(-15, 15, self._server.polar_points)
+            return _select(_synthetic_result(alpha, self._foil(foil_name), polar['spec']), op_point_values)
+        return _select(polar['result'], op_point_values)
+
+    def getOpPoints(self, foil_name, polar_name):
+        polar = self._polar(foil_name, polar_name)
+        result = polar['result']
+        return [{'alpha': float(result['alpha'][i]), 'polar_name': polar_name, 'foil_name': foil_name,
+                 'Cl': float(result['Cl'][i]), 'XCp': float(result['XCp'][i]), 'Cd': float(result['Cd'][i]),
+                 'Cdp': float(result['Cdp'][i]), 'Cm': float(result['Cm'][i]), 'XTr1': float(result['XTr1'][i]),
+                 'XTr2': float(result['XTr2'][i]), 'HMom': float(result['HMom'][i]),
+                 'Cpmn': float(result['Cpmn'][i]), 'Re': float(result['Re'][i]),
+                 'mach': float(polar['spec'].get('mach', 0.0))}
+                for i in range(len(result['alpha']))]
+
+    def batchAnalyze(self, params):
+        polars = self._batch_polars(params)
+        if self._server.polar_time:
+            return self._add_polars_slowly(polars)
+        self.polars.update(polars)
+
+    def _batch_polars(self, params):
+        alpha = _sequence(params['min'], params['max'], params['increment'])
+        for foil_name in params['foil_names']:
+            foil = self._foil(foil_name)
+            for re in params['re_list']:
+                spec = {'polar_type': int(params.get('polar_type', PolarType.FIXEDSPEEDPOLAR)), 'reynolds': re,
+                        'mach': params['mach'], 'ncrit': params['ncrit'], 'xtop': params['transition_top'],
+                        'xbot': params['transition_bot']}
+                name = _polar_name(spec)
+                yield (foil_name, name), {'foil_name': foil_name, 'name': name, 'spec': spec,
+                                          'result': _synthetic_result(alpha, foil, spec)}
+
+    async def _add_polars_slowly(self, polars):
+        for key, polar in polars:
+            await asyncio.sleep(self._server.polar_time)
+            self.polars[key] = polar
+
+    # PLANES
+
+    def addDefaultPlane(self, name):
+        self.planes[name] = {'name': name, 'span': 2.0, 'root_chord': 0.18, 'tip_chord': 0.12}
+        return {'name': name}
+
+    def getPlanes(self):
+        return [{'name': name} for name in self.planes]
+
+    def getPlaneData(self, name):
+        "Main wing properties, in the 'key = value unit' lines of the XFLR5 plane description"
+        if name not in self.planes:
+            raise KeyError(f"plane '{name}' not found")
+        plane = self.planes[name]
+        area = plane['span'] * (plane['root_chord'] + plane['tip_chord']) / 2
+        lines = [('Wing Span', plane['span'], 'm'), ('Wing Area', area, 'm²'),
+                 ('Mean Geom. Chord', area / plane['span'], 'm'), ('Aspect ratio', plane['span'] ** 2 / area, ''),
+                 ('Taper Ratio', plane['root_chord'] / plane['tip_chord'], '')]
+        return '\n'.join(f'{key} = {value:.5f} {unit}'.rstrip() for key, value, unit in lines)
+
+    # HELPERS
+
+    def _foil(self, name):
+        if name not in self.foils:
+            raise KeyError(f'foil "{name}" does not exist')
+        return self.foils[name]
+
+    def _polar(self, foil_name, polar_name):
+        if (foil_name, polar_name) not in self.polars:
+            raise KeyError(f'polar "{polar_name}" of foil "{foil_name}" does not exist')
+        return self.polars[(foil_name, polar_name)]
+
+    def _set_foil(self, name, coords):
+        style = self.foils[name]['style'] if name in self.foils else {
+            'visible': True, 'stipple': 0, 'point_style': 0, 'width': 1, 'color': [0, 0, 255, 255], 'tag': ''}
+        foil = {'name': name, 'coords': coords, 'style': style}
+        foil.update(geometry.camber_thickness(coords))
+        foil['n'] = len(coords)
+        self.foils[name] = foil
+        self.saved = False
+
+    def _foil_msg(self, foil):
+        return {k: foil[k] for k in ('name', 'camber', 'camber_x', 'thickness', 'thickness_x', 'n')}
+
+    def _polar_msg(self, polar):
+        return {'foil_name': polar['foil_name'], 'name': polar['name'], 'spec': polar['spec']}
+
+
+def _as_coords(coords) -> np.ndarray:
+    if isinstance(coords, msgpack.ExtType):
+        return np.array(unpack_array(coords))
+    return np.asarray(coords, dtype=np.float64)
+
+
+def _resolve_path(path):
+    "Finds a file ignoring the case of its name, like XFLR5 on Windows does.  Returns None if there is none."
+    if os.path.isfile(path):
+        return path
+    folder, name = os.path.split(path)
+    if os.path.isdir(folder or '.'):
+        for entry in os.listdir(folder or '.'):
+            if entry.lower() == name.lower():
+                return os.path.join(folder, entry)
+    return None
+
+
+def _sequence(start, end, step) -> np.ndarray:
+    "Angles from start to end, end excluded, giving the point count of XFLR5"
+    if not step:
+        return np.array([float(start)])
+    return start + step * np.arange(int(round((end - start) / step)))
+
+
+def _polar_name(spec) -> str:
+    return (f"T{int(spec.get('polar_type', PolarType.FIXEDSPEEDPOLAR)) + 1}_Re{spec.get('reynolds', 0) / 1e6:.3f}"
+            f"_M{spec.get('mach', 0):.2f}_N{spec.get('ncrit', 9):.1f}")
+
+
+def _empty_result() -> dict:
+    return {k: np.empty(0) for k in POLAR_RESULT_KEYS}
+
+
+def _synthetic_result(alpha, foil, spec) -> dict:
+    "Thin airfoil lift with a smooth stall at 12 degrees and a parabolic drag polar"
+    alpha = np.asarray(alpha, dtype=np.float64)
+    rad = np.radians(alpha)
+    alpha0 = -2 * foil['camber'] * 100 * math.pi / 180 * 0.5
+    cl_linear = 2 * math.pi * (rad - math.radians(alpha0))
+    stall = 1 / (1 + np.exp((np.abs(alpha) - 12) * 1.5))
+    cl = cl_linear * stall + np.sign(alpha) * 0.9 * (1 - stall) * np.abs(np.sin(2 * rad))
+    re = float(spec.get('reynolds', 1e5))
+    cd0 = 0.0074 / (re / 1e6) ** 0.2 + foil['thickness'] * 0.02
+    cd = cd0 + 0.01 * cl ** 2 + (1 - stall) * 0.5 * np.sin(rad) ** 2
+    n = len(alpha)
+    return {
+        'alpha': alpha, 'Cl': cl, 'XCp': 0.25 + 0.02 * np.tanh(cl), 'Cd': cd, 'Cdp': cd * 0.4,
+        'Cm': -0.1 * foil['camber'] * 10 * np.ones(n), 'XTr1': np.clip(0.6 - 0.03 * alpha, 0, 1),
+        'XTr2': np.clip(0.6 + 0.03 * alpha, 0, 1), 'HMom': np.zeros(n), 'Cpmn': -1 - 2 * np.abs(cl),
+        'ClCd': cl / cd, 'Cl32Cd': np.sign(cl) * np.abs(cl) ** 1.5 / cd,
+        'RtCl': 1 / np.sqrt(np.maximum(np.abs(cl), 1e-6)), 'Re': np.full(n, re),
+    }
+
+
+def _merge_result(stored, result):
+    "Adds the points of result to stored, replacing points with the same alpha, sorted by alpha"
+    alpha = np.concatenate([stored['alpha'], result['alpha']])
+    _, index = np.unique(alpha[::-1], return_index=True)
+    index = len(alpha) - 1 - index
+    for k in POLAR_RESULT_KEYS:
+        stored[k] = np.concatenate([stored[k], result[k]])[index]
+
+
+def _select(result, op_point_values) -> dict:
+    return {POLAR_RESULT_KEYS[int(i)]: result[POLAR_RESULT_KEYS[int(i)]] for i in op_point_values
+            if int(i) in PolarResultType._value2member_map_}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in XFLR5-RPC server for tests and benchmarks")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds each response is delayed")
+    parser.add_argument('--service-time', type=float, default=0.0, help="seconds of blocking work per call")
+    parser.add_argument('--polar-points', type=int, default=None, help="points returned by getPolarResult")
+    parser.add_argument('--polar-time', type=float, default=0.0, help="seconds batchAnalyze spends on each polar")
+    args = parser.parse_args(argv)
+
+    server = FakeServer(args.port, args.latency, args.service_time, args.polar_points, polar_time=args.polar_time)
+    loop = asyncio.new_event_loop()
+    server._loop = loop
+    port = loop.run_until_complete(server.serve())
+    print(f"FakeServer listening on 127.0.0.1:{port}", flush=True)
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
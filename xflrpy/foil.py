@@ -1,12 +1,18 @@
 from xflrpy.mixins import MsgpackMixin, DictListInterface
-from xflrpy.polar2d import PolarType, Analysis2dManager, BatchAnalysisSettings2D
+from xflrpy.polar2d import (PolarType, PolarResult, PolarResultType, Analysis2dManager, BatchAnalysisSettings2D,
+                            PolarTable, _fetch_polar_results)
 from xflrpy.module import ModuleType
-from xflrpy import Client
 from xflrpy.exceptions import InvalidFoilPathError, InvalidNacaValueError
+from xflrpy import foil_io, geometry
 import os
+import time
+import numpy as np
 
 import enum
 
+# NACA foil created on the server to be overwritten with coordinates
+PLACEHOLDER_NACA = 12
+
 
 class StippleType(enum.IntEnum):
     SOLID = 0
@@ -60,8 +66,8 @@ class Foil(MsgpackMixin):
     thickness_x = 0.0
     n = 0
 
-    def __init__(self) -> None:
-        self._client = Client()
+    def __init__(self, client=None) -> None:
+        self._client = client
         self.analyses = Analysis2dManager(self)
 
     def rename(self, name):
@@ -70,12 +76,13 @@ class Foil(MsgpackMixin):
 
     def duplicate(self, name):
         foil_raw = self._client.call("duplicateFoil", self.name, name)
-        return self.from_msgpack(foil_raw)
+        return self.from_msgpack(foil_raw, self._client)
 
     def delete(self) -> None:
         self._client.call("deleteFoil", self.name)
 
-    def set_coordinates(self, xy: list, update_gui=True):
+    def set_coordinates(self, xy, update_gui=True):
+        "xy can be a list of [x, y] pairs or an (n, 2) array"
         self._client.call("setFoilCoords", self.name, xy, update_gui)
         self._update()
 
@@ -100,24 +107,30 @@ class Foil(MsgpackMixin):
         self._client.call("exportFoil", self.name, file_name)
 
     def to_dat(self, newline="\n"):
-        text = self.name + newline
-        for c in self.coordinates:
-            text += f'  {c[0]:.6f}  {c[1]:.6f}{newline}'
-        return text
+        return foil_io.format_dat(self.name, self.coordinate_array, newline)
 
     @property
     def coordinates(self) -> list:
-        return self._client.call("getFoilCoords", self.name)
+        coordinates = self._client.call("getFoilCoords", self.name)
+        if isinstance(coordinates, np.ndarray):
+            return coordinates.tolist()
+        return coordinates
+
+    @property
+    def coordinate_array(self) -> np.ndarray:
+        "Coordinates as an (n, 2) float64 array.  With packed arrays this is a view on the received buffer."
+        return np.asarray(self._client.call("getFoilCoords", self.name), dtype=np.float64)
 
     def _update(self):
         foil_raw = self._client.call("getFoil", self.name)
         self.__dict__.update(foil_raw)
 
     def _compare_coordinates_set(self, other_foil):
-        if len(self.coordinates) != len(other_foil):
+        coordinates = self.coordinates
+        if len(coordinates) != len(other_foil):
             return False
-        for i in range(len(self.coordinates)):
-            if self.coordinates[i] != other_foil[i]:
+        for i in range(len(coordinates)):
+            if coordinates[i] != other_foil[i]:
                 return False
         return True
 
@@ -166,8 +179,115 @@ class Foil(MsgpackMixin):
             self.thickness_x == other_foil.thickness_x and
             self.n == other_foil.n
         )
-        coords_check = self._compare_coordinates_set(other_foil.coordinates)
-        return params_check and coords_check
+        return params_check and self._compare_coordinates_set(other_foil.coordinates)
+
+
+def _check_dat_paths(paths) -> list:
+    "Normalizes paths to a list and ensures every path points to a .dat file"
+    if type(paths) == str:
+        paths = [paths]
+    for path in paths:
+        if path[-4:].lower() != ".dat":
+            raise InvalidFoilPathError(
+                f'Please provide a valid .dat file. "{path}" is invalid.')
+    return paths
+
+
+def _check_validation_result(paths, validation_result):
+    "Raises on the first path the server reported as missing"
+    for i, path in enumerate(paths):
+        if validation_result[i] == False:
+            raise InvalidFoilPathError(
+                f'Please provide a valid file path. "{path}" is does not exist.')
+
+
+def _check_naca_digits(digits, name=None, max_digits=4):
+    "Validates a NACA value of up to max_digits digits and returns it as an int together with the foil name"
+    try:
+        digits = int(digits)
+    except:
+        raise InvalidNacaValueError(
+            f"ERROR - NACA foil value must be positive, {max_digits} digit value")
+    if not (digits > 0 and digits < 10 ** max_digits):
+        raise InvalidNacaValueError(
+            f"ERROR - NACA foil value must be positive, {max_digits} digit value")
+    if not name:
+        name = "NACA " + str(digits).zfill(max_digits)
+    return digits, name
+
+
+def _batch_settings(foil_list, re_list, polar_type=PolarType.FIXEDLIFTPOLAR, mach=0, ncrit=9, transition_top=1,
+                    transition_bot=1, range_type_alpha=True, sequence=(-15, 15, 0.25), from_zero=True,
+                    init_bl=True, store_op_point=False, update_polar_view=False,
+                    thread_count=0) -> BatchAnalysisSettings2D:
+    "Builds the batchAnalyze settings for a list of foil names or Foil objects"
+    params = BatchAnalysisSettings2D()
+
+    # foil list can be list of foil names or foil objects.
+    foil_names_list = []
+    for foil in foil_list:
+        if type(foil) == Foil:
+            foil_names_list.append(foil.name)
+        else:
+            foil_names_list.append(foil)
+
+    params.foil_names = foil_names_list
+    params.re_list = re_list
+    params.mach = mach
+    params.ncrit = ncrit
+    params.polar_type = polar_type
+    params.transition_top = transition_top
+    params.transition_bot = transition_bot
+    params.range_type_alpha = range_type_alpha
+    params.min = sequence[0]
+    params.max = sequence[1]
+    params.increment = sequence[2]
+    params.from_zero = from_zero
+    params.init_bl = init_bl
+    params.store_op_point = store_op_point
+    params.update_polar_view = update_polar_view
+    params.thread_count = thread_count
+    return params
+
+
+def _batch_polar_filter(params):
+    "Returns accept(foil name, polar msgpack), true for the polars a batch with these settings produces"
+    conditions = [float(params.mach), float(params.ncrit), float(params.transition_top), float(params.transition_bot)]
+    re_values = np.asarray(params.re_list, dtype=np.float64)
+    polar_type = int(params.polar_type)
+
+    def accept(foil_name, polar):
+        spec = polar.get('spec', {})
+        try:
+            reynolds = float(spec['reynolds'])
+            values = [float(spec[k]) for k in ('mach', 'ncrit', 'xtop', 'xbot')]
+            if int(spec['polar_type']) != polar_type:
+                return False
+        except (KeyError, TypeError, ValueError):
+            return False
+        return bool(np.any(np.isclose(re_values, reynolds, rtol=1e-9))) and np.allclose(values, conditions)
+    return accept
+
+
+class LoadReport():
+    """
+    Outcome of loading many foil files: report.loaded lists the paths loaded and report.errors maps every path that
+    was not to its exception.
+    """
+
+    def __init__(self) -> None:
+        self.loaded = []
+        self.errors = {}
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def __str__(self):
+        return f'<LoadReport>(loaded:{len(self.loaded)} failed:{len(self.errors)})'
+
+    def __repr__(self):
+        return self.__str__()
 
 
 class FoilManager(DictListInterface):
@@ -177,58 +297,102 @@ class FoilManager(DictListInterface):
 
     """
 
-    def __init__(self) -> None:
-        self._client = Client()
+    def __init__(self, client) -> None:
+        self._client = client
 
-    def load(self, paths):
+    def load(self, paths, chunk_size=100):
         """
         Loads .dat airfoil files on the remote XFLR5-RPC server.
 
         Args:
             paths (str or str[]): a path or array of absolute paths to load on the XFLR-RPC server.
+            chunk_size (int): number of files sent in one loadProject call.
         Returns:
             None
         Raises:
             InvalidFoilPathException: if a single path is invalid and will prevent any files from being loaded.
         """
         self._set_client_module(ModuleType.DIRECTFOILDESIGN)
+        paths = _check_dat_paths(paths)
+        _check_validation_result(paths, self._validate_file_paths(paths))
+        report = LoadReport()
+        self._load_chunks(paths, chunk_size, report)
+        for error in report.errors.values():
+            raise error
+
+    def load_many(self, paths, chunk_size=100):
+        """
+        Loads many .dat airfoil files on the remote XFLR5-RPC server, for example a whole airfoil database.  Paths are
+        validated in one call and the files are sent in chunks of chunk_size per loadProject call, all pipelined.  A
+        chunk the server fails to load is retried file by file, so that one broken file does not fail the others.
+
+        Unlike load, invalid files do not raise: they are listed in the returned report.
+
+        Args:
+            paths (str or str[]): a path or array of absolute paths to load on the XFLR-RPC server.
+            chunk_size (int): number of files sent in one loadProject call.
+        Returns:
+            LoadReport: the paths loaded and the error of every path that was not
+        """
+        self._set_client_module(ModuleType.DIRECTFOILDESIGN)
         if type(paths) == str:
             paths = [paths]
+        report = LoadReport()
+        dat_paths = []
         for path in paths:
             if path[-4:].lower() != ".dat":
-                raise InvalidFoilPathError(
-                    f'Please provide a valid .dat file. "{path}" is invalid.')
-        validation_result = self._validate_file_paths(paths)
-        for i, path in enumerate(paths):
-            if validation_result[i] == False:
-                raise InvalidFoilPathError(
+                report.errors[path] = InvalidFoilPathError(f'Please provide a valid .dat file. "{path}" is invalid.')
+            else:
+                dat_paths.append(path)
+        valid_paths = []
+        for path, valid in zip(dat_paths, self._validate_file_paths(dat_paths) if dat_paths else []):
+            if valid:
+                valid_paths.append(path)
+            else:
+                report.errors[path] = InvalidFoilPathError(
                     f'Please provide a valid file path. "{path}" is does not exist.')
-        for path in paths:
-            self._client.call("loadProject", [path])
+        self._load_chunks(valid_paths, chunk_size, report)
+        return report
 
-    def load_folder(self, path):
+    def load_folder(self, path, chunk_size=100):
         """
-        Loads all .dat airfoil files contained within a specified folder on the remote XFLR5-RPC server.
+        Loads all .dat airfoil files contained within a specified folder on the remote XFLR5-RPC server.  The folder
+        is listed on the client, so it must be reachable under the same path from both sides.
 
         Args:
             path (str): an absolute path to a folder on the XFLR-RPC server from which to load .dat files.
+            chunk_size (int): number of files sent in one loadProject call.
         Returns:
-            None
+            LoadReport: the paths loaded and the error of every .dat file that was not
         """
-        self._client.modules.set(ModuleType.DIRECTFOILDESIGN)
-        files = [f for f in os.listdir(
-            path) if os.path.isfile(os.path.join(path, f))]
-        loaded = []
-        for file in files:
-            try:
-                self.load(os.path.join(path, file))
-            except InvalidFoilPathError:
-                continue
-            loaded.append(file)
+        files = sorted(f for f in os.listdir(path)
+                       if f[-4:].lower() == ".dat" and os.path.isfile(os.path.join(path, f)))
+        return self.load_many([os.path.join(path, f) for f in files], chunk_size)
+
+    def _load_chunks(self, paths, chunk_size, report):
+        chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), max(1, chunk_size))]
+        results = self._client.call_many([("loadProject", (chunk,)) for chunk in chunks], return_exceptions=True)
+        retry = []
+        for chunk, result in zip(chunks, results):
+            if not isinstance(result, Exception):
+                report.loaded.extend(chunk)
+            elif len(chunk) > 1:
+                retry.extend(chunk)
+            else:
+                report.errors[chunk[0]] = result
+        if retry:
+            results = self._client.call_many([("loadProject", ([p],)) for p in retry], return_exceptions=True)
+            for path, result in zip(retry, results):
+                if isinstance(result, Exception):
+                    report.errors[path] = result
+                else:
+                    report.loaded.append(path)
 
     def delete_all(self):
-        "Deletes all foils on the server"
-        [f.delete() for _, f in self.to_dict().items()]
+        "Deletes all foils on the server, in one pipelined burst"
+        with self._client.batch() as batch:
+            for name in self._get_items():
+                batch.call("deleteFoil", name)
 
     def create_naca_foil(self, digits, name=None):
         """
@@ -237,27 +401,59 @@ class FoilManager(DictListInterface):
         THIS WILL OVERWRITE AN EXISTING FOIL WITH THE SAME NAME!
 
         Args:
-            digits (int or str): a 1-4 digit value specifying the naca foil parameters.
+            digits (int or str): a 1-4 digit value specifying the naca foil parameters, or a 5 digit value.  The
+                server only generates 4 digit foils, 5 digit foils are generated with xflrpy.geometry.
             name (str): optional.  Specifies a name for the new foil.  Default is "NACA {digits}".
         Returns:
             Foil: newly created NACA foil
         Raises:
             InvalidNacaValueError: on invalid digits value
         """
+        five_digits = len(str(digits).strip()) == 5
+        digits, name = _check_naca_digits(digits, name, 5 if five_digits else 4)
+        if five_digits:
+            # the server only generates 4 digit foils
+            return self.create_from_coordinates(name, geometry.naca(str(digits).zfill(5)))
         self._set_client_module(ModuleType.DIRECTFOILDESIGN)
-        try:
-            digits = int(digits)
-        except:
-            raise InvalidNacaValueError(
-                "ERROR - NACA foil value must be positive, 4 digit value")
-        if not (digits > 0 and digits <= 9999):
-            raise InvalidNacaValueError(
-                "ERROR - NACA foil value must be positive, 4 digit value")
-        if not name:
-            name = "NACA " + str(digits).zfill(4)
         self._client.call("createNACAFoil", digits, name)
         return self.get(name)
 
+    def create_from_coordinates(self, name, xy, update_gui=True):
+        """
+        Creates a new foil on the server from coordinates, for example generated with xflrpy.geometry.
+
+        THIS WILL OVERWRITE AN EXISTING FOIL WITH THE SAME NAME!
+
+        Args:
+            name (str): name of the new foil
+            xy (list or numpy.ndarray): [x, y] pairs or an (n, 2) array in Selig order
+        Returns:
+            Foil: the new foil
+        """
+        return self.create_many({name: xy}, update_gui)[0]
+
+    def create_many(self, foils, update_gui=False):
+        """
+        Creates many foils from coordinates in one pipelined burst.
+
+        THIS WILL OVERWRITE EXISTING FOILS WITH THE SAME NAMES!
+
+        Args:
+            foils (dict): {name: coordinates}, coordinates as for create_from_coordinates
+            update_gui (bool): redraw the server GUI after each foil.  Off by default, it is slow for many foils.
+        Returns:
+            list: the new Foil objects, in the order of foils
+        """
+        self._set_client_module(ModuleType.DIRECTFOILDESIGN)
+        calls = []
+        for name, xy in foils.items():
+            # the server has no call creating a foil from coordinates, overwrite a placeholder foil
+            calls.append(("createNACAFoil", (PLACEHOLDER_NACA, name)))
+            calls.append(("setFoilCoords", (name, xy, update_gui)))
+            calls.append(("getFoil", (name,)))
+        results = self._client.call_many(calls)
+        return [Foil.from_msgpack(foil_raw, self._client) for foil_raw in results[2::3]]
+
     def _validate_file_paths(self, paths) -> list:
         response = self._client.call("validateFilePaths", paths)
         return [r[0] for r in response]
@@ -271,69 +467,236 @@ class FoilManager(DictListInterface):
         Raises:
             KeyError: on invalid name
         """
-        if name not in [k for k, v in self.to_dict().items()]:
+        # a cached foil is known to exist, so the foilList round trip can be skipped
+        if not self._client.cache.contains("getFoil", name) and name not in self.to_dict():
             raise KeyError(f'Key "{name}" does not exist')
-        return Foil.from_msgpack(self._client.call("getFoil", name))
+        return Foil.from_msgpack(self._client.call("getFoil", name), self._client)
+
+    def get_many(self, names) -> list:
+        """
+        Retrieves several Foils by name from the server.  The requests are pipelined so fetching many foils costs
+        roughly one round trip.
+
+        Args:
+            names (str[]): names of the foils to retrieve
+        Returns:
+            Foil[]: foils in the same order as names
+        Raises:
+            KeyError: on invalid name
+        """
+        uncached = [name for name in names if not self._client.cache.contains("getFoil", name)]
+        if uncached:
+            existing = self.to_dict()
+            for name in uncached:
+                if name not in existing:
+                    raise KeyError(f'Key "{name}" does not exist')
+        foils_raw = self._client.call_many([("getFoil", (name,)) for name in names])
+        return [Foil.from_msgpack(foil_raw, self._client) for foil_raw in foils_raw]
 
     def _get_items(self) -> dict:
-        return {item["name"]: Foil.from_msgpack(item) for item in self._client.call("foilList")}
+        return {item["name"]: Foil.from_msgpack(item, self._client) for item in self._client.call("foilList")}
 
     def run_batch_analysis(self, re_list, foil_list=None, polar_type=PolarType.FIXEDLIFTPOLAR, mach=0, ncrit=9, transition_top=1, 
                            transition_bot=1, range_type_alpha=True, sequence=(-15, 15, 0.25), from_zero=True, 
                            init_bl=True, store_op_point=False, update_polar_view=False, thread_count=0):
         
-        params = BatchAnalysisSettings2D()
-
         # if no foils have been defined analyze all
         if foil_list == None:
             foil_list = self.to_list()
-        
-        # foil list can be list of foil names or foil objects.
-        foil_names_list = []
-        for foil in foil_list:
-            if type(foil) == Foil:
-                foil_names_list.append(foil.name)
-            else:
-                foil_names_list.append(foil)
-
-        params.foil_names = foil_names_list
-        params.re_list = re_list
-        params.mach = mach
-        params.ncrit = ncrit
-        params.polar_type = polar_type
-        params.transition_top = transition_top
-        params.transition_bot = transition_bot
-        params.range_type_alpha = range_type_alpha
-        params.min = sequence[0]
-        params.max = sequence[1]
-        params.increment = sequence[2]
-        params.from_zero = from_zero
-        params.init_bl = init_bl
-        params.store_op_point = store_op_point
-        params.update_polar_view = update_polar_view
-        params.thread_count = thread_count
 
+        params = _batch_settings(foil_list, re_list, polar_type=polar_type, mach=mach, ncrit=ncrit,
+                                 transition_top=transition_top, transition_bot=transition_bot,
+                                 range_type_alpha=range_type_alpha, sequence=sequence, from_zero=from_zero,
+                                 init_bl=init_bl, store_op_point=store_op_point,
+                                 update_polar_view=update_polar_view, thread_count=thread_count)
         self._client.call("batchAnalyze", params.to_msgpack())
 
+    def submit_batch_analysis(self, re_list, foil_list=None, poller=None, **kwargs):
+        """
+        Starts run_batch_analysis without waiting for it.
+
+            job = client.foils.submit_batch_analysis([1e5, 2e5], foils, poller=Client().connect(port=8080))
+            while not job.done():
+                print(f"{job.progress():.0%}")
+                time.sleep(5)
+
+        Args:
+            poller (Client): optional.  Second connection to the same server, used by job.progress() to count the
+                polars of the batch that have points.  Without it the job reports no progress.
+            kwargs: other arguments of run_batch_analysis
+        Returns:
+            Job: resolves to None once the batch is done
+        """
+        if foil_list is None:
+            foil_list = self.to_list()
+        params = _batch_settings(foil_list, re_list, **kwargs)
+        progress = None
+        if poller is not None:
+            accept = _batch_polar_filter(params)
+            expected = max(1, len(params.foil_names) * len(params.re_list))
+
+            def progress():
+                # the batch runs on another connection, whose calls do not invalidate the poller's cache
+                poller.cache.clear()
+                counts = _fetch_polar_results(poller, params.foil_names, [PolarResultType.ALPHA], accept)
+                return sum(1 for _, _, result in counts if len(result)) / expected
+        return self._client.submit("batchAnalyze", params.to_msgpack(), progress=progress)
+
+    def stream_batch_analysis(self, re_list, foil_list=None, poll_interval=1.0, settle=1, op_point_values=None,
+                              poller=None, **kwargs):
+        """
+        Runs a batch analysis and yields the polars as they complete, instead of waiting for the whole batch.
+
+        batchAnalyze is sent without waiting for its response, and the polars of the batch are polled through a
+        second connection, since the server answers a connection in order.  A polar counts as complete once its
+        number of points has not changed for settle polls, or when the batch is over.  Only the point counts are
+        polled, each polar is fetched once, and results are not kept once they have been yielded.
+
+            for foil_name, polar, result in client.foils.stream_batch_analysis([1e5, 2e5], foils):
+                plot(result.alpha, result.Cl)
+
+        Args:
+            re_list (list): Reynolds numbers of the batch
+            foil_list (list): optional.  Foil objects or names, all foils by default.
+            poll_interval (float): seconds between polls
+            settle (int): polls without new points before a polar is considered complete
+            op_point_values (list): optional.  PolarResultType values to fetch, all of them by default.
+            poller (Client): optional.  Connected client used for polling.  By default a second connection to the
+                same server is opened for the stream and closed when it ends; pass a client to reuse one.  It must
+                be used from the same thread as this client.  The batch itself is still subject to the timeout of
+                this client.
+            kwargs: other arguments of run_batch_analysis, e.g. mach, ncrit or sequence
+        Yields:
+            tuple: (foil name, polar msgpack with its name and spec, PolarResult)
+        Raises:
+            msgpackrpc.error.RPCError: if batchAnalyze fails, after the polars completed so far
+        """
+        from xflrpy.client import Client
+
+        if foil_list is None:
+            foil_list = self.to_list()
+        if op_point_values is None:
+            op_point_values = [r for r in PolarResultType]
+        params = _batch_settings(foil_list, re_list, **kwargs)
+        accept = _batch_polar_filter(params)
+
+        own_poller = poller is None
+        if own_poller:
+            ip, port = self._client.remote_address.rsplit(':', 1)
+            poller = Client().connect(ip, int(port))
+        try:
+            # polars of an earlier batch with the same settings are only streamed once they change
+            remaining = {name: len(re_list) for name in params.foil_names}
+            poller.cache.clear()
+            previous = {(name, polar['name']): len(result) for name, polar, result in
+                        _fetch_polar_results(poller, list(remaining), [PolarResultType.ALPHA], accept)}
+            stable = {}
+            done = set()
+            batch = self._client.submit("batchAnalyze", params.to_msgpack())
+            while remaining:
+                # read the flag before polling, so that the last poll sees every polar of a finished batch.  The
+                # response is read by the polls, both clients share the event loop of the thread.
+                finished = batch.done()
+                poller.cache.clear()
+                counts = _fetch_polar_results(poller, list(remaining), [PolarResultType.ALPHA], accept)
+                complete = []
+                for name, polar, result in counts:
+                    key = (name, polar['name'])
+                    if key in done:
+                        continue
+                    if key in stable and stable[key][0] == len(result):
+                        stable[key] = (len(result), stable[key][1] + 1)
+                    else:
+                        stable[key] = (len(result), 0)
+                    changed = previous.get(key) != len(result)
+                    if finished or (changed and len(result) > 0 and stable[key][1] >= settle):
+                        complete.append((name, polar))
+                values = [int(v) for v in op_point_values]
+                raw = poller.call_many([("getPolarResult", (name, polar['name'], values))
+                                        for name, polar in complete])
+                for (name, polar), r in zip(complete, raw):
+                    key = (name, polar['name'])
+                    del stable[key]
+                    previous.pop(key, None)
+                    done.add(key)
+                    remaining[name] -= 1
+                    if remaining[name] <= 0:
+                        del remaining[name]
+                    yield name, polar, PolarResult.from_msgpack(r)
+                if finished:
+                    break
+                time.sleep(poll_interval)
+            batch.result()
+        finally:
+            if own_poller:
+                poller.close()
+
+    def batch_results(self, foil_list=None, re_list=None, op_point_values=None, polar_type=None, mach=None,
+                      ncrit=None) -> PolarTable:
+        """
+        Fetches the polars of several foils as one table, in two pipelined bursts instead of a polarList per foil and
+        a getPolarResult per polar.  Polars are not selected in the GUI.
+
+        The filters select the polars of one batch among those of earlier batches with other settings:
+
+            table = client.foils.batch_results(foils, re_list=[1e5, 2e5], mach=0.1, ncrit=9)
+
+        Args:
+            foil_list (list): optional.  Foil objects or names, all foils by default.
+            re_list (list): optional.  Only keep the polars at these Reynolds numbers, e.g. the re_list of the batch.
+            op_point_values (list): optional.  PolarResultType columns of the table, all of them by default.
+            polar_type (PolarType): optional.  Only keep the polars of this type.
+            mach (float): optional.  Only keep the polars at this Mach number.
+            ncrit (float): optional.  Only keep the polars with this Ncrit.
+        Returns:
+            PolarTable: one row per point, with the foil, polar and spec of each point
+        """
+        if op_point_values is None:
+            op_point_values = [r for r in PolarResultType]
+        if foil_list is None:
+            names = [item["name"] for item in self._client.call("foilList")]
+        else:
+            names = [foil.name if isinstance(foil, Foil) else foil for foil in foil_list]
+        conditions = {key: float(value) for key, value in (('polar_type', polar_type), ('mach', mach),
+                                                           ('ncrit', ncrit)) if value is not None}
+        if re_list is not None:
+            re_list = np.asarray(re_list, dtype=np.float64)
+
+        def accept(foil_name, polar):
+            spec = polar.get('spec', {})
+            try:
+                if any(not np.isclose(float(spec[key]), value) for key, value in conditions.items()):
+                    return False
+                return re_list is None or bool(np.any(np.isclose(re_list, float(spec['reynolds']), rtol=1e-9)))
+            except (KeyError, TypeError, ValueError):
+                return False
+        return PolarTable.from_results(_fetch_polar_results(self._client, names, op_point_values, accept),
+                                       op_point_values)
+
     # GUI RELATED FUNCTIONALITY
 
     def hide_all(self):
         """
-        Hides all foils in the server GUI.  Delegates to each individual foil to handle its visibility
+        Hides all foils in the server GUI, in one pipelined burst
 
         Returns:
             None
         """
-        [f.hide() for _, f in self.to_dict().items()]
+        self._set_all_visibility(False)
 
     def show_all(self):
         """
-        Shows all foils in the server GUI.  Delegates to each individual foil to handle its visibility
+        Shows all foils in the server GUI, in one pipelined burst
 
         Returns:
             None
         """
-        [f.show() for _, f in self.to_dict().items()]
+        self._set_all_visibility(True)
+
+    def _set_all_visibility(self, is_visible):
+        with self._client.batch() as batch:
+            for name in self._get_items():
+                batch.call("showFoil", name, is_visible)
 
     def _set_client_module(self, module):
         self._client.modules.set(module)
@@ -0,0 +1,136 @@
+"""
+Local reading and writing of .dat airfoil files, without the server.
+
+Selig files list the points from the trailing edge over the upper side to the leading edge and back over the lower
+side.  Lednicer files give the number of points of each side on the first data line, then the upper and the lower
+side, both from the leading edge to the trailing edge.  Coordinates are always returned in Selig order, as an
+(n, 2) float64 array.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+from xflrpy.exceptions import InvalidFoilFileError
+
+
+def parse_dat(text, name=""):
+    """
+    Parses the content of a Selig or Lednicer .dat file.
+
+    Args:
+        text (str): file content
+        name (str): name used if the file has no name line
+    Returns:
+        tuple: (name, coordinates)
+    Raises:
+        InvalidFoilFileError: if the content is not a list of coordinates
+    """
+    first, _, body = text.lstrip().partition("\n")
+    if _is_coordinate_line(first):
+        body = text
+    else:
+        name = first.strip()
+    try:
+        values = np.array(body.replace(",", " ").split(), dtype=np.float64)
+    except ValueError as e:
+        raise InvalidFoilFileError(f'"{name}" is not a valid .dat file: {e}')
+    if len(values) < 6 or len(values) % 2:
+        raise InvalidFoilFileError(f'"{name}" is not a valid .dat file: expected pairs of coordinates')
+    xy = values.reshape(-1, 2)
+    if _is_lednicer_header(xy):
+        xy = _lednicer_to_selig(xy, name)
+    return name, xy
+
+
+def read_dat(path):
+    """
+    Reads a Selig or Lednicer .dat file.
+
+    Returns:
+        tuple: (name, coordinates).  The name is the first line of the file, or the file name if there is none.
+    Raises:
+        InvalidFoilFileError: if the file is not a list of coordinates
+    """
+    with open(path) as f:
+        return parse_dat(f.read(), os.path.splitext(os.path.basename(path))[0])
+
+
+def format_dat(name, xy, newline="\n", lednicer=False) -> str:
+    """
+    Formats coordinates as the content of a .dat file, in one formatting pass.
+
+    Args:
+        name (str): name line
+        xy (array_like): (n, 2) coordinates in Selig order
+        lednicer (bool): write the Lednicer format instead of Selig
+    Returns:
+        str: the file content
+    """
+    xy = np.asarray(xy, dtype=np.float64)
+    row = "  %.6f  %.6f" + newline
+    if not lednicer:
+        return name + newline + (row * len(xy)) % tuple(xy.ravel())
+    le = int(np.argmin(xy[:, 0]))
+    upper, lower = xy[:le + 1][::-1], xy[le:]
+    return (name + newline + f"  {len(upper)}.  {len(lower)}." + newline + newline
+            + (row * len(upper)) % tuple(upper.ravel()) + newline
+            + (row * len(lower)) % tuple(lower.ravel()))
+
+
+def write_dat(path, name, xy, lednicer=False) -> None:
+    "Writes coordinates to a .dat file with a single write"
+    with open(path, "w") as f:
+        f.write(format_dat(name, xy, lednicer=lednicer))
+
+
+def read_folder(path, workers=None, processes=False) -> tuple:
+    """
+    Reads every .dat file of a folder in parallel.
+
+    Args:
+        path (str): folder to read
+        workers (int): optional.  Number of parallel readers, defaults to the executor default.
+        processes (bool): parse in worker processes instead of threads.  Faster for large libraries, since parsing
+            holds the GIL, but slower to start.
+    Returns:
+        tuple: ({file path: (name, coordinates)}, {file path: exception}) for the files read and the files that
+            could not be read
+    """
+    paths = sorted(os.path.join(path, f) for f in os.listdir(path)
+                   if f[-4:].lower() == ".dat" and os.path.isfile(os.path.join(path, f)))
+    executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    foils, errors = {}, {}
+    with executor(workers) as pool:
+        for file_path, future in [(p, pool.submit(read_dat, p)) for p in paths]:
+            try:
+                foils[file_path] = future.result()
+            except (InvalidFoilFileError, OSError, UnicodeDecodeError) as e:
+                errors[file_path] = e
+    return foils, errors
+
+
+def _is_coordinate_line(line) -> bool:
+    tokens = line.replace(",", " ").split()
+    if len(tokens) != 2:
+        return False
+    try:
+        float(tokens[0]), float(tokens[1])
+    except ValueError:
+        return False
+    return True
+
+
+def _is_lednicer_header(xy) -> bool:
+    n_upper, n_lower = xy[0]
+    return (n_upper >= 2 and n_lower >= 2 and n_upper == int(n_upper) and n_lower == int(n_lower)
+            and int(n_upper) + int(n_lower) == len(xy) - 1)
+
+
+def _lednicer_to_selig(xy, name) -> np.ndarray:
+    n_upper = int(xy[0, 0])
+    upper, lower = xy[1:n_upper + 1], xy[n_upper + 1:]
+    if len(upper) == 0 or len(lower) == 0:
+        raise InvalidFoilFileError(f'"{name}" is not a valid Lednicer .dat file')
+    # both sides usually start with the leading edge, keep it once
+    if np.array_equal(upper[0], lower[0]):
+        lower = lower[1:]
+    return np.concatenate([upper[::-1], lower])
@@ -0,0 +1,339 @@
+"""
+Local foil geometry with NumPy: NACA generation, normalization and camber/thickness analysis.
+
+Coordinates are arrays of shape (n, 2) in Selig order, from the trailing edge over the upper side to the leading edge
+and back over the lower side.  Every function also accepts a batch of foils with the same number of points as an
+array of shape (k, n, 2) and handles it in one vectorized pass, so that thousands of candidate shapes can be
+generated and measured without any call to the server.  Push the final shapes with FoilManager.create_many or
+Foil.set_coordinates.
+"""
+import math
+import numpy as np
+from xflrpy.exceptions import InvalidNacaValueError
+
+# mean line constants of the NACA 5 digit series for a design lift coefficient of 0.3, by position digit:
+# (m, k1) for standard mean lines and (m, k1, k2/k1) for reflexed ones
+NACA5_STANDARD = {1: (0.0580, 361.400), 2: (0.1260, 51.640), 3: (0.2025, 15.957), 4: (0.2900, 6.643),
+                  5: (0.3910, 3.230)}
+NACA5_REFLEXED = {2: (0.1300, 51.990, 0.000764), 3: (0.2170, 15.793, 0.00677), 4: (0.3180, 6.520, 0.0303),
+                  5: (0.4410, 3.191, 0.1355)}
+
+
+def naca(digits, points=100) -> np.ndarray:
+    """
+    Generates a NACA 4 or 5 digit foil with a closed trailing edge.
+
+    Args:
+        digits (int or str): e.g. 2412 or "23012".  5 digits are read as a 5 digit designation, fewer digits as
+            a 4 digit one, e.g. 12 for NACA 0012.
+        points (int): number of points per side.  The foil has 2 * points - 1 points.
+    Returns:
+        numpy.ndarray: (2 * points - 1, 2) coordinates
+    Raises:
+        InvalidNacaValueError: on a value that is not a valid 4 or 5 digit designation
+    """
+    digits = str(digits).strip()
+    if not digits.isdigit() or len(digits) > 5:
+        raise InvalidNacaValueError(f"ERROR - NACA foil value must be a 4 or 5 digit value, got {digits}")
+    if len(digits) == 5:
+        return naca5(int(digits[0]), int(digits[1]), int(digits[2]), int(digits[3:]) / 100, points)
+    value = int(digits)
+    return naca4(value // 1000 / 100, value // 100 % 10 / 10, value % 100 / 100, points)
+
+
+def naca4(camber, camber_x, thickness, points=100) -> np.ndarray:
+    """
+    Generates NACA 4 digit foils.  The parameters are scalars or equally shaped arrays to generate a batch.
+
+    Args:
+        camber (float or array_like): maximum camber, e.g. 0.02 for NACA 2412
+        camber_x (float or array_like): chordwise position of the maximum camber, e.g. 0.4
+        thickness (float or array_like): maximum thickness, e.g. 0.12
+        points (int): number of points per side
+    Returns:
+        numpy.ndarray: (2 * points - 1, 2) coordinates, or (k, 2 * points - 1, 2) for k parameter sets
+    """
+    m, p, t = (np.asarray(v, dtype=np.float64)[..., None] for v in (camber, camber_x, thickness))
+    x = _cosine_stations(points)
+    # p == 0 means no camber, keep the division defined
+    p_safe = np.where(p > 0, p, 0.5)
+    front = m / p_safe ** 2 * (2 * p_safe * x - x ** 2)
+    back = m / (1 - p_safe) ** 2 * (1 - 2 * p_safe + 2 * p_safe * x - x ** 2)
+    yc = np.where(x < p_safe, front, back)
+    slope = np.where(x < p_safe, 2 * m / p_safe ** 2 * (p_safe - x), 2 * m / (1 - p_safe) ** 2 * (p_safe - x))
+    yc = np.where(p > 0, yc, 0.0)
+    slope = np.where(p > 0, slope, 0.0)
+    return _assemble(x, yc, slope, _naca_thickness(x, t))
+
+
+def naca5(design_cl, position, reflexed, thickness, points=100) -> np.ndarray:
+    """
+    Generates a NACA 5 digit foil, e.g. naca5(2, 3, 0, 0.12) for NACA 23012.
+
+    Args:
+        design_cl (int): first digit, the design lift coefficient times 20/3
+        position (int): second digit, twice the position of the maximum camber in tenths of chord
+        reflexed (int): third digit, 1 for a reflexed mean line
+        thickness (float): maximum thickness
+        points (int): number of points per side
+    Returns:
+        numpy.ndarray: (2 * points - 1, 2) coordinates
+    Raises:
+        InvalidNacaValueError: on digits without a tabulated mean line
+    """
+    table = NACA5_REFLEXED if reflexed else NACA5_STANDARD
+    if reflexed not in (0, 1) or position not in table or not 0 < thickness < 1:
+        raise InvalidNacaValueError(
+            f"ERROR - no NACA 5 digit mean line for {design_cl}{position}{reflexed}{int(thickness * 100):02d}")
+    x = _cosine_stations(points)
+    scale = design_cl * 0.15 / 0.3
+    if reflexed:
+        r, k1, k21 = table[position]
+        k1 = k1 * scale
+        yc = np.where(x < r, k1 / 6 * ((x - r) ** 3 - k21 * (1 - r) ** 3 * x - r ** 3 * x + r ** 3),
+                      k1 / 6 * (k21 * (x - r) ** 3 - k21 * (1 - r) ** 3 * x - r ** 3 * x + r ** 3))
+        slope = np.where(x < r, k1 / 6 * (3 * (x - r) ** 2 - k21 * (1 - r) ** 3 - r ** 3),
+                         k1 / 6 * (3 * k21 * (x - r) ** 2 - k21 * (1 - r) ** 3 - r ** 3))
+    else:
+        m, k1 = table[position]
+        k1 = k1 * scale
+        yc = np.where(x < m, k1 / 6 * (x ** 3 - 3 * m * x ** 2 + m ** 2 * (3 - m) * x), k1 * m ** 3 / 6 * (1 - x))
+        slope = np.where(x < m, k1 / 6 * (3 * x ** 2 - 6 * m * x + m ** 2 * (3 - m)), -k1 * m ** 3 / 6)
+    return _assemble(x, yc, slope, _naca_thickness(x, np.float64(thickness)))
+
+
+def leading_edge(xy) -> np.ndarray:
+    """
+    Returns:
+        numpy.ndarray: index of the point with the smallest x, one per foil
+    """
+    return np.argmin(np.asarray(xy)[..., 0], axis=-1)
+
+
+def derotate(xy) -> np.ndarray:
+    """
+    Rotates foils about their leading edge so that the chord line, from the leading edge to the middle of the
+    trailing edge, is horizontal.
+
+    Returns:
+        numpy.ndarray: coordinates of the same shape
+    """
+    xy = np.asarray(xy, dtype=np.float64)
+    le = _take(xy, leading_edge(xy))
+    te = (xy[..., 0, :] + xy[..., -1, :]) / 2
+    angle = np.arctan2(te[..., 1] - le[..., 1], te[..., 0] - le[..., 0])
+    c, s = np.cos(angle)[..., None], np.sin(angle)[..., None]
+    dx, dy = xy[..., 0] - le[..., None, 0], xy[..., 1] - le[..., None, 1]
+    return np.stack([dx * c + dy * s + le[..., None, 0], -dx * s + dy * c + le[..., None, 1]], axis=-1)
+
+
+def normalize(xy) -> np.ndarray:
+    """
+    Derotates foils, moves their leading edge to the origin and scales them to unit chord, like XFLR5 does.
+
+    Returns:
+        numpy.ndarray: coordinates of the same shape
+    """
+    xy = derotate(xy)
+    le = _take(xy, leading_edge(xy))
+    chord = xy[..., 0].max(axis=-1) - le[..., 0]
+    xy = (xy - le[..., None, :]) / chord[..., None, None]
+    # drop rotation round-off so that the leading and trailing edges land exactly on the x axis
+    xy[np.abs(xy) < 1e-12] = 0.0
+    return xy
+
+
+def leading_edge_point(xy) -> np.ndarray:
+    """
+    Estimates the leading edge as the point of the contour farthest from the middle of the trailing edge, refined
+    between points with a parabola through the farthest point and its neighbours.
+
+    Returns:
+        numpy.ndarray: (2,) point, or (k, 2) for a batch
+    """
+    xy = np.asarray(xy, dtype=np.float64)
+    te = (xy[..., 0, :] + xy[..., -1, :]) / 2
+    d = ((xy - te[..., None, :]) ** 2).sum(axis=-1)
+    i = np.clip(d.argmax(axis=-1), 1, xy.shape[-2] - 2)
+    d_prev, d_max, d_next = (np.take_along_axis(d, (i + o)[..., None], -1)[..., 0] for o in (-1, 0, 1))
+    curvature = d_prev - 2 * d_max + d_next
+    t = np.clip(np.divide(d_prev - d_next, 2 * curvature, out=np.zeros_like(curvature), where=curvature != 0), -1, 1)
+    p_prev, p_max, p_next = (_take(xy, i + o) for o in (-1, 0, 1))
+    t = t[..., None]
+    return p_max + t * (p_next - p_prev) / 2 + t * t * (p_next - 2 * p_max + p_prev) / 2
+
+
+def to_chord_frame(xy) -> np.ndarray:
+    """
+    Moves foils to their chord frame: the leading edge from leading_edge_point at the origin and the middle of the
+    trailing edge at (1, 0).  Unlike normalize, the result hardly depends on how the contour is discretized, which
+    is what comparing foils needs.
+
+    Returns:
+        numpy.ndarray: coordinates of the same shape
+    """
+    xy = np.asarray(xy, dtype=np.float64)
+    le = leading_edge_point(xy)
+    chord = (xy[..., 0, :] + xy[..., -1, :]) / 2 - le
+    length = np.hypot(chord[..., 0], chord[..., 1])[..., None]
+    c, s = chord[..., 0][..., None] / length, chord[..., 1][..., None] / length
+    dx, dy = xy[..., 0] - le[..., None, 0], xy[..., 1] - le[..., None, 1]
+    return np.stack([dx * c + dy * s, -dx * s + dy * c], axis=-1) / length[..., None]
+
+
+def camber_thickness(xy, samples=200) -> dict:
+    """
+    Measures the maximum camber and thickness of foils and their chordwise positions.  Both sides are interpolated
+    at the same stations, so the thickness is measured normal to the chord, as XFLR5 does.
+
+    Args:
+        xy (array_like): (n, 2) coordinates or a (k, n, 2) batch
+        samples (int): number of chordwise stations
+    Returns:
+        dict: 'camber', 'camber_x', 'thickness' and 'thickness_x', floats or arrays of k values
+    """
+    x, camber, thickness = camber_thickness_lines(xy, samples)
+    i_c, i_t = camber.argmax(axis=-1)[..., None], thickness.argmax(axis=-1)[..., None]
+    result = {
+        'camber': np.take_along_axis(camber, i_c, -1)[..., 0],
+        'camber_x': np.take_along_axis(x, i_c, -1)[..., 0],
+        'thickness': np.take_along_axis(thickness, i_t, -1)[..., 0],
+        'thickness_x': np.take_along_axis(x, i_t, -1)[..., 0],
+    }
+    if np.ndim(xy) == 2:
+        return {k: float(v) for k, v in result.items()}
+    return result
+
+
+def camber_thickness_lines(xy, samples=200) -> tuple:
+    """
+    Computes the mean line and the thickness distribution of foils.
+
+    Args:
+        xy (array_like): (n, 2) coordinates or a (k, n, 2) batch
+        samples (int): number of chordwise stations, cosine spaced from the leading to the trailing edge
+    Returns:
+        tuple: (x, camber, thickness), arrays of shape (samples,) or (k, samples)
+    """
+    xy = np.asarray(xy, dtype=np.float64)
+    batch = xy if xy.ndim == 3 else xy[None]
+    k, n, _ = batch.shape
+    le = leading_edge(batch)
+    j = np.arange(n)
+    rows = np.arange(k)[:, None]
+    # upper side from the leading edge to the trailing edge, padded past the trailing edge to keep x increasing
+    upper_i = le[:, None] - j
+    lower_i = le[:, None] + j
+    upper = batch[rows, np.clip(upper_i, 0, n - 1)]
+    lower = batch[rows, np.clip(lower_i, 0, n - 1)]
+    x_max = batch[..., 0].max()
+    upper[..., 0] = np.where(upper_i >= 0, upper[..., 0], x_max + 1 + j)
+    lower[..., 0] = np.where(lower_i < n, lower[..., 0], x_max + 1 + j)
+    x_le = batch[np.arange(k), le, 0]
+    x_te = np.minimum(batch[:, 0, 0], batch[:, -1, 0])
+    x = x_le[:, None] + (x_te - x_le)[:, None] * _cosine_stations(samples)
+    # interpolate against sqrt(x - x_le): near the round leading edge y varies about linearly with it, so coarse
+    # foils are resampled accurately
+    u = np.sqrt(np.maximum(x - x_le[:, None], 0))
+    y_upper = _interp_rows(u, np.sqrt(np.maximum(upper[..., 0] - x_le[:, None], 0)), upper[..., 1])
+    y_lower = _interp_rows(u, np.sqrt(np.maximum(lower[..., 0] - x_le[:, None], 0)), lower[..., 1])
+    camber, thickness = (y_upper + y_lower) / 2, y_upper - y_lower
+    if xy.ndim == 2:
+        return x[0], camber[0], thickness[0]
+    return x, camber, thickness
+
+
+def set_camber_thickness(xy, camber=None, camber_x=None, thickness=None, thickness_x=None, points=100) -> np.ndarray:
+    """
+    Rebuilds foils with a new maximum camber and thickness and new positions of both, the local counterpart of
+    Foil.set_geometry.  Magnitudes are scaled, positions are moved by stretching the distributions on either side of
+    the maximum.  Parameters left to None keep their current value.
+
+    Args:
+        xy (array_like): (n, 2) normalized coordinates or a (k, n, 2) batch
+        points (int): number of points per side of the result
+    Returns:
+        numpy.ndarray: (2 * points - 1, 2) coordinates, or (k, 2 * points - 1, 2)
+    """
+    x, c, t = camber_thickness_lines(xy, points)
+    x0 = x[..., :1]
+    chord = x[..., -1:] - x0
+    s = (x - x0) / chord
+    c = _reshape_line(s, c, camber, camber_x)
+    t = _reshape_line(s, t, thickness, thickness_x)
+    x_out = _cosine_stations(points)
+    slope = np.gradient(c, x_out, axis=-1)
+    coords = _assemble(x_out, c, slope, t / 2)
+    return coords * chord[..., None] + np.stack([x0, np.zeros_like(x0)], axis=-1)
+
+
+def resample(xy, points=100) -> np.ndarray:
+    """
+    Resamples foils of any point count onto the same cosine spaced stations, so that differently discretized foils
+    can be stacked into one batch.
+
+    Returns:
+        numpy.ndarray: (2 * points - 1, 2) coordinates, or (k, 2 * points - 1, 2)
+    """
+    if isinstance(xy, (list, tuple)) and xy and np.ndim(xy[0]) == 2:
+        return np.stack([resample(f, points) for f in xy])
+    return set_camber_thickness(xy, points=points)
+
+
+def _cosine_stations(points):
+    return (1 - np.cos(np.linspace(0, math.pi, points))) / 2
+
+
+def _naca_thickness(x, t):
+    "Half thickness of the NACA 4 digit thickness distribution, closed trailing edge"
+    return 5 * t * (0.2969 * np.sqrt(x) - 0.1260 * x - 0.3516 * x ** 2 + 0.2843 * x ** 3 - 0.1036 * x ** 4)
+
+
+def _assemble(x, yc, slope, half):
+    "Selig ordered coordinates from a mean line and a half thickness applied normal to it"
+    yc, slope, half = np.broadcast_arrays(yc, slope, half)
+    theta = np.arctan(slope)
+    xu, yu = x - half * np.sin(theta), yc + half * np.cos(theta)
+    xl, yl = x + half * np.sin(theta), yc - half * np.cos(theta)
+    upper = np.stack([xu, yu], axis=-1)[..., ::-1, :]
+    lower = np.stack([xl, yl], axis=-1)[..., 1:, :]
+    return np.concatenate([upper, lower], axis=-2)
+
+
+def _take(xy, index):
+    "Point at index along the point axis, one per foil"
+    return np.take_along_axis(xy, np.asarray(index)[..., None, None], axis=-2)[..., 0, :]
+
+
+def _interp_rows(x, xp, fp):
+    "np.interp applied row by row in one pass: rows are offset so that a single searchsorted serves all of them"
+    k, m = xp.shape
+    lo = min(xp.min(), x.min())
+    width = max(xp.max(), x.max()) - lo + 1
+    offset = np.arange(k)[:, None] * width
+    i = np.searchsorted((xp - lo + offset).ravel(), (x - lo + offset).ravel(), side='right').reshape(x.shape) - 1
+    i = np.clip(i - np.arange(k)[:, None] * m, 0, m - 2)
+    x0, x1 = np.take_along_axis(xp, i, -1), np.take_along_axis(xp, i + 1, -1)
+    y0, y1 = np.take_along_axis(fp, i, -1), np.take_along_axis(fp, i + 1, -1)
+    dx = x1 - x0
+    w = np.clip(np.divide(x - x0, dx, out=np.zeros_like(x), where=dx != 0), 0, 1)
+    return y0 + w * (y1 - y0)
+
+
+def _reshape_line(s, line, value, position):
+    "Scales a camber or thickness line to a new maximum value and moves the maximum to a new position"
+    if value is None and position is None:
+        return line
+    i = line.argmax(axis=-1)[..., None]
+    peak = np.take_along_axis(line, i, -1)
+    if position is not None:
+        s_max = np.take_along_axis(s, i, -1)
+        target = np.broadcast_to(np.asarray(position, dtype=np.float64)[..., None], s_max.shape)
+        # piecewise linear map sending the new position to the old one, sampled at the stations
+        source = np.where(s <= target, s * s_max / target, s_max + (s - target) * (1 - s_max) / (1 - target))
+        line = _interp_rows(np.atleast_2d(source), np.atleast_2d(s), np.atleast_2d(line)).reshape(line.shape)
+    if value is not None:
+        scale = np.divide(np.asarray(value, dtype=np.float64)[..., None], peak, out=np.zeros_like(peak),
+                          where=peak != 0)
+        line = line * scale
+    return line
@@ -0,0 +1,147 @@
+"""
+Handles on long running calls, and bounded waits on the responses of the msgpack-rpc client.
+
+    job = analysis.submit_analysis(sequence=(0, 15, 0.25))
+    while not job.done():
+        print(job.progress())
+        ...
+    result = job.result(timeout=60)
+
+The server offers no way to abort a call, so cancel() only stops the client from waiting: the server finishes the
+call and its response is discarded.  Calls sent later on the same connection are answered after it.  Requests are
+written when the event loop runs, so a job cancelled right away is still sent with the next call of its client.
+"""
+import time
+from xflrpy.exceptions import JobCancelledError, JobTimeoutError
+
+
+class Job():
+    """
+    Returned by Client.submit and the submit_* methods.  A job must be used from the thread of its client.
+
+    Args:
+        future (msgpackrpc.future.Future): future of the call, from Client.call_async
+        name (str): description used in errors
+        decode (callable): optional.  Converts the raw response into the result.
+        progress (callable): optional.  Returns the progress of the call, between 0 and 1.
+    """
+
+    def __init__(self, future, name='', decode=None, progress=None) -> None:
+        self.name = name
+        self._future = future
+        self._decode = decode
+        self._progress = progress
+        self._cancelled = False
+        self._decoded = False
+        self._result = None
+
+    def done(self) -> bool:
+        """
+        True once the response has arrived or the job was cancelled.  Runs the event loop once without blocking, so
+        that polling done() sends the request and reads its response.
+        """
+        if self._cancelled:
+            return True
+        _run_once(self._future)
+        return _is_set(self._future)
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> bool:
+        """
+        Stops waiting for the job.  The server still completes the call.
+
+        Returns:
+            bool: False if the job was already done
+        """
+        if self.done():
+            return False
+        self._cancelled = True
+        return True
+
+    def result(self, timeout=None):
+        """
+        Waits for the job and returns its result.
+
+        Args:
+            timeout (float): optional.  Seconds to wait, without limit by default.  The job keeps running if it
+                expires.
+        Returns:
+            any: the decoded response
+        Raises:
+            JobTimeoutError: if the job is not done within timeout
+            JobCancelledError: if the job was cancelled
+            msgpackrpc.error.RPCError: if the call failed on the server
+        """
+        if self._cancelled:
+            raise JobCancelledError(f'{self.name} was cancelled')
+        if not wait(self._future, timeout):
+            raise JobTimeoutError(f'{self.name} not done after {timeout} seconds')
+        if not self._decoded:
+            raw = self._future.get()
+            self._result = self._decode(raw) if self._decode is not None else raw
+            self._decoded = True
+        return self._result
+
+    def progress(self) -> float:
+        """
+        Returns:
+            float: fraction of the work done, 1.0 once the job is done, or None if the job cannot report progress
+        """
+        if self.done() and not self._cancelled:
+            return 1.0
+        if self._progress is None or self._cancelled:
+            return None
+        return min(1.0, max(0.0, float(self._progress())))
+
+    def __str__(self):
+        state = 'cancelled' if self._cancelled else 'done' if self.done() else 'running'
+        return f'<Job>({self.name}, {state})'
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def wait(future, timeout=None) -> bool:
+    """
+    Runs the event loop of a msgpack-rpc future until its response arrives or timeout expires.
+
+    Args:
+        future (msgpackrpc.future.Future): the future to wait for
+        timeout (float): optional.  Seconds to wait, without limit by default.
+    Returns:
+        bool: True if the response has arrived
+    """
+    if timeout is None:
+        future.join()
+        return True
+    deadline = time.monotonic() + timeout
+    ioloop = future._loop._ioloop
+    while not _is_set(future):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        # the loop stops on every response of the thread, or at the deadline
+        handle = ioloop.call_later(remaining, future._loop.stop)
+        try:
+            future._loop.start()
+        finally:
+            ioloop.remove_timeout(handle)
+    return True
+
+
+def _run_once(future) -> None:
+    "Runs the event loop of a pending future for one pass, handling the I/O that is ready without waiting for more"
+    if _is_set(future):
+        return
+    handle = future._loop._ioloop.call_later(0, future._loop.stop)
+    try:
+        future._loop.start()
+    finally:
+        future._loop._ioloop.remove_timeout(handle)
+
+
+def _is_set(future) -> bool:
+    # msgpackrpc has no public flag, the result of a call returning nil is None like a pending one
+    return future._set_flag
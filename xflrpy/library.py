@@ -0,0 +1,195 @@
+"""
+Local, array-backed airfoil library with feature range queries and nearest-neighbour shape search.
+
+A library is a folder holding every foil moved to its chord frame and resampled onto the same cosine spaced
+stations, so that foils can be compared point by point, together with their maximum camber and thickness and the
+positions of both:
+
+    coords.npy      (k, 2 * points - 1, 2) float64 coordinates, memory-mapped when the library is opened
+    features.npy    (k, 4) camber, camber_x, thickness, thickness_x
+    norms.npy       (k,) squared norms of the shape vectors, to compute distances with one matrix product
+    index.json      names, source files and the number of points per side
+
+    library = FoilLibrary.build("uiuc.lib", "/data/uiuc")
+    library.query(thickness=(0.10, 0.12), camber_x=(0.3, 0.45))
+    library.nearest(my_foil.coordinate_array, k=50)
+"""
+import json
+import os
+import numpy as np
+from xflrpy import foil_io, geometry
+from xflrpy.log import logger
+
+FEATURES = ('camber', 'camber_x', 'thickness', 'thickness_x')
+# queries are compared against the library in blocks of this many foils to bound memory use
+SEARCH_BLOCK = 16384
+
+
+class FoilLibrary():
+    """
+    Opens a library folder written by FoilLibrary.build.  Coordinates are memory-mapped, so opening a large library
+    is immediate and only the foils used are read from disk.
+
+    Args:
+        path (str): library folder
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'index.json')) as f:
+            index = json.load(f)
+        self.names = index['names']
+        self.sources = index['sources']
+        self.points = index['points']
+        self._coords = np.load(os.path.join(path, 'coords.npy'), mmap_mode='r')
+        self.features = np.load(os.path.join(path, 'features.npy'))
+        self._norms = np.load(os.path.join(path, 'norms.npy'))
+        self._index = {}
+        for i, name in enumerate(self.names):
+            self._index.setdefault(name, i)
+
+    @classmethod
+    def build(cls, path, sources, points=100, workers=None):
+        """
+        Reads foils, resamples them in their chord frame and writes them as a library.
+
+        Args:
+            path (str): library folder to write, created if needed.  An existing library there is replaced.
+            sources (str, list or dict): a folder of .dat files, a list of .dat paths, or {name: coordinates}.  The
+                files of a folder that cannot be read are skipped with a warning.
+            points (int): points per side of the resampled foils
+            workers (int): optional.  Number of parallel readers for .dat files.
+        Returns:
+            FoilLibrary: the new library, opened
+        """
+        names, origins, shapes = _read_sources(sources, workers)
+        coords = _resample(shapes, points)
+        measured = geometry.camber_thickness(coords) if len(coords) else {f: np.empty(0) for f in FEATURES}
+        features = np.column_stack([measured[f] for f in FEATURES]) if len(coords) else np.empty((0, 4))
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'coords.npy'), coords)
+        np.save(os.path.join(path, 'features.npy'), features)
+        np.save(os.path.join(path, 'norms.npy'), np.einsum('ij,ij->i', coords[..., 1], coords[..., 1]))
+        with open(os.path.join(path, 'index.json'), 'w') as f:
+            json.dump({'names': names, 'sources': origins, 'points': points}, f)
+        return cls(path)
+
+    def coordinates(self, name) -> np.ndarray:
+        "Resampled coordinates of a foil in its chord frame, as a read-only (2 * points - 1, 2) array"
+        return self._coords[self._index[name]]
+
+    def feature(self, name) -> dict:
+        return dict(zip(FEATURES, self.features[self._index[name]].tolist()))
+
+    def query(self, camber=None, camber_x=None, thickness=None, thickness_x=None) -> list:
+        """
+        Finds the foils whose features lie in the given ranges.
+
+        Args:
+            camber, camber_x, thickness, thickness_x (tuple): optional (min, max) ranges, bounds included.  Use None
+                for an open bound, e.g. thickness=(0.15, None).
+        Returns:
+            list: names of the matching foils, in library order
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for column, bounds in enumerate((camber, camber_x, thickness, thickness_x)):
+            if bounds is None:
+                continue
+            low, high = bounds
+            if low is not None:
+                mask &= self.features[:, column] >= low
+            if high is not None:
+                mask &= self.features[:, column] <= high
+        return [self.names[i] for i in np.flatnonzero(mask)]
+
+    def nearest(self, xy, k=10) -> list:
+        """
+        Finds the foils closest in shape to a foil.  The foil is resampled in its chord frame like the library, and
+        the distance is the root mean square difference of the y coordinates over all points.
+
+        Args:
+            xy (array_like): (n, 2) coordinates of the foil to match
+            k (int): number of foils to return
+        Returns:
+            list: (name, distance) tuples, closest first
+        """
+        return self.nearest_many([xy], k)[0]
+
+    def nearest_many(self, foils, k=10) -> list:
+        """
+        Nearest neighbour search for several foils at once, one matrix product per block of the library.
+
+        Args:
+            foils (list): coordinates of the foils to match, arrays of any number of points
+            k (int): number of foils to return for each
+        Returns:
+            list: one list of (name, distance) tuples per foil, closest first.  The lists are empty if the library
+                is empty or k is 0.
+        """
+        k = min(k, len(self))
+        if k <= 0:
+            return [[] for _ in foils]
+        queries = _resample([np.asarray(xy, dtype=np.float64) for xy in foils], self.points)[..., 1]
+        query_norms = np.einsum('ij,ij->i', queries, queries)
+        best_d = np.full((len(queries), 0), np.inf)
+        best_i = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(self), SEARCH_BLOCK):
+            block = self._coords[start:start + SEARCH_BLOCK, :, 1]
+            d = query_norms[:, None] + self._norms[None, start:start + len(block)] - 2 * queries @ block.T
+            best_d = np.concatenate([best_d, d], axis=1)
+            best_i = np.concatenate([best_i, np.broadcast_to(np.arange(start, start + len(block)), d.shape)], axis=1)
+            keep = np.argpartition(best_d, k - 1, axis=1)[:, :k] if best_d.shape[1] > k else None
+            if keep is not None:
+                best_d = np.take_along_axis(best_d, keep, 1)
+                best_i = np.take_along_axis(best_i, keep, 1)
+        order = np.argsort(best_d, axis=1)
+        best_d = np.sqrt(np.maximum(np.take_along_axis(best_d, order, 1), 0) / queries.shape[1])
+        best_i = np.take_along_axis(best_i, order, 1)
+        return [[(self.names[i], float(d)) for i, d in zip(row_i, row_d)] for row_i, row_d in zip(best_i, best_d)]
+
+    def push(self, client, names, update_gui=False) -> list:
+        """
+        Creates foils of the library on a server, in one pipelined burst.
+
+        Returns:
+            list: the new Foil objects
+        """
+        return client.foils.create_many({name: np.array(self.coordinates(name)) for name in names}, update_gui)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __str__(self):
+        return f'<FoilLibrary>({self.path}, {len(self)} foils)'
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _read_sources(sources, workers):
+    "Returns the names, source files and coordinates of the foils to store"
+    if isinstance(sources, dict):
+        return list(sources), [None] * len(sources), [np.asarray(xy, dtype=np.float64) for xy in sources.values()]
+    if isinstance(sources, str):
+        read, errors = foil_io.read_folder(sources, workers)
+        for path, error in errors.items():
+            logger.warning('%s skipped: %s', path, error)
+    else:
+        read = {path: foil_io.read_dat(path) for path in sources}
+    paths = list(read)
+    return [read[p][0] for p in paths], paths, [read[p][1] for p in paths]
+
+
+def _resample(shapes, points) -> np.ndarray:
+    "Moves foils to their chord frame and resamples them, in one batch per point count"
+    coords = np.empty((len(shapes), 2 * points - 1, 2))
+    by_length = {}
+    for i, xy in enumerate(shapes):
+        by_length.setdefault(len(xy), []).append(i)
+    for indices in by_length.values():
+        batch = geometry.to_chord_frame(np.stack([shapes[i] for i in indices]))
+        coords[indices] = geometry.resample(batch, points)
+    return coords
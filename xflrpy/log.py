@@ -0,0 +1,45 @@
+import logging
+import reprlib
+
+logger = logging.getLogger("xflrpy")
+logger.addHandler(logging.NullHandler())
+# handler installed by enable_logging when none is given, reused by later calls
+_default_handler = None
+
+# limits used when arguments and results are written to the log.  Large coordinate and polar payloads are cut to
+# a few elements so that logging stays cheap.
+preview = reprlib.Repr()
+preview.maxlist = 4
+preview.maxtuple = 4
+preview.maxdict = 6
+preview.maxlevel = 3
+preview.maxstring = 60
+preview.maxother = 80
+
+
+def enable_logging(level=logging.DEBUG, handler=None) -> logging.Logger:
+    """
+    Sends xflrpy log records to a handler.  Logging is off by default; at DEBUG level every call is logged with its
+    call id, a truncated preview of its arguments and result, and its duration.
+
+    Args:
+        level (int): logging level, e.g. logging.DEBUG to trace every call
+        handler (logging.Handler): optional.  Defaults to a StreamHandler writing to stderr.  A handler is only
+            added once, so calling enable_logging again just changes the level.
+    Returns:
+        logging.Logger: the xflrpy logger
+    """
+    global _default_handler
+    if handler is None:
+        if _default_handler is None:
+            _default_handler = logging.StreamHandler()
+            _default_handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+        handler = _default_handler
+    if handler not in logger.handlers:
+        logger.addHandler(handler)
+    logger.setLevel(level)
+    return logger
+
+
+def preview_args(args) -> str:
+    return ", ".join(preview.repr(a) for a in args)
@@ -0,0 +1,184 @@
+import bisect
+import json
+import math
+import time
+import msgpack
+
+# upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+                   60.0, 300.0, math.inf)
+
+
+class MethodStats():
+    "Counters and latency histogram of one rpc method"
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.min_time = math.inf
+        self.max_time = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def record(self, elapsed, error=False, request_bytes=0, response_bytes=0) -> None:
+        self.count += 1
+        self.errors += int(error)
+        self.total_time += elapsed
+        self.min_time = min(self.min_time, elapsed)
+        self.max_time = max(self.max_time, elapsed)
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def percentile(self, q) -> float:
+        """
+        Estimates a latency percentile from the histogram, interpolating linearly inside the bucket.
+
+        Args:
+            q (float): percentile in the range [0, 100]
+        Returns:
+            float: latency in seconds, or None if no call was recorded
+        """
+        if self.count == 0:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            if n and seen + n >= rank:
+                lower = max(LATENCY_BUCKETS[i - 1] if i > 0 else 0.0, self.min_time)
+                upper = max(min(LATENCY_BUCKETS[i], self.max_time), lower)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max_time
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total_time': self.total_time,
+            'mean_time': self.total_time / self.count if self.count else None,
+            'min_time': self.min_time if self.count else None,
+            'max_time': self.max_time,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'buckets': dict(zip([str(b) for b in LATENCY_BUCKETS], self.buckets)),
+        }
+
+
+class CallMetrics():
+    """
+    Per-method instrumentation of the calls made by a Client: latency histograms, error counts, request and
+    response sizes and the number of calls in flight.
+
+    Recording latencies is cheap and always on.  Measuring payload sizes means serializing every argument and result
+    a second time, so it is only done when measure_bytes is set.
+    """
+
+    def __init__(self, measure_bytes=False) -> None:
+        self.measure_bytes = measure_bytes
+        self.reset()
+
+    def reset(self) -> None:
+        "Clears all counters.  Calls currently in flight are still counted when they complete."
+        self.methods = {}
+        self.in_flight = getattr(self, 'in_flight', 0)
+        self.max_in_flight = self.in_flight
+        self.started = time.time()
+
+    def start(self, rpc_call, args=()) -> int:
+        """
+        Marks a call as sent.
+
+        Returns:
+            int: size of the request in bytes, or 0 if bytes are not measured
+        """
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.measure_bytes:
+            return _packed_size([0, 0, rpc_call, list(args)])
+        return 0
+
+    def finish(self, rpc_call, elapsed, request_bytes=0, result=None, error=False) -> None:
+        "Marks a call as answered, with its raw result"
+        self.in_flight = max(self.in_flight - 1, 0)
+        response_bytes = _packed_size(result) if self.measure_bytes and not error else 0
+        if rpc_call not in self.methods:
+            self.methods[rpc_call] = MethodStats()
+        self.methods[rpc_call].record(elapsed, error, request_bytes, response_bytes)
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            dict: a JSON-serializable copy of the current counters
+        """
+        return {
+            'since': self.started,
+            'duration': time.time() - self.started,
+            'in_flight': self.in_flight,
+            'max_in_flight': self.max_in_flight,
+            'methods': {name: stats.to_dict() for name, stats in sorted(self.methods.items())},
+        }
+
+    def to_json(self, path=None) -> str:
+        """
+        Dumps the snapshot as JSON, optionally writing it to a file.
+
+        Returns:
+            str: the JSON text
+        """
+        text = json.dumps(self.snapshot(), indent=2)
+        if path:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+    def to_prometheus(self, path=None) -> str:
+        """
+        Dumps the counters in the Prometheus text exposition format, optionally writing them to a file (for example
+        for the node exporter textfile collector).
+
+        Returns:
+            str: the metrics text
+        """
+        lines = ['# TYPE xflrpy_rpc_latency_seconds histogram']
+        for name, stats in sorted(self.methods.items()):
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += n
+                le = '+Inf' if math.isinf(bound) else repr(bound)
+                lines.append(f'xflrpy_rpc_latency_seconds_bucket{{method="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'xflrpy_rpc_latency_seconds_sum{{method="{name}"}} {stats.total_time}')
+            lines.append(f'xflrpy_rpc_latency_seconds_count{{method="{name}"}} {stats.count}')
+        for metric, attr in (('errors', 'errors'), ('request_bytes', 'request_bytes'),
+                             ('response_bytes', 'response_bytes')):
+            lines.append(f'# TYPE xflrpy_rpc_{metric}_total counter')
+            for name, stats in sorted(self.methods.items()):
+                lines.append(f'xflrpy_rpc_{metric}_total{{method="{name}"}} {getattr(stats, attr)}')
+        lines.append('# TYPE xflrpy_rpc_in_flight gauge')
+        lines.append(f'xflrpy_rpc_in_flight {self.in_flight}')
+        lines.append('# TYPE xflrpy_rpc_max_in_flight gauge')
+        lines.append(f'xflrpy_rpc_max_in_flight {self.max_in_flight}')
+        text = '\n'.join(lines) + '\n'
+        if path:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+    def __str__(self):
+        calls = sum(s.count for s in self.methods.values())
+        return f"<CallMetrics>({calls} calls, {len(self.methods)} methods, {self.in_flight} in flight)"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _packed_size(value) -> int:
+    try:
+        return len(msgpack.packb(value, default=lambda x: x.to_msgpack()))
+    except (TypeError, ValueError, AttributeError):
+        return 0
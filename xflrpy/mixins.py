@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import numpy as np
 
 class MsgpackMixin:
     def __repr__(self):
@@ -9,7 +10,7 @@ class MsgpackMixin:
     @classmethod
     def from_msgpack(cls, encoded, client = None):
         if client is not None:
-            obj = cls(client)
+            obj = cls(client=client)
         else:
             obj=cls()
         # obj.__dict__ = {k.decode('utf-8'): (v.__class__.from_msgpack(v.__class__, v) if hasattr(v, "__dict__") else v) for k, v in encoded.items()}
@@ -18,6 +19,112 @@ class MsgpackMixin:
         return obj
 
 
+class Column:
+    """
+    Descriptor exposing one row of a ColumnarResult block as an attribute.  Reading returns a view into the block,
+    so no data is copied.  Columns that were not part of the result read as an empty array.
+    """
+    def __init__(self, index):
+        self.index = index
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        if self.index not in obj._columns:
+            return np.empty(0)
+        return obj._data[self.index]
+
+    def __set__(self, obj, values):
+        obj._set_column(self.index, values)
+
+
+class ColumnarResult:
+    """
+    Result data stored as a single contiguous float64 block of shape (number of columns, number of points).
+    Row i holds the values of the column whose server enum value is i, so a result can be indexed by name,
+    by enum or through attributes.  Subclasses declare their columns with the Column descriptor.
+
+        result.Cl                       # view of the Cl row
+        result[PolarResultType.CL]      # same view
+        result.data                     # the whole block
+    """
+    def __init__(self):
+        self._data = np.empty((len(self._column_names()), 0))
+        self._columns = []
+
+    @classmethod
+    def _column_names(cls) -> dict:
+        "Returns {index: name} for every Column declared on the class"
+        names = {}
+        for klass in reversed(cls.__mro__):
+            names.update({v.index: k for k, v in vars(klass).items() if isinstance(v, Column)})
+        return dict(sorted(names.items()))
+
+    @classmethod
+    def from_msgpack(cls, encoded, client=None):
+        "Builds the block from a {column name: values} payload.  Unknown keys are ignored."
+        return cls.from_arrays(encoded)
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Args:
+            arrays (dict): {column name: sequence of floats}.  All sequences must have the same length.
+        """
+        obj = cls()
+        indices = {name: index for index, name in cls._column_names().items()}
+        present = [(indices[k], v) for k, v in arrays.items() if k in indices and len(v) > 0]
+        n = len(present[0][1]) if present else 0
+        obj._data = np.full((len(indices), n), np.nan)
+        for index, values in present:
+            obj._set_column(index, values)
+        return obj
+
+    def to_msgpack(self, *args, **kwargs):
+        return {k: v.tolist() for k, v in self.dict.items()}
+
+    def _set_column(self, index, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(self._columns) == 0 and values.shape[0] != self._data.shape[1]:
+            self._data = np.full((self._data.shape[0], values.shape[0]), np.nan)
+        self._data[index] = values
+        if index not in self._columns:
+            self._columns.append(index)
+            self._columns.sort()
+
+    @property
+    def data(self) -> np.ndarray:
+        "The (columns, points) float64 block.  Rows of columns that were not returned are NaN."
+        return self._data
+
+    @property
+    def keys(self) -> list:
+        names = self._column_names()
+        return [names[i] for i in self._columns]
+
+    @property
+    def dict(self) -> dict:
+        names = self._column_names()
+        return {names[i]: self._data[i] for i in self._columns}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key)
+        return self._data[int(key)]
+
+    def __len__(self):
+        return self._data.shape[1]
+
+    def __str__(self):
+        return f'{type(self).__name__} - {self.__len__()} points: {", ".join(self.keys)}'
+
+    def __repr__(self):
+        return self.__str__()
+
+
 class DictListInterface(ABC):
     """
     Adds a series of methods that creates an interface that behaves like both an unmutable list and unmutable dict
@@ -34,21 +141,15 @@ class DictListInterface(ABC):
         items['itemname']
         items.to_dict()
 
+    Every operation works on a single snapshot from _get_items(), so iterating fetches the items once and is not
+    affected by changes made while looping.
+
     """
     def __len__(self):
         return len(self.to_dict().items())
 
     def __iter__(self):
-        self._index = 0
-        return self
-
-    def __next__(self):
-        if self._index < len(self.to_list()):
-            value = self.to_list()[self._index]
-            self._index += 1
-            return value
-        else:
-            raise StopIteration
+        return iter(self.to_list())
     
     def __getitem__(self, key):
         if type(key) == int:
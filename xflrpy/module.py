@@ -10,9 +10,8 @@ class ModuleType(enum.IntEnum):
 from xflrpy.module import ModuleType
 
 class ModuleManager():
-    def __init__(self):
-        from xflrpy.client import Client
-        self._client = Client()
+    def __init__(self, client):
+        self._client = client
         self.active = None
     
     def set(self, module:ModuleType):
@@ -0,0 +1,63 @@
+import struct
+import msgpack
+import numpy as np
+
+# msgpack ext type code of a packed float64 array
+ARRAY_EXT_TYPE = 1
+
+# name of the call used to negotiate packed arrays with the server
+NEGOTIATION_CALL = "setPackedArrays"
+
+
+def pack_array(values) -> msgpack.ExtType:
+    """
+    Packs an array of floats into a msgpack ext value: the number of dimensions (uint8), each dimension (uint32)
+    and the values as little-endian float64, all without padding.
+
+    Args:
+        values (array_like): numbers to pack, of any shape
+    Returns:
+        msgpack.ExtType
+    """
+    array = np.ascontiguousarray(values, dtype='<f8')
+    header = struct.pack(f'<B{array.ndim}I', array.ndim, *array.shape)
+    return msgpack.ExtType(ARRAY_EXT_TYPE, header + array.tobytes())
+
+
+def unpack_array(ext) -> np.ndarray:
+    """
+    Decodes an ext value made by pack_array.  The returned array is a read-only view on the received bytes.
+
+    Returns:
+        numpy.ndarray: float64 array with the packed shape
+    """
+    data = ext.data
+    ndim = data[0]
+    shape = struct.unpack_from(f'<{ndim}I', data, 1)
+    return np.frombuffer(data, dtype='<f8', offset=1 + 4 * ndim).reshape(shape)
+
+
+def encode_args(args, packed) -> tuple:
+    """
+    Makes NumPy arrays among the call arguments serializable: packed into ext values if the connection negotiated
+    packed arrays, converted to nested lists otherwise.
+    """
+    if not any(isinstance(a, np.ndarray) for a in args):
+        return args
+    if packed:
+        return tuple(pack_array(a) if isinstance(a, np.ndarray) else a for a in args)
+    return tuple(a.tolist() if isinstance(a, np.ndarray) else a for a in args)
+
+
+def decode_arrays(value):
+    "Replaces every packed array in a response by a NumPy array"
+    if isinstance(value, msgpack.ExtType):
+        return unpack_array(value) if value.code == ARRAY_EXT_TYPE else value
+    if isinstance(value, dict):
+        return {k: decode_arrays(v) for k, v in value.items()}
+    if isinstance(value, list):
+        # plain number lists are common and large, skip them
+        if value and isinstance(value[0], (int, float)):
+            return value
+        return [decode_arrays(v) for v in value]
+    return value
@@ -1,6 +1,5 @@
-from xflrpy.mixins import MsgpackMixin, DictListInterface
+from xflrpy.mixins import MsgpackMixin, DictListInterface, ColumnarResult, Column
 from xflrpy.polar2d import PolarType
-from xflrpy.client import Client
 import enum
 import re
 
@@ -38,6 +37,15 @@ class enumWPolarResult(enum.IntEnum):
     FZ = 12
     QINF = 13
 
+# rows of WPolarResult after those of enumWPolarResult, which the server does not define
+_BETA = 14
+_ICM = 15
+_IYM = 16
+_VCM = 17
+_RM = 18
+_PM = 19
+_MAXBENDING = 20
+
 class WingSection(MsgpackMixin):
     y_position = 0  # yPos(m): spanwise position of segment
     chord = 0.1 # chord(m): length of segment in x (longitudinal) direction
@@ -101,13 +109,13 @@ class Plane(MsgpackMixin):
     elevator = Wing(WingType.ELEVATOR)
     fin = Wing(WingType.FIN)
 
-    def __init__(self, name="Plane Name") -> None:
+    def __init__(self, name="Plane Name", client=None) -> None:
         self.name = name
         self.wing = Wing(WingType.MAINWING)
         self.wing2 = Wing(WingType.SECONDWING)
         self.elevator = Wing(WingType.ELEVATOR)
         self.fin = Wing(WingType.FIN)
-        self._client = Client()
+        self._client = client
     
     def __str__(self):
         return f'<Plane "{self.name}">'
@@ -125,11 +133,11 @@ class Plane(MsgpackMixin):
 class PlaneManager(DictListInterface):
     """Manager for planes and 3D objects"""
 
-    def __init__(self) -> None:
-        self._client = Client()
+    def __init__(self, client) -> None:
+        self._client = client
     
     def _get_items(self) -> dict:
-        return { item["name"]:Plane.from_msgpack(item) for item in self._client.call("getPlanes") }
+        return { item["name"]:Plane.from_msgpack(item, self._client) for item in self._client.call("getPlanes") }
 
     # def getPlane(self, name) -> Plane:
     #     """Return an existing plane by name"""
@@ -210,44 +218,44 @@ class WPolarSpec(MsgpackMixin):
         self.is_ground_effect = is_ground_effect
         self.height = height # m. Set if ground effect is tru
         
-class WPolarResult(MsgpackMixin):
+class WPolarResult(ColumnarResult):
     """ 
     A custom simplified data structure for the polar result.
-    Filling this is slow so you might want to avoid it when running optimizations
+    Every coefficient is a row of one float64 block; the first rows are indexed by enumWPolarResult.
     """
-    alpha = [] # angle of attach
-    beta = [] # sideslip angle
-    Q_inf = []
+    alpha = Column(enumWPolarResult.ALPHA) # angle of attach
+    beta = Column(_BETA) # sideslip angle
+    Q_inf = Column(enumWPolarResult.QINF)
 
     # lift coefficients
-    Cl = []
-    ClCd = []
-    Cl32Cd = []
+    Cl = Column(enumWPolarResult.CL)
+    ClCd = Column(enumWPolarResult.CLCD)
+    Cl32Cd = Column(enumWPolarResult.CL32CD)
 
     # drag coefficients
-    TCd = [] # total drag
-    ICd = [] # indueced drag
-    PCd = [] # profile drag
+    TCd = Column(enumWPolarResult.CD) # total drag
+    ICd = Column(enumWPolarResult.ICD) # indueced drag
+    PCd = Column(enumWPolarResult.CDP) # profile drag
 
     # moment coefficients
-    Cm = []  # total pitching moment coefficient
-    ICm = [] # induced pitching moment coefficient
-    IYm = [] # induced yawing moment coefficient
-    VCm = [] # viscous pitching moment
+    Cm = Column(enumWPolarResult.CM)  # total pitching moment coefficient
+    ICm = Column(_ICM) # induced pitching moment coefficient
+    IYm = Column(_IYM) # induced yawing moment coefficient
+    VCm = Column(_VCM) # viscous pitching moment
 
     # forces
-    FZ = [] # total wing lift
-    FX = [] # total drag force
-    FY = [] # total side force
+    FZ = Column(enumWPolarResult.FZ) # total wing lift
+    FX = Column(enumWPolarResult.FX) # total drag force
+    FY = Column(enumWPolarResult.FY) # total side force
 
     # moments
-    Rm = [] # total rolling moment
-    Pm = [] # total pitching moment
-    max_bending = [] # max bending moment at chord
+    Rm = Column(_RM) # total rolling moment
+    Pm = Column(_PM) # total pitching moment
+    max_bending = Column(_MAXBENDING) # max bending moment at chord
 
     # stability
-    XCpCl = [] # neutral point
-    SM = [] # static margin
+    XCpCl = Column(enumWPolarResult.XCPCL) # neutral point
+    SM = Column(enumWPolarResult.SM) # static margin
 
 class WPolar(MsgpackMixin):
     name = ""
@@ -283,9 +291,13 @@ class WingAndPlaneDesignModule:
 
     def define_analysis(self, wpolar:WPolar):
         """Takes Polar as argument (and not polar.name) because we're creating a new Polar on the heap everytime"""
-        self._client._call("defineAnalysis3D", wpolar.to_msgpack())
+        self._client.call("defineAnalysis3D", wpolar.to_msgpack())
 
     def analyze(self, polar_name:str, plane_name:str, analysis_settings: AnalysisSettings3D, result_list = []):
         """Analyses the current polar"""
-        wpolar_result_raw = self._client._call("analyzeWPolar", polar_name, plane_name, analysis_settings, result_list)
-        return WPolarResult.from_msgpack(wpolar_result_raw)
+        return self.submit_analysis(polar_name, plane_name, analysis_settings, result_list).result()
+
+    def submit_analysis(self, polar_name:str, plane_name:str, analysis_settings: AnalysisSettings3D, result_list = []):
+        """Starts the analysis of a polar without waiting for it.  Returns a Job resolving to the WPolarResult."""
+        return self._client.submit("analyzeWPolar", polar_name, plane_name, analysis_settings, result_list,
+                                   decode=WPolarResult.from_msgpack)
@@ -1,6 +1,6 @@
-from xflrpy.mixins import MsgpackMixin, DictListInterface
-from xflrpy import Client
+from xflrpy.mixins import MsgpackMixin, DictListInterface, ColumnarResult, Column
 import enum
+import numpy as np
 from xflrpy.module import ModuleType
 import time
 from xflrpy.exceptions import Analysis2dInitializationError, AnalysisDoesNotExistError
@@ -104,45 +104,25 @@ class PolarSpec(MsgpackMixin):
         self.reynolds = reynolds
 
 
-class PolarResult(MsgpackMixin):
+class PolarResult(ColumnarResult):
     """ 
     A custom simplified data structure for the polar result.
-    Filling this is slow so you might want to avoid it when running optimizations
+    Every coefficient is a row of one float64 block indexed by PolarResultType; the attributes are views into it.
     """
-    alpha = []
-    Cl = []
-    XCp = []
-    Cd = []
-    Cdp = []
-    Cm = []
-    XTr1 = []
-    XTr2 = []
-    HMom = []
-    Cpmn = []
-    ClCd = []
-    Cl32Cd = []
-    RtCl = []
-    Re = []
-
-    def __init__(self):
-        pass
-
-    @property
-    def keys(self):
-        return [attr for attr in vars(self) if not attr.startswith('_')]
-
-    @property
-    def dict(self):
-        return {k: self.__dict__[k] for k in self.keys}
-
-    def __len__(self):
-        return len(self.alpha)
-
-    def __str__(self):
-        data = self.dict
-        keys = self.keys
-        available_data_keys = [k for k in keys if len(data[k])>0]
-        return f'PolarResult - {self.__len__()} points: {", ".join(available_data_keys)}'
+    alpha = Column(PolarResultType.ALPHA)
+    Cl = Column(PolarResultType.CL)
+    XCp = Column(PolarResultType.XCP)
+    Cd = Column(PolarResultType.CD)
+    Cdp = Column(PolarResultType.CDP)
+    Cm = Column(PolarResultType.CM)
+    XTr1 = Column(PolarResultType.XTR1)
+    XTr2 = Column(PolarResultType.XTR2)
+    HMom = Column(PolarResultType.HMOM)
+    Cpmn = Column(PolarResultType.CPMN)
+    ClCd = Column(PolarResultType.CLCD)
+    Cl32Cd = Column(PolarResultType.CL32CD)
+    RtCl = Column(PolarResultType.RTCL)
+    Re = Column(PolarResultType.RE)
 
 
 class XflrPolar(MsgpackMixin):
@@ -150,13 +130,13 @@ class XflrPolar(MsgpackMixin):
     foil_name = ""
     spec = PolarSpec()
 
-    def __init__(self):
-        self._client = Client()
+    def __init__(self, client=None):
+        self._client = client
         self.spec = PolarSpec()
 
     @classmethod
-    def from_msgpack(cls, msgpack):
-        p = cls()
+    def from_msgpack(cls, msgpack, client=None):
+        p = cls(client)
         p.foil_name = msgpack['foil_name']
         p.name = msgpack['name']
         p.spec = msgpack['spec']
@@ -193,26 +173,26 @@ class Analysis2d(MsgpackMixin):
 
     @classmethod
     def create(cls, foil_name, name='', polar_type=PolarType.FIXEDSPEEDPOLAR, reynolds=10000, re_type=1, ma_type=1,
-               aoa=0, mach=0.0, ncrit=9.0, xtop=1.0, xbot=1.0):
+               aoa=0, mach=0.0, ncrit=9.0, xtop=1.0, xbot=1.0, client=None):
         
         spec = PolarSpec(polar_type, re_type=re_type, ma_type=ma_type, aoa=aoa,
                            mach=mach, ncrit=ncrit, xtop=xtop, xbot=xbot, reynolds=reynolds)
-        return cls.create_from_polarspec(foil_name, name, spec)
+        return cls.create_from_polarspec(foil_name, name, spec, client=client)
     
     @classmethod
-    def create_from_polarspec(cls, foil_name, name='', polar_spec=None):
+    def create_from_polarspec(cls, foil_name, name='', polar_spec=None, client=None):
         if not polar_spec:
             polar_spec = PolarSpec()
 
-        p = XflrPolar()
+        p = XflrPolar(client)
         p.foil_name = foil_name
         p.name = name
         p.spec = polar_spec
-        res = Client().call("defineAnalysis2D", p.to_msgpack())
-        p = XflrPolar.from_msgpack(res)
+        res = client.call("defineAnalysis2D", p.to_msgpack())
+        p = XflrPolar.from_msgpack(res, client)
         return Analysis2d(polar=p)
     
-    def __init__(self, foil_name=None, polar=None) -> None:
+    def __init__(self, foil_name=None, polar=None, client=None) -> None:
         self.deleted = False
         if not foil_name and not polar:
             raise Analysis2dInitializationError(
@@ -227,9 +207,9 @@ class Analysis2d(MsgpackMixin):
             self._xflr_polar = polar
             self._foil_name = polar.foil_name
         else:
-            self._xflr_polar = XflrPolar()
+            self._xflr_polar = XflrPolar(client)
 
-        self._client = Client()
+        self._client = client if client is not None else self._xflr_polar._client
         # self._polar_result = PolarResult()
         # self._fetch_polar_info()
         # self._fetch_polar_analysis()
@@ -257,10 +237,133 @@ class Analysis2d(MsgpackMixin):
             sequence_type=sequence_type, sequence=sequence)
         if (not self._validate_data_requested_data_points(op_point_values)):
             return
+        result_cache = getattr(self._client, 'result_cache', None)
+        if result_cache is not None:
+            # a cached result skips the server, the points are then not added to the polar there
+            key = result_cache.key(self._client.call("getFoilCoords", self._foil_name), self._xflr_polar.spec,
+                                   settings, op_point_values)
+            result = result_cache.get(key)
+            if result is not None:
+                return result
         self._client.modules.set(ModuleType.XFOILDIRECTANALYSIS)
         polar_result_raw = self._client.call(
             "analyzePolar", self._xflr_polar, settings, op_point_values)
-        return PolarResult.from_msgpack(polar_result_raw)
+        result = PolarResult.from_msgpack(polar_result_raw)
+        if result_cache is not None:
+            result_cache.put(key, result)
+        return result
+
+    def submit_analysis(self, sequence_type=enumSequenceType.ALPHA, sequence=(0, 0, 0),
+                        op_point_values=[r for r in PolarResultType], poller=None):
+        """
+        Starts run_analysis without waiting for it.  The result cache is not consulted.
+
+            job = analysis.submit_analysis(sequence=(0, 15, 0.25))
+            result = job.result(timeout=60)
+
+        Args:
+            poller (Client): optional.  Second connection to the same server, used by job.progress() to count the
+                points of the polar while the analysis runs.  Without it the job reports no progress.
+        Returns:
+            Job: resolves to the PolarResult of the analysis
+        """
+        self._ensure_not_deleted()
+        settings = AnalysisSettings2D(sequence_type=sequence_type, sequence=sequence)
+        if (not self._validate_data_requested_data_points(op_point_values)):
+            return
+        progress = None
+        if poller is not None:
+            start, end, step = sequence
+            expected = max(1, int(round(abs((end - start) / step)))) if step else 1
+
+            def count():
+                return len(PolarResult.from_msgpack(poller.call(
+                    "getPolarResult", self._xflr_polar.foil_name, self._xflr_polar.name, [PolarResultType.ALPHA])))
+            initial = count()
+
+            def progress():
+                return (count() - initial) / expected
+        self._client.modules.set(ModuleType.XFOILDIRECTANALYSIS)
+        return self._client.submit("analyzePolar", self._xflr_polar, settings, op_point_values,
+                                   decode=PolarResult.from_msgpack, progress=progress)
+
+    def run_adaptive_analysis(self, alpha_range=(-5, 25), coarse_step=2.0, min_step=0.25, tolerance=0.005, chunk=4,
+                              stall_drop=0.1, stall_points=2, max_points=200,
+                              op_point_values=[r for r in PolarResultType]):
+        """
+        Runs an alpha sequence that places points where Cl(alpha) needs them instead of on a fixed step.
+
+        The range is first marched upwards with coarse_step, chunk points per call, and the march stops once the foil
+        is past stall: Cl has dropped stall_drop * Cl_max below its maximum, or stall_points consecutive points past
+        the maximum did not converge.  Unconverged points below the maximum, or before Cl turns positive, do not end
+        the march.  Intervals where linear interpolation of Cl would be off by more than tolerance, estimated from the
+        local curvature, are then bisected down to min_step, the midpoints of each round being analyzed in one
+        pipelined burst.  The linear range keeps the coarse step, so a polar takes a
+        fraction of the points of a fixed sequence at min_step.
+
+        Args:
+            alpha_range (tuple): (start, end) in degrees
+            coarse_step (float): step of the first pass
+            min_step (float): smallest spacing the refinement goes down to
+            tolerance (float): acceptable Cl interpolation error between points
+            chunk (int): points per call of the first pass, the granularity of the stall check
+            stall_drop (float): drop of Cl below its maximum, as a fraction of the maximum, that ends the march
+            stall_points (int): consecutive unconverged points past the maximum of Cl that end the march
+            max_points (int): cap on the number of points analyzed
+            op_point_values (list): PolarResultType values to return
+        Returns:
+            PolarResult: the points of this run, sorted by alpha.  They are also added to the polar on the server.
+        """
+        self._ensure_not_deleted()
+        if (not self._validate_data_requested_data_points(op_point_values)):
+            return
+        result_cache = getattr(self._client, 'result_cache', None)
+        if result_cache is not None:
+            settings = {'adaptive': [alpha_range, coarse_step, min_step, tolerance, chunk, stall_drop, stall_points,
+                                     max_points]}
+            key = result_cache.key(self._client.call("getFoilCoords", self._foil_name), self._xflr_polar.spec,
+                                   settings, op_point_values)
+            result = result_cache.get(key)
+            if result is not None:
+                return result
+        values = sorted({int(v) for v in op_point_values} | {PolarResultType.ALPHA, PolarResultType.CL})
+        self._client.modules.set(ModuleType.XFOILDIRECTANALYSIS)
+        results = []
+        attempted = set()
+
+        # first pass: coarse march until past stall
+        start, end = alpha_range
+        while start <= end + 1e-9 and len(attempted) < max_points:
+            # the server leaves out the end of a sequence, the last chunk goes one step past the range to include it
+            stop = min(start + chunk * coarse_step, end + coarse_step)
+            settings = AnalysisSettings2D(sequence=(start, stop, coarse_step))
+            # a chunk ending at 0 is a sequence too
+            settings.is_sequence = True
+            result = PolarResult.from_msgpack(self._client.call("analyzePolar", self._xflr_polar, settings, values))
+            results.append(result)
+            attempted.update(_alpha_key(a) for a in _alpha_grid(start, stop, coarse_step))
+            start += chunk * coarse_step
+            merged = _merge_results(results)
+            if (_past_stall(merged.Cl, stall_drop)
+                    or _unconverged_past_max(attempted, merged.alpha, merged.Cl) >= stall_points):
+                break
+
+        # refinement: bisect the intervals where Cl is not resolved
+        while len(attempted) < max_points:
+            merged = _merge_results(results)
+            midpoints = [a for a in _refinement_points(merged.alpha, merged.Cl, min_step, tolerance)
+                         if _alpha_key(a) not in attempted][:max_points - len(attempted)]
+            if not midpoints:
+                break
+            attempted.update(_alpha_key(a) for a in midpoints)
+            calls = [("analyzePolar", (self._xflr_polar, AnalysisSettings2D(sequence=(a, 0, 0)), values))
+                     for a in midpoints]
+            results.extend(PolarResult.from_msgpack(raw) for raw in self._client.call_many(calls))
+
+        result = _merge_results(results, [int(v) for v in op_point_values])
+        if result_cache is not None:
+            result_cache.put(key, result)
+        return result
 
     def delete(self):
         self.deleted = True
@@ -332,7 +435,7 @@ class Analysis2dManager(DictListInterface):
     """
 
     def __init__(self, foil) -> None:
-        self._client = Client()
+        self._client = foil._client
         self.foil = foil
 
     def _get_items(self) -> dict:
@@ -341,16 +444,132 @@ class Analysis2dManager(DictListInterface):
     def _fetch(self):
         polar_list_raw = self._client.call("polarList", self.foil.name)
         return {polar_data['name']: Analysis2d(
-            XflrPolar.from_msgpack(polar_data)) for polar_data in polar_list_raw}
+            polar=XflrPolar.from_msgpack(polar_data, self._client)) for polar_data in polar_list_raw}
 
     def create(self, name='', polar_type=PolarType.FIXEDLIFTPOLAR, reynolds=10000, re_type=1, ma_type=1,
                aoa=0, mach=0.0, ncrit=9.0, xtop=1.0, xbot=1.0) -> Analysis2d:
         analysis = Analysis2d.create(self.foil.name, name=name, polar_type=polar_type, reynolds=reynolds,
                                      re_type=re_type, ma_type=ma_type, aoa=aoa, mach=mach, ncrit=ncrit, xtop=xtop,
-                                     xbot=xbot)
+                                     xbot=xbot, client=self._client)
         return analysis
 
 
+class PolarTable():
+    """
+    Points of many polars as one columnar table, one row per point.  The foil and polar columns hold strings, the
+    spec columns (reynolds, mach, ncrit, xtop, xbot) and the result columns (alpha, Cl, Cd, ...) float64 arrays.
+    Rows of a polar are contiguous and sorted as the server returned them.
+
+        table = client.foils.batch_results()
+        table.filter(foil="NACA 2412", reynolds=2e5)["Cl"]
+        pandas.DataFrame(table.columns)
+
+    Args:
+        columns (dict): {name: array}, all of the same length
+    """
+    SPEC_COLUMNS = ('reynolds', 'mach', 'ncrit', 'xtop', 'xbot')
+
+    def __init__(self, columns) -> None:
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+
+    @classmethod
+    def from_results(cls, entries, op_point_values=[r for r in PolarResultType]):
+        """
+        Args:
+            entries (list): (foil name, polar msgpack, PolarResult) tuples, as returned by polarList and getPolarResult
+            op_point_values (list): PolarResultType columns of the table
+        Returns:
+            PolarTable
+        """
+        names = PolarResult._column_names()
+        values = [int(v) for v in op_point_values]
+        counts = [len(result) for _, _, result in entries]
+        columns = {
+            'foil': np.repeat(np.array([foil for foil, _, _ in entries], dtype=str), counts),
+            'polar': np.repeat(np.array([polar['name'] for _, polar, _ in entries], dtype=str), counts),
+        }
+        for key in cls.SPEC_COLUMNS:
+            spec_values = [float(polar.get('spec', {}).get(key, np.nan)) for _, polar, _ in entries]
+            columns[key] = np.repeat(np.array(spec_values, dtype=np.float64), counts)
+        blocks = [result.data[values] for _, _, result in entries if len(result)]
+        data = np.concatenate(blocks, axis=1) if blocks else np.empty((len(values), 0))
+        columns.update({names[v]: data[i] for i, v in enumerate(values)})
+        return cls(columns)
+
+    @property
+    def keys(self) -> list:
+        return list(self.columns)
+
+    @property
+    def polars(self) -> list:
+        "(foil, polar) names of the polars in the table, in table order"
+        return list(dict.fromkeys(zip(self.columns['foil'].tolist(), self.columns['polar'].tolist())))
+
+    def where(self, mask):
+        "Rows where mask is True, as a new PolarTable"
+        return PolarTable({name: values[mask] for name, values in self.columns.items()})
+
+    def filter(self, **values):
+        """
+        Rows whose columns equal the given values, e.g. filter(foil="NACA 0012", reynolds=1e5).  Float columns are
+        compared with a relative tolerance.
+
+        Returns:
+            PolarTable
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in values.items():
+            column = self.columns[name]
+            if column.dtype.kind in 'fc':
+                mask &= np.isclose(column, value, rtol=1e-9, atol=0)
+            else:
+                mask &= column == value
+        return self.where(mask)
+
+    def to_results(self) -> dict:
+        "{(foil, polar): PolarResult} for every polar of the table"
+        names = set(PolarResult._column_names().values())
+        results = {}
+        for foil, polar in self.polars:
+            rows = (self.columns['foil'] == foil) & (self.columns['polar'] == polar)
+            results[(foil, polar)] = PolarResult.from_arrays(
+                {name: values[rows] for name, values in self.columns.items() if name in names})
+        return results
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __len__(self):
+        return len(self.columns['foil'])
+
+    def __str__(self):
+        return f'<PolarTable>({len(self.polars)} polars, {len(self)} points: {", ".join(self.keys)})'
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _fetch_polar_results(client, foil_names, op_point_values, accept=None) -> list:
+    """
+    Fetches the results of every polar of several foils in two pipelined bursts: polarList for all foils, then
+    getPolarResult for all polars.  Nothing is selected in the GUI.
+
+    Args:
+        accept (callable): optional.  accept(foil name, polar msgpack) returns False for the polars to skip.
+    Returns:
+        list: (foil name, polar msgpack, PolarResult) tuples
+    """
+    polar_lists = client.call_many([("polarList", (name,)) for name in foil_names])
+    polars = [(name, polar) for name, polar_list in zip(foil_names, polar_lists) for polar in polar_list
+              if accept is None or accept(name, polar)]
+    values = [int(v) for v in op_point_values]
+    raw = client.call_many([("getPolarResult", (name, polar['name'], values)) for name, polar in polars])
+    return [(name, polar, PolarResult.from_msgpack(r)) for (name, polar), r in zip(polars, raw)]
+
+
 class OpPoint(MsgpackMixin):
     """A raw single point result"""
     alpha = ""
@@ -381,9 +600,74 @@ class OpPoint(MsgpackMixin):
     
 
 # class OpPointManager:
-#     def __init__(self) -> None:
-#         self._client = Client()
+#     def __init__(self, client) -> None:
+#         self._client = client
 
 #     def getOpPoint(self, alpha, polar_name=" ", foil_name=""):
 #         opp_raw = self._client.call("getOpPoint", alpha, polar_name, foil_name)
 #         return OpPoint.from_msgpack(opp_raw)
+
+
+def _alpha_key(alpha) -> float:
+    "Rounds an angle so that angles computed by different sums compare equal"
+    return round(float(alpha), 6)
+
+
+def _alpha_grid(start, stop, step) -> np.ndarray:
+    "Angles of a sequence from start to stop, stop excluded like the sequences of XFLR5"
+    return start + step * np.arange(int(round((stop - start) / step)))
+
+
+def _past_stall(cl, stall_drop) -> bool:
+    "True once Cl has dropped stall_drop * Cl_max below a positive maximum"
+    if len(cl) < 2:
+        return False
+    peak = int(np.argmax(cl))
+    return cl[peak] > 0 and bool(np.any(cl[peak + 1:] <= cl[peak] * (1 - stall_drop)))
+
+
+def _unconverged_past_max(attempted, alpha, cl) -> int:
+    """
+    Number of consecutive attempted angles past the maximum of Cl that did not converge, i.e. the angles above the
+    last converged one, which is at or past the maximum.  0 until Cl has a positive maximum.
+    """
+    if len(cl) == 0 or cl.max() <= 0:
+        return 0
+    last = _alpha_key(alpha.max())
+    return sum(1 for a in attempted if a > last)
+
+
+def _refinement_points(alpha, cl, min_step, tolerance) -> list:
+    """
+    Returns the midpoints of the intervals whose linear interpolation error, |Cl''| * h^2 / 8 with Cl'' estimated
+    from the three point second difference at either end, exceeds tolerance.  Intervals are not split below min_step.
+    """
+    if len(alpha) < 3:
+        return []
+    h = np.diff(alpha)
+    slope = np.diff(cl) / h
+    curvature = np.zeros(len(alpha))
+    curvature[1:-1] = np.abs(2 * np.diff(slope) / (h[:-1] + h[1:]))
+    error = np.maximum(curvature[:-1], curvature[1:]) * h ** 2 / 8
+    split = (error > tolerance) & (h / 2 >= min_step * (1 - 1e-9))
+    return ((alpha[:-1] + alpha[1:]) / 2)[split].tolist()
+
+
+def _merge_results(results, op_point_values=None) -> PolarResult:
+    """
+    Concatenates PolarResults into one, sorted by alpha.  Of points with the same alpha the last one is kept.
+
+    Args:
+        op_point_values (list): optional.  Columns to keep, all returned columns by default.
+    """
+    results = [r for r in results if len(r) > 0]
+    if not results:
+        return PolarResult()
+    data = np.concatenate([r.data for r in results], axis=1)
+    alpha = np.array([_alpha_key(a) for a in data[PolarResultType.ALPHA]])
+    _, index = np.unique(alpha[::-1], return_index=True)
+    index = len(alpha) - 1 - index
+    names = PolarResult._column_names()
+    columns = sorted({c for r in results for c in r._columns}) if op_point_values is None else op_point_values
+    return PolarResult.from_arrays({names[int(c)]: data[int(c), index] for c in columns})
+
@@ -0,0 +1,204 @@
+import threading
+import queue
+from concurrent.futures import Future
+from xflrpy.client import Client
+from xflrpy.foil import Foil, _batch_settings, _batch_polar_filter
+from xflrpy.polar2d import PolarType, PolarSpec, PolarResultType, Analysis2d, enumSequenceType, _fetch_polar_results
+
+
+class ServerPool():
+    """
+    ServerPool distributes 2D analyses across several XFLR5-RPC servers.  Each server gets a worker thread with its
+    own Client; workers pull jobs from a shared queue, so a busy server never holds up the others.
+
+    Jobs carry the foil coordinates with them.  Before running a job a worker ships the coordinates to its server
+    (once per foil and server), so the foils do not have to be loaded on every server up front.
+
+    Example:
+        with ServerPool([8080, 8081, 8082]) as pool:
+            futures = [pool.submit_analysis(foil, reynolds=re, sequence=(0, 15, 0.25)) for re in re_list]
+            results = [f.result() for f in futures]
+    """
+
+    def __init__(self, addresses, timeout=300, result_cache=None) -> None:
+        """
+        Args:
+            addresses (list): servers to connect to.  Each entry is a port on localhost, an "ip:port" string or an
+                (ip, port) tuple.
+            timeout (int): timeout in seconds for each call.  See Client.connect.
+            result_cache (ResultCache): optional.  Disk cache of 2D results shared by all servers.
+        Raises:
+            msgpackrpc.error.TransportError: if a server cannot be reached.  The other connections are closed.
+        """
+        self._jobs = queue.Queue()
+        self._workers = [_PoolWorker(self, _parse_address(a), timeout, result_cache) for a in addresses]
+        for worker in self._workers:
+            worker.start()
+        for worker in self._workers:
+            worker.connected.wait()
+        failed = [w for w in self._workers if w.error is not None]
+        if failed:
+            self._workers = [w for w in self._workers if w.error is None]
+            self.close()
+            raise failed[0].error
+
+    @property
+    def size(self) -> int:
+        return len(self._workers)
+
+    def submit(self, fn, *args) -> Future:
+        """
+        Queues fn(worker, *args) to run on the next idle server.
+
+        Returns:
+            concurrent.futures.Future: resolves to the return value of fn
+        """
+        future = Future()
+        self._jobs.put((future, fn, args))
+        return future
+
+    def submit_analysis(self, foil, name='', sequence_type=enumSequenceType.ALPHA, sequence=(0, 0, 0),
+                        op_point_values=[r for r in PolarResultType], polar_type=PolarType.FIXEDLIFTPOLAR,
+                        reynolds=10000, re_type=1, ma_type=1, aoa=0, mach=0.0, ncrit=9.0, xtop=1.0,
+                        xbot=1.0) -> Future:
+        """
+        Queues a 2D analysis.  Equivalent of Analysis2dManager.create followed by Analysis2d.run_analysis.
+
+        Args:
+            foil (Foil or tuple): the foil to analyze, either a Foil or a (name, coordinates) tuple
+        Returns:
+            concurrent.futures.Future: resolves to the PolarResult of the analysis
+        """
+        spec = PolarSpec(polar_type, re_type=re_type, ma_type=ma_type, aoa=aoa,
+                         mach=mach, ncrit=ncrit, xtop=xtop, xbot=xbot, reynolds=reynolds)
+        return self.submit(_run_analysis, _foil_payload(foil), name, spec, sequence_type, sequence,
+                           list(op_point_values))
+
+    def map_analyses(self, foils, **kwargs) -> list:
+        """
+        Runs the same analysis for every foil, spread over all servers.
+
+        Returns:
+            PolarResult[]: results in the same order as foils
+        """
+        futures = [self.submit_analysis(foil, **kwargs) for foil in foils]
+        return [f.result() for f in futures]
+
+    def run_batch_analysis(self, re_list, foil_list, op_point_values=[r for r in PolarResultType], **kwargs) -> dict:
+        """
+        Splits foil_list over the servers and runs one batchAnalyze per server.  Accepts the keyword arguments of
+        FoilManager.run_batch_analysis.
+
+        Returns:
+            dict: {foil_name: {polar_name: PolarResult}} for every foil in foil_list
+        """
+        payloads = [_foil_payload(foil) for foil in foil_list]
+        chunks = [payloads[i::self.size] for i in range(self.size)]
+        futures = [self.submit(_run_batch_analysis, chunk, re_list, list(op_point_values), kwargs)
+                   for chunk in chunks if chunk]
+        results = {}
+        for future in futures:
+            results.update(future.result())
+        return results
+
+    def close(self) -> None:
+        "Stops the workers once queued jobs are done and closes their connections"
+        for _ in self._workers:
+            self._jobs.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __str__(self):
+        servers = ", ".join(w.remote_address for w in self._workers)
+        return f"<ServerPool>(servers:[{servers}])"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class _PoolWorker(threading.Thread):
+    """
+    Owns the Client of one server.  The Client is connected in the worker thread it is used from, connected is set
+    once the attempt is over and error holds its exception if it failed.
+    """
+
+    def __init__(self, pool, address, timeout, result_cache=None) -> None:
+        super().__init__(daemon=True)
+        self.connected = threading.Event()
+        self.error = None
+        self._pool = pool
+        self._address = address
+        self._timeout = timeout
+        self._shipped = {}
+        self.client = Client()
+        self.client.result_cache = result_cache
+        self.remote_address = f"{address[0]}:{address[1]}"
+
+    def run(self):
+        try:
+            self.client.connect(*self._address, timeout=self._timeout)
+        except Exception as e:
+            self.error = e
+            return
+        finally:
+            self.connected.set()
+        while True:
+            job = self._pool._jobs.get()
+            if job is None:
+                break
+            future, fn, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(self, *args))
+            except Exception as e:
+                future.set_exception(e)
+        self.client.close()
+
+    def ship_foil(self, name, coordinates) -> Foil:
+        "Makes sure the server holds a foil with this name and these coordinates"
+        if self._shipped.get(name) != coordinates:
+            self.client.foils.create_from_coordinates(name, coordinates, update_gui=False)
+            self._shipped[name] = coordinates
+        return Foil.from_msgpack({'name': name}, self.client)
+
+
+def _run_analysis(worker, foil, name, spec, sequence_type, sequence, op_point_values):
+    worker.ship_foil(*foil)
+    analysis = Analysis2d.create_from_polarspec(foil[0], name, spec, client=worker.client)
+    return analysis.run_analysis(sequence_type=sequence_type, sequence=sequence, op_point_values=op_point_values)
+
+
+def _run_batch_analysis(worker, foils, re_list, op_point_values, kwargs):
+    shipped = [worker.ship_foil(*foil) for foil in foils]
+    worker.client.foils.run_batch_analysis(re_list, shipped, **kwargs)
+    # the server may keep polars of earlier jobs for the same foils
+    accept = _batch_polar_filter(_batch_settings(shipped, re_list, **kwargs))
+    results = {foil.name: {} for foil in shipped}
+    for foil_name, polar, result in _fetch_polar_results(worker.client, list(results), op_point_values, accept):
+        results[foil_name][polar['name']] = result
+    return results
+
+
+def _foil_payload(foil) -> tuple:
+    "Returns the (name, coordinates) pair a worker needs to recreate the foil on its server"
+    if isinstance(foil, Foil):
+        return foil.name, foil.coordinates
+    name, coordinates = foil
+    return name, [list(c) for c in coordinates]
+
+
+def _parse_address(address) -> tuple:
+    if isinstance(address, int):
+        return '127.0.0.1', address
+    if isinstance(address, str):
+        ip, port = address.rsplit(':', 1)
+        return ip, int(port)
+    ip, port = address
+    return ip, int(port)
@@ -1,9 +1,6 @@
-from xflrpy import Client
-
-
 class ProjectManager():
-    def __init__(self):
-        self._client = Client()
+    def __init__(self, client):
+        self._client = client
         self._state = {
             'project_name': None,
             'project_path': None,
@@ -0,0 +1,178 @@
+"""
+Persistent cache of 2D analysis results, shared between runs and processes.
+
+Results are stored under a hash of everything that determines them: the foil coordinates, the polar spec, the
+analysis settings and the requested result columns.  The foil and polar names are not part of the key, so a design
+analyzed again under another name is still a hit.
+
+    client.result_cache = ResultCache("~/.cache/xflrpy", max_bytes=2**30)
+    analysis.run_analysis(sequence=(0, 10, 0.5))    # analyzed by the server, then stored
+    analysis.run_analysis(sequence=(0, 10, 0.5))    # read from disk
+
+Each result is one .npz file, written to a temporary file and renamed into place, so readers never see a partial
+file and several processes can share a cache folder without locks.  When the folder grows past max_bytes the least
+recently used results are removed.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+from xflrpy.polar2d import PolarResult
+
+# after an eviction the cache is trimmed to this fraction of max_bytes, so evictions do not run on every store
+LOW_WATER = 0.9
+KEY_VERSION = 1
+
+
+class ResultCache():
+    """
+    Args:
+        path (str): cache folder, created if needed
+        max_bytes (int): size above which least recently used results are evicted
+    """
+
+    def __init__(self, path, max_bytes=2**30) -> None:
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.path, exist_ok=True)
+        self._size = self._scan_size()
+
+    @staticmethod
+    def key(coordinates, spec, settings, op_point_values) -> str:
+        """
+        Hashes the inputs of an analysis.
+
+        Args:
+            coordinates (array_like): foil coordinates
+            spec (PolarSpec or dict): polar spec
+            settings (AnalysisSettings2D or dict): analysis settings
+            op_point_values (list): requested PolarResultType columns
+        Returns:
+            str: hex digest
+        """
+        h = hashlib.sha256()
+        h.update(np.ascontiguousarray(coordinates, dtype='<f8').tobytes())
+        h.update(_canonical([KEY_VERSION, spec, settings, [int(v) for v in op_point_values]]))
+        return h.hexdigest()
+
+    def get(self, key) -> PolarResult:
+        """
+        Returns:
+            PolarResult: the stored result, or None if there is none
+        """
+        path = self._file(key)
+        try:
+            with np.load(path) as stored:
+                result = PolarResult.from_arrays({name: stored[name] for name in stored.files})
+            # record the use for LRU eviction
+            os.utime(path)
+        except (FileNotFoundError, ValueError, OSError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key, result) -> None:
+        "Stores a PolarResult under key, atomically"
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **result.dict)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._size += os.path.getsize(path)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Removes least recently used results until the cache is below LOW_WATER * max_bytes.  Sizes are rescanned,
+        since other processes may have stored results too.
+
+        Returns:
+            int: number of results removed
+        """
+        entries = []
+        for path in self._files():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        size = sum(e[1] for e in entries)
+        removed = 0
+        for _, file_size, path in entries:
+            if size <= self.max_bytes * LOW_WATER:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            size -= file_size
+        self._size = size
+        return removed
+
+    def clear(self) -> None:
+        for path in self._files():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._size = 0
+
+    def __contains__(self, key):
+        return os.path.exists(self._file(key))
+
+    def __len__(self):
+        return sum(1 for _ in self._files())
+
+    def __str__(self):
+        return f"<ResultCache>({self.path}, {self._size} bytes, {self.hits} hits, {self.misses} misses)"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], key + '.npz')
+
+    def _files(self):
+        for folder in os.listdir(self.path):
+            folder = os.path.join(self.path, folder)
+            if os.path.isdir(folder):
+                for name in os.listdir(folder):
+                    if name.endswith('.npz'):
+                        yield os.path.join(folder, name)
+
+    def _scan_size(self):
+        size = 0
+        for path in self._files():
+            try:
+                size += os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+        return size
+
+
+def _canonical(value) -> bytes:
+    "Stable serialization of specs and settings, objects included"
+    return json.dumps(value, sort_keys=True, default=_plain).encode()
+
+
+def _plain(value):
+    if hasattr(value, 'to_msgpack'):
+        return value.to_msgpack()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"cannot hash {type(value).__name__}")
@@ -0,0 +1,116 @@
+"""
+Recovery of the connection of a Client when the server restarts or the network fails.
+
+A request whose connection is lost fails with a msgpackrpc.error.TransportError instead of waiting for the timeout
+of the call.  The client then opens a new connection.  Idempotent calls are sent again after an exponential backoff
+with jitter.  Other calls raise ConnectionLostError, because the server may already have applied them:
+
+    client.retry = RetryPolicy(retries=8, max_delay=10)
+    client.retry.calls.add("setLineStyle")      # also retry a call that is safe to repeat
+"""
+import random
+from msgpackrpc.error import TransportError
+from msgpackrpc.transport import tcp
+from tornado.iostream import StreamClosedError
+
+# read-only calls, repeated after a lost connection
+IDEMPOTENT_CALLS = {
+    'ping', 'getState', 'validateFilePaths',
+    'foilList', 'getFoil', 'getFoilCoords', 'getLineStyle',
+    'polarList', 'getPolar', 'getPolarResult', 'getOpPoints', 'getOpPoint', 'getXDirectDisplay',
+    'getPlanes', 'getPlane', 'getPlaneData',
+}
+
+
+class RetryPolicy():
+    """
+    When and how often the idempotent calls of a client are retried after a lost connection.  The n-th retry waits
+    min(max_delay, base_delay * 2 ** (n - 1)) seconds, shortened by a random fraction up to jitter so that clients
+    of a restarted server do not all reconnect at the same time.
+
+    Args:
+        retries (int): retries of a call before its TransportError is raised.  0 disables retries.
+        base_delay (float): seconds before the first retry
+        max_delay (float): longest wait between two attempts
+        jitter (float): largest random fraction removed from each delay, between 0 and 1
+        calls (set): names of the calls that may be retried, IDEMPOTENT_CALLS by default
+        seed (int): optional.  Seed of the jitter.
+    """
+
+    def __init__(self, retries=5, base_delay=0.1, max_delay=5.0, jitter=0.5, calls=None, seed=None) -> None:
+        if not 0 <= jitter <= 1:
+            raise ValueError(f'jitter must be between 0 and 1, not {jitter}')
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.calls = set(IDEMPOTENT_CALLS if calls is None else calls)
+        self._random = random.Random(seed)
+
+    def can_retry(self, rpc_call) -> bool:
+        return rpc_call in self.calls
+
+    def delay(self, retry) -> float:
+        """
+        Args:
+            retry (int): number of the retry, from 1
+        Returns:
+            float: seconds to wait before the retry, or None once the retries are exhausted
+        """
+        if retry > self.retries:
+            return None
+        delay = min(self.max_delay, self.base_delay * 2 ** (retry - 1))
+        return delay * (1 - self.jitter * self._random.random())
+
+    def __str__(self):
+        return f'<RetryPolicy>(retries:{self.retries}, base_delay:{self.base_delay}, max_delay:{self.max_delay})'
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class _ClientTransport(tcp.ClientTransport):
+    """
+    msgpackrpc forgets a closed connection and reopens one for the next request, but the requests in flight on the
+    closed connection are never answered and only fail once the client timeout expires.  They fail at once here.
+
+    This relies on private attributes of the msgpackrpc session and transport, see _check_session.
+    """
+
+    async def send_message(self, message):
+        try:
+            await super().send_message(message)
+        except StreamClosedError:
+            self._connection_lost()
+
+    async def on_close(self, sock):
+        if not self._closed and sock in self._sockets:
+            self._sockets.remove(sock)
+            self._connection_lost()
+            return
+        await super().on_close(sock)
+
+    def _connection_lost(self):
+        session = self._session
+        if not session._request_table:
+            return
+        for future in session._request_table.values():
+            future.set_error(TransportError(f'connection to {self._address.host}:{self._address.port} lost'))
+        session._request_table = {}
+        session._loop.stop()
+
+
+class _TcpBuilder():
+    "Transport builder given to msgpackrpc.Client, in place of the msgpackrpc.transport.tcp module"
+    ClientTransport = _ClientTransport
+
+
+def _check_session(rpc_client):
+    "Fails early if the msgpackrpc client lacks the private attributes _ClientTransport works with"
+    transport = getattr(rpc_client, '_transport', None)
+    missing = [name for obj, name in ((rpc_client, '_request_table'), (rpc_client, '_loop'),
+                                      (transport, '_sockets'), (transport, '_closed'), (transport, '_address'))
+               if not hasattr(obj, name)]
+    if missing:
+        raise RuntimeError(f'unsupported msgpackrpc version, {", ".join(missing)} not found.  '
+                           f'xflrpy requires rpc-msgpack 0.6')
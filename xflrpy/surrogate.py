@@ -0,0 +1,197 @@
+"""
+Local interpolation of polar coefficients over angle of attack and Reynolds number.
+
+    surrogate = PolarSurrogate.from_foil(client.foils["NACA 2412"])    # after run_batch_analysis
+    cl = surrogate.Cl(alpha_array, re_array)
+
+The polars are resampled once onto a uniform alpha grid, one row per Reynolds number, so a query costs a few array
+operations whatever the number of points: alpha is located by arithmetic and interpolated linearly, Reynolds
+numbers are interpolated linearly in log(Re).  Queries never touch the server.
+"""
+import numpy as np
+from xflrpy.polar2d import PolarResult, _fetch_polar_results
+
+COEFFICIENTS = ('Cl', 'Cd', 'Cm')
+
+
+class PolarSurrogate():
+    """
+    Args:
+        polars (dict or list): {reynolds: PolarResult}, or PolarResults of fixed speed polars, keyed by their first
+            Re value.  All polars must belong to one family, e.g. the same Mach and Ncrit.
+        coefficients (tuple): names of the PolarResult columns to interpolate
+        alpha_step (float): spacing of the alpha grid in degrees
+        extrapolate (bool): clamp queries outside the analyzed alpha and Reynolds ranges to the nearest edge.  By
+            default they return NaN.  An alpha outside the range converged at one Reynolds number is always NaN.
+    """
+
+    def __init__(self, polars, coefficients=COEFFICIENTS, alpha_step=0.25, extrapolate=False):
+        if not isinstance(polars, dict):
+            polars = _by_reynolds((float(p.Re[0]), p) for p in polars if len(p.Re) > 0)
+        polars = {re: p for re, p in polars.items() if len(p) > 0}
+        if not polars:
+            raise ValueError("PolarSurrogate needs at least one polar with points")
+        self.coefficients = tuple(coefficients)
+        self.extrapolate = extrapolate
+        self.reynolds = np.array(sorted(polars), dtype=np.float64)
+        low = min(np.nanmin(p.alpha) for p in polars.values())
+        high = max(np.nanmax(p.alpha) for p in polars.values())
+        self.alpha = np.arange(low, high + alpha_step / 2, alpha_step)
+        self.alpha_step = alpha_step
+        # grid[coefficient, reynolds, alpha]
+        self.grid = np.full((len(self.coefficients), len(self.reynolds), len(self.alpha)), np.nan)
+        for j, re in enumerate(self.reynolds):
+            self.grid[:, j] = _resample(polars[re], self.coefficients, self.alpha)
+        self._log_re = np.log(self.reynolds)
+
+    @classmethod
+    def from_foil(cls, foil, polar_type=None, mach=None, ncrit=None, **kwargs):
+        """
+        Builds a surrogate from the polars of a foil, e.g. after FoilManager.run_batch_analysis.  The polars are
+        fetched in one pipelined burst without selecting them in the GUI, and keyed by the Reynolds number of their
+        spec, which for fixed lift polars is Re * sqrt(Cl).
+
+        Args:
+            foil (Foil): the foil
+            polar_type (PolarType): optional.  Only use polars of this type.
+            mach (float): optional.  Only use polars at this Mach number.
+            ncrit (float): optional.  Only use polars with this Ncrit.
+            kwargs: arguments of PolarSurrogate
+        Returns:
+            PolarSurrogate
+        Raises:
+            ValueError: if several selected polars share a Reynolds number, e.g. polars at different Mach numbers
+                without a mach filter
+        """
+        conditions = {key: value for key, value in (('polar_type', polar_type), ('mach', mach), ('ncrit', ncrit))
+                      if value is not None}
+
+        def accept(foil_name, polar):
+            spec = polar.get('spec', {})
+            return all(key in spec and np.isclose(float(spec[key]), float(value)) for key, value in conditions.items())
+
+        indices = {name: index for index, name in PolarResult._column_names().items()}
+        values = [indices[name] for name in ('alpha', *kwargs.get('coefficients', COEFFICIENTS))]
+        results = _fetch_polar_results(foil._client, [foil.name], values, accept)
+        polars = _by_reynolds((float(polar['spec']['reynolds']), result) for _, polar, result in results
+                              if len(result) > 0)
+        return cls(polars, **kwargs)
+
+    def evaluate(self, coefficient, alpha, reynolds=None) -> np.ndarray:
+        """
+        Interpolates a coefficient.  alpha and reynolds broadcast against each other.
+
+        Args:
+            coefficient (str): one of the surrogate coefficients, e.g. "Cl"
+            alpha (float or array_like): angles of attack in degrees
+            reynolds (float or array_like): Reynolds numbers.  Optional if the surrogate holds a single polar.
+        Returns:
+            numpy.ndarray: interpolated values, NaN outside the data unless extrapolate is set
+        """
+        grid = self.grid[self.coefficients.index(coefficient)]
+        alpha = np.asarray(alpha, dtype=np.float64)
+        if reynolds is None:
+            if len(self.reynolds) > 1:
+                raise ValueError("reynolds is required for a surrogate of several polars")
+            reynolds = self.reynolds[0]
+        alpha, reynolds = np.broadcast_arrays(alpha, np.asarray(reynolds, dtype=np.float64))
+
+        position = (alpha - self.alpha[0]) / self.alpha_step
+        outside = (position < 0) | (position > len(self.alpha) - 1)
+        position = np.clip(position, 0, len(self.alpha) - 1)
+        i = np.minimum(position.astype(np.intp), len(self.alpha) - 2) if len(self.alpha) > 1 else np.zeros_like(
+            position, dtype=np.intp)
+        w = position - i
+
+        if len(self.reynolds) == 1:
+            row = grid[0]
+            values = _lerp(row, i, w)
+        else:
+            log_re = np.log(reynolds)
+            outside |= (log_re < self._log_re[0]) | (log_re > self._log_re[-1])
+            log_re = np.clip(log_re, self._log_re[0], self._log_re[-1])
+            j = np.clip(np.searchsorted(self._log_re, log_re, side='right') - 1, 0, len(self.reynolds) - 2)
+            v = (log_re - self._log_re[j]) / (self._log_re[j + 1] - self._log_re[j])
+            values = _blend(_lerp2(grid, j, i, w), _lerp2(grid, j + 1, i, w), v)
+        if not self.extrapolate:
+            values = np.where(outside, np.nan, values)
+        return values
+
+    def Cl(self, alpha, reynolds=None) -> np.ndarray:
+        return self.evaluate('Cl', alpha, reynolds)
+
+    def Cd(self, alpha, reynolds=None) -> np.ndarray:
+        return self.evaluate('Cd', alpha, reynolds)
+
+    def Cm(self, alpha, reynolds=None) -> np.ndarray:
+        return self.evaluate('Cm', alpha, reynolds)
+
+    def save(self, path) -> None:
+        "Writes the grid to an .npz file, to reuse the surrogate without the server"
+        np.savez(path, grid=self.grid, alpha=self.alpha, reynolds=self.reynolds,
+                 coefficients=np.array(self.coefficients), extrapolate=self.extrapolate)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as stored:
+            surrogate = cls.__new__(cls)
+            surrogate.grid = stored['grid']
+            surrogate.alpha = stored['alpha']
+            surrogate.reynolds = stored['reynolds']
+            surrogate.coefficients = tuple(str(c) for c in stored['coefficients'])
+            surrogate.extrapolate = bool(stored['extrapolate'])
+        surrogate.alpha_step = float(surrogate.alpha[1] - surrogate.alpha[0]) if len(surrogate.alpha) > 1 else 1.0
+        surrogate._log_re = np.log(surrogate.reynolds)
+        return surrogate
+
+    def __str__(self):
+        return (f"<PolarSurrogate>({', '.join(self.coefficients)}, alpha {self.alpha[0]:g} to {self.alpha[-1]:g}, "
+                f"{len(self.reynolds)} Reynolds numbers)")
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _by_reynolds(pairs) -> dict:
+    "Returns {reynolds: PolarResult} for (reynolds, PolarResult) pairs, refusing two polars at one Reynolds number"
+    polars = {}
+    for reynolds, polar in pairs:
+        if reynolds in polars:
+            raise ValueError(f"several polars at Re {reynolds:g}, select the polars of one family, e.g. by mach or "
+                             f"ncrit")
+        polars[reynolds] = polar
+    return polars
+
+
+def _resample(polar, coefficients, alpha) -> np.ndarray:
+    "Values of a polar at the grid angles, NaN outside its own alpha range"
+    order = np.argsort(polar.alpha, kind='stable')
+    polar_alpha = polar.alpha[order]
+    # keep the last point of repeated angles
+    keep = np.append(polar_alpha[1:] != polar_alpha[:-1], True)
+    polar_alpha = polar_alpha[keep]
+    rows = np.full((len(coefficients), len(alpha)), np.nan)
+    inside = (alpha >= polar_alpha[0]) & (alpha <= polar_alpha[-1])
+    for k, name in enumerate(coefficients):
+        values = getattr(polar, name)
+        if len(values) == 0:
+            continue
+        rows[k, inside] = np.interp(alpha[inside], polar_alpha, values[order][keep])
+    return rows
+
+
+def _lerp(row, i, w):
+    if len(row) == 1:
+        return np.broadcast_to(row[0], np.shape(i)).astype(np.float64)
+    return _blend(row[i], row[i + 1], w)
+
+
+def _lerp2(grid, j, i, w):
+    if grid.shape[1] == 1:
+        return np.broadcast_to(grid[j, 0], np.shape(i)).astype(np.float64)
+    return _blend(grid[j, i], grid[j, i + 1], w)
+
+
+def _blend(low, high, w):
+    "Linear blend that ignores a NaN neighbour when the query falls exactly on a grid node"
+    return np.where(w == 0, low, np.where(w == 1, high, low * (1 - w) + high * w))
@@ -0,0 +1,223 @@
+"""
+Parameter-grid sweeps of 2D analyses, dispatched in batchAnalyze chunks and checkpointed to a local file.
+
+    sweep = Sweep(client, foils, reynolds=[1e5, 2e5, 5e5], mach=[0, 0.1], ncrit=[5, 9], checkpoint="study.jsonl")
+    results = sweep.run()       # {Cell: PolarResult}
+
+Every completed cell is appended to the checkpoint, a JSON-lines file, as soon as its chunk is fetched.  Running a
+sweep again with the same checkpoint skips the cells found there, so a sweep interrupted by a crash of the server or
+of the script resumes where it stopped.  A truncated last line, left by a crash while writing, is removed from the
+file when the sweep is resumed.
+"""
+import json
+import os
+from collections import namedtuple
+import numpy as np
+from xflrpy.exceptions import SweepCheckpointError
+from xflrpy.foil import Foil, _batch_settings
+from xflrpy.log import logger
+from xflrpy.polar2d import PolarResult, PolarResultType, PolarType, _alpha_grid, _alpha_key, _fetch_polar_results
+
+CHECKPOINT_VERSION = 1
+
+Cell = namedtuple('Cell', ['foil', 'reynolds', 'mach', 'ncrit', 'xtop', 'xbot'])
+
+
+class Sweep():
+    """
+    Args:
+        client (Client): connected client
+        foils (list): Foil objects or foil names, loaded on the server
+        reynolds, mach, ncrit, xtop, xbot (list): values of each parameter.  The grid is their product with foils,
+            repeated values are analyzed once.
+        sequence (tuple): (min, max, increment) alpha sequence of every polar
+        polar_type (PolarType): type of the polars
+        checkpoint (str): optional.  JSON-lines file recording completed cells, created if needed.
+        chunk_size (int): maximum number of cells per batchAnalyze call
+        op_point_values (list): PolarResultType values fetched and stored for each cell
+    Raises:
+        SweepCheckpointError: if the checkpoint was written by a sweep with another sequence, polar type or columns
+    """
+
+    def __init__(self, client, foils, reynolds, mach=(0.0,), ncrit=(9.0,), xtop=(1.0,), xbot=(1.0,),
+                 sequence=(-5, 15, 0.5), polar_type=PolarType.FIXEDSPEEDPOLAR, checkpoint=None, chunk_size=50,
+                 op_point_values=[r for r in PolarResultType]) -> None:
+        self._client = client
+        self.foils = list(dict.fromkeys(f.name if isinstance(f, Foil) else f for f in foils))
+        self.reynolds, self.mach, self.ncrit, self.xtop, self.xbot = (
+            _unique(values) for values in (reynolds, mach, ncrit, xtop, xbot))
+        self.sequence = tuple(float(v) for v in sequence)
+        self.polar_type = int(polar_type)
+        self.op_point_values = sorted(int(v) for v in op_point_values)
+        self.checkpoint = checkpoint
+        self.chunk_size = chunk_size
+        self.results = {}
+        if checkpoint is not None:
+            self._read_checkpoint()
+
+    @property
+    def cells(self) -> list:
+        "Every cell of the grid, grouped by (mach, ncrit, xtop, xbot)"
+        return [Cell(foil, re, mach, ncrit, xtop, xbot)
+                for mach in self.mach for ncrit in self.ncrit for xtop in self.xtop for xbot in self.xbot
+                for foil in self.foils for re in self.reynolds]
+
+    @property
+    def pending(self) -> list:
+        "Cells not completed yet"
+        return [cell for cell in self.cells if cell not in self.results]
+
+    def chunks(self) -> list:
+        """
+        Splits the pending cells into batchAnalyze calls.  A call analyzes every foil of its list at every Reynolds
+        number of its list, so foils missing the same Reynolds numbers are grouped together.
+
+        Returns:
+            list: (foil names, Reynolds numbers, (mach, ncrit, xtop, xbot)) tuples
+        """
+        groups = {}
+        for cell in self.pending:
+            conditions = (cell.mach, cell.ncrit, cell.xtop, cell.xbot)
+            groups.setdefault(conditions, {}).setdefault(cell.foil, []).append(cell.reynolds)
+        chunks = []
+        for conditions, foils in groups.items():
+            by_reynolds = {}
+            for foil, re_list in foils.items():
+                by_reynolds.setdefault(tuple(re_list), []).append(foil)
+            for re_list, names in by_reynolds.items():
+                per_chunk = max(1, self.chunk_size // len(re_list))
+                for i in range(0, len(names), per_chunk):
+                    chunks.append((names[i:i + per_chunk], list(re_list), conditions))
+        return chunks
+
+    def run(self) -> dict:
+        """
+        Analyzes the pending cells, chunk by chunk.  If a call fails the cells completed so far stay in the
+        checkpoint and the error is raised.
+
+        Returns:
+            dict: {Cell: PolarResult} for every completed cell, those of earlier runs included
+        """
+        chunks = self.chunks()
+        for number, (names, re_list, (mach, ncrit, xtop, xbot)) in enumerate(chunks, 1):
+            params = _batch_settings(names, re_list, polar_type=self.polar_type, mach=mach, ncrit=ncrit,
+                                     transition_top=xtop, transition_bot=xbot, sequence=self.sequence)
+            self._client.call("batchAnalyze", params.to_msgpack())
+            completed = self._fetch(names, re_list, (mach, ncrit, xtop, xbot))
+            self.results.update(completed)
+            self._write_checkpoint(completed)
+            logger.info('sweep: chunk %d of %d done, %d of %d cells complete', number, len(chunks),
+                        len(self.results), len(self.cells))
+        return self.results
+
+    def _fetch(self, names, re_list, conditions) -> dict:
+        """
+        Finds the polars of a chunk among the polars of its foils and fetches their results.  Only the points of the
+        alpha sequence of the sweep are kept, so a polar holding only the points of another sequence, e.g. left by
+        an earlier sweep, does not complete its cell.
+        """
+        def accept(name, polar):
+            return _match(name, polar.get('spec', {}), self.polar_type, re_list, conditions) is not None
+
+        values = sorted(set(self.op_point_values) | {int(PolarResultType.ALPHA)})
+        entries = _fetch_polar_results(self._client, names, values, accept)
+        completed = {}
+        for name, polar, result in entries:
+            result = _in_sequence(result, self.sequence, self.op_point_values)
+            if len(result) > 0:
+                completed[_match(name, polar['spec'], self.polar_type, re_list, conditions)] = result
+        missing = len(names) * len(re_list) - len(completed)
+        if missing:
+            logger.warning('sweep: no polar found for %d cells, they stay pending', missing)
+        return completed
+
+    def _header(self) -> dict:
+        return {'version': CHECKPOINT_VERSION, 'sequence': list(self.sequence), 'polar_type': self.polar_type,
+                'op_point_values': self.op_point_values}
+
+    def _read_checkpoint(self):
+        if not os.path.exists(self.checkpoint):
+            return
+        with open(self.checkpoint, 'rb') as f:
+            lines = f.read().splitlines(keepends=True)
+        if not lines:
+            return
+        header = json.loads(lines[0])
+        if header != self._header():
+            raise SweepCheckpointError(f'checkpoint {self.checkpoint} was written by a different sweep: {header}')
+        offset = len(lines[0])
+        for number, line in enumerate(lines[1:], 2):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                if number == len(lines):
+                    # drop the fragment, or the next record would be appended to it
+                    logger.warning('sweep: removing the truncated last line of %s', self.checkpoint)
+                    os.truncate(self.checkpoint, offset)
+                    break
+                raise SweepCheckpointError(f'checkpoint {self.checkpoint} is corrupt at line {number}')
+            offset += len(line)
+            # records written before they carried their sequence and columns have those of the header
+            if (entry.get('sequence', header['sequence']) != header['sequence']
+                    or entry.get('op_point_values', header['op_point_values']) != header['op_point_values']):
+                logger.warning('sweep: skipping the record of another sweep at line %d of %s', number,
+                               self.checkpoint)
+                continue
+            self.results[Cell(*entry['cell'])] = PolarResult.from_arrays(entry['result'])
+
+    def _write_checkpoint(self, completed):
+        if self.checkpoint is None or not completed:
+            return
+        size = os.path.getsize(self.checkpoint) if os.path.exists(self.checkpoint) else 0
+        lines = [json.dumps(self._header())] if size == 0 else []
+        lines += [json.dumps({'cell': list(cell), 'sequence': list(self.sequence),
+                              'op_point_values': self.op_point_values, 'result': result.to_msgpack()})
+                  for cell, result in completed.items()]
+        with open(self.checkpoint, 'a+b') as f:
+            if size:
+                # a crash may have cut the last record just before its newline
+                f.seek(size - 1)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+            f.write(('\n'.join(lines) + '\n').encode())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __str__(self):
+        return f'<Sweep>({len(self.results)} of {len(self)} cells complete)'
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _unique(values) -> list:
+    return list(dict.fromkeys(float(v) for v in np.atleast_1d(values)))
+
+
+def _in_sequence(result, sequence, op_point_values) -> PolarResult:
+    "Keeps the points of a result on the alpha grid of sequence, with the columns of op_point_values"
+    grid = {_alpha_key(a) for a in _alpha_grid(*sequence)}
+    keep = [i for i, alpha in enumerate(result.alpha) if _alpha_key(alpha) in grid]
+    names = PolarResult._column_names()
+    return PolarResult.from_arrays({names[v]: result.data[v, keep] for v in op_point_values})
+
+
+def _match(foil, spec, polar_type, re_list, conditions) -> Cell:
+    "Returns the cell of re_list and conditions that a polar spec of type polar_type belongs to, or None"
+    mach, ncrit, xtop, xbot = conditions
+    try:
+        values = [float(spec[k]) for k in ('mach', 'ncrit', 'xtop', 'xbot')]
+        reynolds = float(spec['reynolds'])
+        if int(spec['polar_type']) != polar_type:
+            return None
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not np.allclose(values, conditions, rtol=1e-9, atol=1e-12):
+        return None
+    for re in re_list:
+        if np.isclose(reynolds, re, rtol=1e-9):
+            return Cell(foil, re, mach, ncrit, xtop, xbot)
+    return None